@@ -1,10 +1,15 @@
 import os
+import sys
 
 import speech_recognition as sr  # 음성 인식 라이브러리
-import whisper  # Whisper 음성 인식 모델
 
-# Whisper 모델 로드: 'base' 모델을 사용합니다.
-whisper_model = whisper.load_model("base")
+# voice-assistant/whisper_cache.py 사용 (메모리 매핑 체크포인트 캐시)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "voice-assistant"))
+
+from whisper_cache import load_model  # noqa: E402
+
+# Whisper 모델 로드: 'base' 모델을 사용합니다. (처음 한 번 변환 후에는 다른 프로세스와 메모리를 공유)
+whisper_model = load_model("base")
 
 
 def transcribe_audio_to_text(audio_data):
@@ -0,0 +1,148 @@
+"""
+Coqui XTTS v2 상주 합성 서버 (로컬 Unix 소켓)
+- 모델은 프로세스 시작 시 한 번만 로드
+- 목소리별 speaker conditioning latent를 계산해 메모리에 캐시 (내장 화자 이름 또는 참조 WAV 경로)
+- 요청마다 inference_stream으로 생성되는 PCM 조각을 바로 전송
+- 요청마다 실시간 배율(RTF = 합성 시간 / 오디오 길이)과 첫 조각까지 시간을 기록
+
+프로토콜 (요청 1건 = 연결 1개):
+    요청:  JSON 한 줄  {"text": "...", "language": "ko", "speaker": "Ana Florence"}  또는 "speaker_wav": "/path.wav"
+    응답:  JSON 한 줄  {"sample_rate": 24000, "format": "s16le", "channels": 1}
+           [4바이트 길이(big-endian) + PCM] 반복, 길이 0이면 끝
+           JSON 한 줄  {"rtf": ..., "audio_seconds": ..., "first_chunk": ..., "error": ...}
+
+실행:
+    python xtts_server.py --socket /tmp/xtts.sock
+"""
+
+import argparse
+import json
+import logging
+import os
+import socketserver
+import struct
+import threading
+import time
+
+import numpy as np
+import torch
+from TTS.api import TTS
+from TTS.tts.configs.xtts_config import XttsConfig
+
+torch.serialization.add_safe_class(XttsConfig)
+
+XTTS_MODEL = "tts_models/multilingual/multi-dataset/xtts_v2"
+XTTS_SOCKET = os.getenv("XTTS_SOCKET", "/tmp/xtts.sock")
+XTTS_DEFAULT_SPEAKER = os.getenv("XTTS_SPEAKER", "Ana Florence")
+SAMPLE_RATE = 24000
+
+
+class XTTSService:
+    def __init__(self, model_name=XTTS_MODEL, gpu=False):
+        start = time.monotonic()
+        self.model = TTS(model_name=model_name, progress_bar=False, gpu=gpu).synthesizer.tts_model
+        logging.info(f"🧠 XTTS 모델 로드 완료 ({time.monotonic() - start:.1f}초)")
+        self._latents = {}
+        # 모델 하나를 여러 요청이 동시에 쓰지 않도록 직렬화
+        self._lock = threading.Lock()
+
+    def latents(self, speaker=None, speaker_wav=None):
+        """(gpt_cond_latent, speaker_embedding) - 목소리별로 한 번만 계산"""
+        if speaker_wav:
+            key = ("wav", speaker_wav, os.path.getmtime(speaker_wav))
+        else:
+            key = ("speaker", speaker or XTTS_DEFAULT_SPEAKER)
+        cached = self._latents.get(key)
+        if cached is not None:
+            return cached
+
+        start = time.monotonic()
+        if speaker_wav:
+            cached = self.model.get_conditioning_latents(audio_path=[speaker_wav])
+        else:
+            entry = self.model.speaker_manager.speakers[key[1]]
+            cached = (entry["gpt_cond_latent"], entry["speaker_embedding"])
+        self._latents[key] = cached
+        logging.info(f"🎙️ 화자 latent 캐시 추가: {key[1]} ({time.monotonic() - start:.3f}초)")
+        return cached
+
+    def stream(self, text, language="ko", speaker=None, speaker_wav=None):
+        """int16 PCM 조각을 생성되는 대로 반환"""
+        with self._lock:
+            gpt_cond_latent, speaker_embedding = self.latents(speaker, speaker_wav)
+            with torch.inference_mode():
+                for chunk in self.model.inference_stream(text, language, gpt_cond_latent, speaker_embedding):
+                    samples = chunk.squeeze().cpu().numpy()
+                    yield (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+class XTTSRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        service = self.server.service
+        stats = {}
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+            self.wfile.write(json.dumps({"sample_rate": SAMPLE_RATE, "format": "s16le", "channels": 1}).encode() + b"\n")
+
+            start = time.monotonic()
+            first_chunk = None
+            samples = 0
+            for pcm in service.stream(request["text"], request.get("language", "ko"),
+                                      request.get("speaker"), request.get("speaker_wav")):
+                if first_chunk is None:
+                    first_chunk = time.monotonic() - start
+                data = pcm.tobytes()
+                self.wfile.write(struct.pack(">I", len(data)) + data)
+                self.wfile.flush()
+                samples += pcm.size
+            elapsed = time.monotonic() - start
+            audio_seconds = samples / SAMPLE_RATE
+            stats = {
+                "rtf": elapsed / audio_seconds if audio_seconds else None,
+                "audio_seconds": audio_seconds,
+                "synthesis_seconds": elapsed,
+                "first_chunk": first_chunk,
+            }
+            logging.info(f"🗣️ XTTS 합성: 오디오 {audio_seconds:.2f}초 / 합성 {elapsed:.2f}초 "
+                         f"(RTF {stats['rtf'] or 0:.2f}, 첫 조각 {first_chunk or 0:.2f}초) | {request['text'][:20]}")
+        except Exception as e:
+            logging.error(f"[ERROR] XTTS 요청 처리 실패: {e}")
+            stats = {"error": str(e)}
+        try:
+            self.wfile.write(struct.pack(">I", 0) + json.dumps(stats).encode() + b"\n")
+        except OSError:
+            pass  # 클라이언트가 먼저 연결을 끊은 경우
+
+
+class XTTSServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, service):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, XTTSRequestHandler)
+        self.service = service
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Coqui XTTS 상주 합성 서버")
+    parser.add_argument("--socket", default=XTTS_SOCKET)
+    parser.add_argument("--gpu", action="store_true")
+    parser.add_argument("--speaker", default=XTTS_DEFAULT_SPEAKER, help="시작 시 latent를 미리 계산할 화자")
+    parser.add_argument("--speaker-wav", help="시작 시 latent를 미리 계산할 참조 음성")
+    args = parser.parse_args()
+
+    service = XTTSService(gpu=args.gpu)
+    service.latents(args.speaker, args.speaker_wav)
+    server = XTTSServer(args.socket, service)
+    logging.info(f"✅ XTTS 서버 대기 중: {args.socket}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
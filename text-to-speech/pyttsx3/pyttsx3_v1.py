@@ -1,23 +1,25 @@
-import pyttsx3  # Text-to-Speech 라이브러리
+import os
+import sys
 
-# pyttsx3 엔진 초기화
-engine = pyttsx3.init()
+# voice-assistant/pyttsx3_engine.py 사용 (전용 스레드 + 비동기 말하기 큐)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "voice-assistant"))
 
-# 음성 속도 조절 (기본값: 200)
-engine.setProperty("rate", 180)  # 속도 줄이기 (값을 높이면 빠름)
+from pyttsx3_engine import Pyttsx3Engine  # noqa: E402
 
-# 볼륨 설정 (0.0 ~ 1.0)
-engine.setProperty("volume", 1.0)  # 최대 볼륨
+# pyttsx3 엔진 초기화
+# 음성 속도 조절 (기본값: 200, 값을 높이면 빠름), 볼륨 설정 (0.0 ~ 1.0)
+# 한국어 목소리는 처음 한 번만 검색하고 이후에는 캐시 파일에서 불러옴
+tts = Pyttsx3Engine(rate=180, volume=1.0)
 
 
 def speak_text(text):
-    """텍스트를 음성으로 변환하여 출력"""
+    """텍스트를 음성 출력 큐에 넣음 (바로 반환)"""
     try:
-        engine.say(text)  # 입력된 텍스트를 음성으로 변환
-        engine.runAndWait()  # 음성을 실행
+        tts.speak(text)
     except Exception as e:
         print(f"오류 발생 (음성 출력): {e}")
 
 
 # 테스트 실행ㅅ
 speak_text("안녕하세요! 저는 pyttsx3을 이용한 음성 비서입니다.")
+tts.wait()  # 스크립트가 끝나기 전에 말하기가 끝날 때까지 대기
@@ -0,0 +1,206 @@
+"""
+프로세스 내부 오디오 재생 엔진 (aplay/afplay/mpg123 서브프로세스 대체)
+- 재생 스레드 하나가 출력 스트림(sounddevice)을 계속 열어두고 사용
+- 메모리의 PCM 버퍼를 큐로 받아 끊김 없이 이어서 재생
+- stop(): 재생 중인 구간과 대기 중인 구간을 즉시 중단 (끼어들기 등에 사용)
+- recent_output(): 최근에 내보낸 출력 신호 (끼어들기 감지 시 에코 기준 신호로 사용)
+- sounddevice가 없으면 표준입력으로 PCM을 받는 aplay 프로세스 하나를 계속 띄워두고 사용 (파일 저장 없음)
+"""
+
+import io
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+import wave
+
+import numpy as np
+
+PLAYBACK_SAMPLE_RATE = int(os.getenv("PLAYBACK_SAMPLE_RATE", 24000))
+PLAYBACK_DEVICE = os.getenv("PLAYBACK_DEVICE") or None
+PLAYBACK_BLOCK_FRAMES = int(os.getenv("PLAYBACK_BLOCK_FRAMES", 1024))
+PLAYBACK_HISTORY_SECONDS = 1.0
+
+try:
+    import sounddevice as sd
+except Exception:  # PortAudio가 없는 환경
+    sd = None
+
+
+def resample(samples, source_rate, target_rate):
+    """선형 보간 리샘플링 (int16 모노)"""
+    if source_rate == target_rate or samples.size == 0:
+        return samples
+    target = int(round(samples.size * target_rate / source_rate))
+    positions = np.linspace(0, samples.size - 1, target)
+    return np.interp(positions, np.arange(samples.size), samples.astype(np.float32)).astype(np.int16)
+
+
+def to_mono_int16(samples, channels):
+    samples = np.asarray(samples)
+    if samples.dtype != np.int16:
+        samples = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples.reshape(-1)
+
+
+def decode_wav(data):
+    """
+    WAV 바이트 -> (int16 모노 샘플, 샘플레이트)
+    """
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"지원하지 않는 샘플 크기: {wav.getsampwidth()}")
+        frames = wav.readframes(wav.getnframes())
+        return to_mono_int16(np.frombuffer(frames, dtype=np.int16), wav.getnchannels()), wav.getframerate()
+
+
+class _AplayOutput:
+    """sounddevice가 없을 때: 표준입력으로 raw PCM을 받는 aplay 프로세스 하나를 계속 사용"""
+
+    def __init__(self, sample_rate, channels, device):
+        command = ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", str(channels), "-r", str(sample_rate)]
+        if device:
+            command += ["-D", device]
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                        stderr=subprocess.DEVNULL)
+        self.sample_rate = sample_rate
+
+    def write(self, block):
+        self.process.stdin.write(block.tobytes())
+        self.process.stdin.flush()
+        # 파이프 버퍼에 쌓이지 않도록 실제 재생 시간만큼 대기 (stop 반응 속도 유지)
+        time.sleep(len(block) / self.sample_rate * 0.9)
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except Exception:
+            self.process.kill()
+
+
+class _SoundDeviceOutput:
+    def __init__(self, sample_rate, channels, device):
+        self.stream = sd.OutputStream(samplerate=sample_rate, channels=channels, dtype="int16", device=device,
+                                      blocksize=PLAYBACK_BLOCK_FRAMES)
+        self.stream.start()
+
+    def write(self, block):
+        self.stream.write(block)
+
+    def close(self):
+        self.stream.stop()
+        self.stream.close()
+
+
+class AudioPlayer:
+    def __init__(self, sample_rate=PLAYBACK_SAMPLE_RATE, device=PLAYBACK_DEVICE, channels=1):
+        """
+        :param channels: 출력 채널 수 (모노 음성을 모든 채널에 복사, 2채널만 받는 hw 장치용)
+        """
+        self.sample_rate = sample_rate
+        self.device = device
+        self.channels = channels
+        self._queue = queue.Queue()
+        self._generation = 0  # stop()이 호출될 때마다 증가, 이전 세대 구간은 버림
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._output = None
+        self._history = np.zeros(int(sample_rate * PLAYBACK_HISTORY_SECONDS), dtype=np.int16)
+        self._last_write = 0.0
+        self._thread = threading.Thread(target=self._worker, name="audio-player", daemon=True)
+        self._thread.start()
+
+    def _open_output(self):
+        if sd is not None:
+            return _SoundDeviceOutput(self.sample_rate, self.channels, self.device)
+        if shutil.which("aplay"):
+            return _AplayOutput(self.sample_rate, self.channels, self.device)
+        raise RuntimeError("사용 가능한 오디오 출력이 없습니다 (sounddevice 또는 aplay 필요)")
+
+    # ----------- 재생 요청 -----------
+    def play_pcm(self, samples, sample_rate, channels=1):
+        """int16/float PCM 구간을 재생 큐에 추가 (바로 반환)"""
+        samples = resample(to_mono_int16(samples, channels), sample_rate, self.sample_rate)
+        with self._lock:
+            self._idle.clear()
+            self._queue.put((self._generation, samples))
+
+    def play_wav(self, data):
+        samples, sample_rate = decode_wav(data)
+        self.play_pcm(samples, sample_rate)
+
+    def play_silence(self, seconds):
+        self.play_pcm(np.zeros(int(self.sample_rate * seconds), dtype=np.int16), self.sample_rate)
+
+    def wait(self, timeout=None):
+        """큐에 있는 모든 구간의 재생이 끝날 때까지 대기"""
+        return self._idle.wait(timeout)
+
+    def is_playing(self):
+        return not self._idle.is_set()
+
+    def stop(self):
+        """재생 중인 구간과 대기 중인 구간을 모두 버림"""
+        with self._lock:
+            self._generation += 1
+            try:
+                while True:
+                    self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._idle.set()
+
+    flush = stop
+
+    def recent_output(self, seconds):
+        """
+        최근 seconds초 동안 출력 장치에 쓴 샘플 (모노 int16, self.sample_rate)
+        그동안 아무것도 재생하지 않았으면 빈 배열
+        """
+        with self._lock:
+            if time.monotonic() - self._last_write > seconds:
+                return np.zeros(0, dtype=np.int16)
+            return self._history[-int(self.sample_rate * seconds):].copy()
+
+    # ----------- 재생 스레드 -----------
+    def _worker(self):
+        while True:
+            generation, samples = self._queue.get()
+            if generation != self._generation:
+                continue
+            try:
+                if self._output is None:
+                    self._output = self._open_output()
+                for offset in range(0, samples.size, PLAYBACK_BLOCK_FRAMES):
+                    if generation != self._generation:
+                        break
+                    block = samples[offset:offset + PLAYBACK_BLOCK_FRAMES]
+                    self._output.write(np.repeat(block[:, None], self.channels, axis=1))
+                    with self._lock:
+                        self._history = np.concatenate([self._history[block.size:], block])
+                        self._last_write = time.monotonic()
+            except Exception as e:
+                logging.error(f"[ERROR] 오디오 재생 실패: {e}")
+                self._close_output()
+            with self._lock:
+                if self._queue.empty():
+                    self._idle.set()
+
+    def _close_output(self):
+        if self._output is not None:
+            try:
+                self._output.close()
+            except Exception:
+                pass
+            self._output = None
+
+    def close(self):
+        self.stop()
+        self._close_output()
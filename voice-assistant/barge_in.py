@@ -0,0 +1,220 @@
+"""
+끼어들기(barge-in): 말하는 동안에도 마이크를 듣다가 사용자가 말하면 재생 중단
+- 재생 중에는 별도 스레드에서 마이크를 계속 읽음
+- 재생 엔진이 방금 내보낸 신호를 기준으로 마이크에 섞인 에코를 빼고(NumPy) 남은 에너지로 발화 판단
+- 발화가 BARGE_IN_MIN_CHUNKS 청크 연속되면: 재생 중단 + 진행 중인 LLM/TTS 작업 취소(on_barge_in)
+- 발화 시작 직전부터 녹음한 오디오를 다음 listen()에 그대로 넘겨 말의 앞부분이 잘리지 않도록 함
+발화 시작 ~ 재생 중단까지 걸린 반응 시간을 기록
+SpeakingGateStream: 재생 신호가 없는 pyttsx3(v1~v3)용. 듣기 스트림 자체를 감싸 에너지 배수로만 판단
+"""
+
+import collections
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from audio_player import resample
+from vad import chunk_rms
+
+BARGE_IN = os.getenv("BARGE_IN", "0") == "1"
+BARGE_IN_ENERGY_RATIO = float(os.getenv("BARGE_IN_ENERGY_RATIO", 1.5))
+BARGE_IN_MIN_CHUNKS = int(os.getenv("BARGE_IN_MIN_CHUNKS", 3))
+BARGE_IN_PREROLL_SECONDS = float(os.getenv("BARGE_IN_PREROLL_SECONDS", 0.3))
+# 에코 제거 없이 판단할 때(SpeakingGateStream) 로봇 목소리보다 커야 하는 배수
+BARGE_IN_DUCK_RATIO = float(os.getenv("BARGE_IN_DUCK_RATIO", 3.0))
+# 출력 → 스피커 → 마이크 입력까지 지연을 찾는 범위
+ECHO_WINDOW_SECONDS = float(os.getenv("ECHO_WINDOW_SECONDS", 0.4))
+
+
+class EchoSuppressor:
+    """
+    재생 중인 신호(기준 신호)를 이용한 단순 에코 제거
+    최근 출력 중 마이크 청크와 가장 상관도가 높은 구간을 찾아, 최소제곱 이득만큼 빼고 남은 신호의 RMS를 계산
+    """
+
+    def __init__(self, player, sample_rate, window_seconds=ECHO_WINDOW_SECONDS):
+        self.player = player
+        self.sample_rate = sample_rate
+        self.window_seconds = window_seconds
+
+    def residual_rms(self, chunk):
+        mic = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+        reference = self.player.recent_output(self.window_seconds)
+        if reference.size == 0:
+            return chunk_rms(chunk)
+        reference = resample(reference, self.player.sample_rate, self.sample_rate).astype(np.float32)
+        if reference.size < mic.size:
+            return chunk_rms(chunk)
+
+        # 모든 지연 후보를 2차원 view로 만들어 상관도를 행렬 곱 한 번으로 계산 (2샘플 간격 → 주변 1샘플 보정)
+        candidates = np.lib.stride_tricks.sliding_window_view(reference, mic.size)
+        coarse = 2 * int(np.argmax(np.abs(candidates[::2] @ mic)))
+        nearby = candidates[max(coarse - 1, 0):coarse + 2]
+        segment = nearby[int(np.argmax(np.abs(nearby @ mic)))]
+        energy = float(segment @ segment)
+        if energy < 1e-6:
+            return chunk_rms(chunk)
+        gain = float(segment @ mic) / energy
+        residual = mic - gain * segment
+        return float(np.sqrt(np.mean(residual ** 2)))
+
+
+class PrerollStream:
+    """
+    끼어들기 때 녹음해 둔 오디오를 먼저 돌려주고, 그 다음부터 실제 마이크 스트림을 읽는 래퍼
+    """
+
+    def __init__(self, stream, preroll):
+        self.stream = stream
+        self.preroll = preroll
+
+    def read(self, size):
+        if self.preroll:
+            # speech_recognition은 size 프레임(16비트 → 2바이트)씩 읽음
+            chunk, self.preroll = self.preroll[:size * 2], self.preroll[size * 2:]
+            return chunk
+        return self.stream.read(size)
+
+    def close(self):
+        return self.stream.close()
+
+
+class SpeakingGateStream:
+    """
+    재생 신호를 알 수 없는 음성 엔진(pyttsx3)용 끼어들기: 말하는 동안에도 듣기를 시작할 수 있도록 마이크 스트림을 감쌈
+    - 말하는 동안에는 에너지가 임계값의 BARGE_IN_DUCK_RATIO배를 넘는 청크가 BARGE_IN_MIN_CHUNKS번 연속될 때까지
+      recognizer에 무음을 전달 (스피커에서 나온 로봇 목소리가 질문으로 녹음되지 않도록)
+    - 연속되면 on_barge_in(음성 출력 중단)을 호출하고 모아 둔 청크부터 그대로 전달 (말의 앞부분 유지, 그만큼 지연)
+    - 말하고 있지 않으면 그대로 전달
+    """
+
+    def __init__(self, stream, energy_threshold, is_speaking, on_barge_in, ratio=BARGE_IN_DUCK_RATIO,
+                 min_chunks=BARGE_IN_MIN_CHUNKS):
+        self.stream = stream
+        self.energy_threshold = energy_threshold
+        self.is_speaking = is_speaking
+        self.on_barge_in = on_barge_in
+        self.ratio = ratio
+        self.min_chunks = min_chunks
+        self.pending = collections.deque()
+        self.triggered = False
+
+    def read(self, size):
+        chunk = self.stream.read(size)
+        if self.triggered:
+            if self.pending:
+                self.pending.append(chunk)
+                return self.pending.popleft()
+            return chunk
+        if not self.is_speaking():
+            self.pending.clear()
+            return chunk
+
+        if chunk_rms(chunk) > self.energy_threshold * self.ratio:
+            self.pending.append(chunk)
+            if len(self.pending) >= self.min_chunks:
+                self.triggered = True
+                logging.info("✋ 말하는 중 사용자 발화 감지 → 음성 출력 중단")
+                try:
+                    self.on_barge_in()
+                except Exception as e:
+                    logging.error(f"[ERROR] 끼어들기 처리 실패: {e}")
+                return self.pending.popleft()
+        else:
+            self.pending.clear()
+        return b"\0" * len(chunk)
+
+    def close(self):
+        return self.stream.close()
+
+
+class BargeInMonitor:
+    def __init__(self, player, microphone_factory, energy_threshold, on_barge_in, enabled=BARGE_IN):
+        """
+        :param microphone_factory: () -> sr.Microphone (재생하는 동안만 열어서 사용)
+        :param on_barge_in: 사용자가 끼어들었을 때 호출 (LLM/TTS 작업 취소 등)
+        """
+        self.player = player
+        self.microphone_factory = microphone_factory
+        self.energy_threshold = energy_threshold
+        self.on_barge_in = on_barge_in
+        self.enabled = enabled
+
+        self.reaction_times = []
+        self._thread = None
+        self._running = threading.Event()
+        self._captured = b""
+        self._lock = threading.Lock()
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name="barge-in", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """모니터링 종료 (마이크를 닫아 다음 listen()이 열 수 있게 함)"""
+        if self._thread is None:
+            return
+        self._running.clear()
+        self._thread.join()
+        self._thread = None
+
+    def take_captured(self):
+        """끼어든 발화를 녹음한 오디오(16비트 PCM 바이트). 없으면 b"" """
+        with self._lock:
+            captured, self._captured = self._captured, b""
+        return captured
+
+    def _run(self):
+        try:
+            with self.microphone_factory() as source:
+                self._listen(source)
+        except Exception as e:
+            logging.error(f"[ERROR] 끼어들기 감지용 마이크 열기 실패: {e}")
+
+    def _listen(self, source):
+        suppressor = EchoSuppressor(self.player, source.SAMPLE_RATE)
+        threshold = self.energy_threshold * BARGE_IN_ENERGY_RATIO
+        preroll = collections.deque(maxlen=max(1, int(BARGE_IN_PREROLL_SECONDS * source.SAMPLE_RATE / source.CHUNK)))
+        voiced = 0
+        onset = None
+        captured = None
+
+        while self._running.is_set():
+            chunk = source.stream.read(source.CHUNK)
+            if captured is not None:
+                # 이미 끼어든 상태: 다음 listen()으로 넘길 오디오 계속 녹음
+                captured.append(chunk)
+                continue
+
+            preroll.append(chunk)
+            if not self.player.is_playing():
+                voiced, onset = 0, None
+                continue
+            if suppressor.residual_rms(chunk) > threshold:
+                voiced += 1
+                onset = onset or time.monotonic()
+            else:
+                voiced, onset = 0, None
+            if voiced < BARGE_IN_MIN_CHUNKS:
+                continue
+
+            self.player.stop()
+            reaction = time.monotonic() - onset
+            self.reaction_times.append(reaction)
+            logging.info(f"✋ 끼어들기 감지: 재생 중단까지 {reaction * 1000:.0f}ms "
+                         f"(평균 {np.mean(self.reaction_times) * 1000:.0f}ms, {len(self.reaction_times)}회)")
+            try:
+                self.on_barge_in()
+            except Exception as e:
+                logging.error(f"[ERROR] 끼어들기 콜백 실패: {e}")
+            captured = list(preroll)
+
+        if captured:
+            with self._lock:
+                self._captured = b"".join(captured)
@@ -0,0 +1,92 @@
+"""
+재생 속도 조절 벤치마크: ffmpeg atempo 파이프라인 vs 프로세스 내부 WSOLA
+(라즈베리파이에서 실행해 결과를 비교)
+
+ffmpeg: MP3 파일 저장 -> ffmpeg atempo 서브프로세스 -> 결과 MP3 읽기
+WSOLA : MP3 바이트 메모리 디코딩 -> NumPy WSOLA -> WAV 바이트
+
+사용법:
+    python bench_time_stretch.py --mp3 sample.mp3 --speed 1.3 --runs 20
+    python bench_time_stretch.py --text "안녕하세요. 나로봇입니다." (gTTS로 샘플 생성, 네트워크 필요)
+"""
+
+import argparse
+import io
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+from time_stretch import stretch_mp3_to_wav
+
+
+def ffmpeg_pipeline(mp3_bytes, speed, workdir):
+    original = os.path.join(workdir, "tts.mp3")
+    adjusted = os.path.join(workdir, "tts_fast.mp3")
+    with open(original, "wb") as f:
+        f.write(mp3_bytes)
+    subprocess.run([
+        "ffmpeg", "-y", "-i", original,
+        "-filter:a", f"atempo={speed}",
+        adjusted
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    with open(adjusted, "rb") as f:
+        data = f.read()
+    os.remove(original)
+    os.remove(adjusted)
+    return data
+
+
+def measure(fn, runs):
+    fn()  # 첫 실행(캐시/JIT/페이지 로드) 제외
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {
+        "mean": statistics.mean(times),
+        "p50": times[len(times) // 2],
+        "p95": times[min(len(times) - 1, int(len(times) * 0.95))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ffmpeg atempo vs WSOLA 속도 조절 벤치마크")
+    parser.add_argument("--mp3", help="입력 MP3 파일")
+    parser.add_argument("--text", default="안녕하세요. 저는 나로봇입니다. 오늘 무엇을 도와드릴까요?")
+    parser.add_argument("--speed", type=float, default=1.3)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.mp3:
+        with open(args.mp3, "rb") as f:
+            mp3_bytes = f.read()
+    else:
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=args.text, lang='ko').write_to_fp(buffer)
+        mp3_bytes = buffer.getvalue()
+
+    print(f"🖥️ {platform.machine()} / {platform.python_version()} | 입력 {len(mp3_bytes) / 1024:.1f}KB, "
+          f"속도 {args.speed}x, {args.runs}회")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {}
+        if shutil.which("ffmpeg"):
+            results["ffmpeg atempo"] = measure(lambda: ffmpeg_pipeline(mp3_bytes, args.speed, workdir), args.runs)
+        else:
+            print("⚠️ ffmpeg가 없어 ffmpeg 파이프라인은 건너뜁니다.")
+        results["WSOLA (NumPy)"] = measure(lambda: stretch_mp3_to_wav(mp3_bytes, args.speed), args.runs)
+
+    for name, r in results.items():
+        print(f"{name:>14}: 평균 {r['mean']:.1f}ms | p50 {r['p50']:.1f}ms | p95 {r['p95']:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
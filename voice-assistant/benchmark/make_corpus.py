@@ -0,0 +1,80 @@
+"""
+벤치마크 발화 코퍼스 만들기 (corpus/utterances.tsv → corpus/<id>.wav)
+- 기본: Google Cloud TTS(LINEAR16)로 합성 (GOOGLE_APPLICATION_CREDENTIALS 필요, 한 번만 실행)
+- --record: 실제 마이크로 문장을 하나씩 읽어 녹음 (실제 목소리/발화 끝 무음 특성을 반영)
+
+사용법:
+    python benchmark/make_corpus.py
+    python benchmark/make_corpus.py --voice ko-KR-Standard-C --overwrite
+    python benchmark/make_corpus.py --record --microphone-index 1
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+CORPUS_DIR = os.path.join(BENCHMARK_DIR, "corpus")
+
+
+def read_manifest(corpus_dir=CORPUS_DIR):
+    """:return: [(id, 문장)]"""
+    with open(os.path.join(corpus_dir, "utterances.tsv"), encoding="utf-8") as f:
+        return [(row["id"], row["text"]) for row in csv.DictReader(f, delimiter="\t")]
+
+
+def synthesize_corpus(entries, corpus_dir, voice, speaking_rate, overwrite):
+    from tts_engine import GoogleTTSEngine
+
+    engine = GoogleTTSEngine(voice, speaking_rate)
+    for utterance_id, text in entries:
+        path = os.path.join(corpus_dir, f"{utterance_id}.wav")
+        if os.path.exists(path) and not overwrite:
+            continue
+        audio = engine.synthesize(text, use_cache=False)  # 실패해도 빈 파일이 남지 않도록 먼저 합성
+        with open(path, "wb") as f:
+            f.write(audio)
+        print(f"🗣 {path}: {text}")
+
+
+def record_corpus(entries, corpus_dir, microphone_index, sample_rate, overwrite):
+    import speech_recognition as sr
+
+    recognizer = sr.Recognizer()
+    recognizer.pause_threshold = 0.8
+    with sr.Microphone(device_index=microphone_index, sample_rate=sample_rate) as source:
+        recognizer.adjust_for_ambient_noise(source, duration=1.5)
+        for utterance_id, text in entries:
+            path = os.path.join(corpus_dir, f"{utterance_id}.wav")
+            if os.path.exists(path) and not overwrite:
+                continue
+            print(f"🎙 읽어 주세요: {text}")
+            audio = recognizer.listen(source)
+            with open(path, "wb") as f:
+                f.write(audio.get_wav_data(convert_rate=sample_rate, convert_width=2))
+            print(f"💾 {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크 발화 코퍼스 생성")
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--voice", default="ko-KR-Standard-A")
+    parser.add_argument("--speaking-rate", type=float, default=1.0)
+    parser.add_argument("--record", action="store_true", help="TTS 대신 마이크로 녹음")
+    parser.add_argument("--microphone-index", type=int, default=0)
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+
+    entries = read_manifest(args.corpus)
+    if args.record:
+        record_corpus(entries, args.corpus, args.microphone_index, args.sample_rate, args.overwrite)
+    else:
+        synthesize_corpus(entries, args.corpus, args.voice, args.speaking_rate, args.overwrite)
+
+
+if __name__ == "__main__":
+    main()
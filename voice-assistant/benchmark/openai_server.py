@@ -0,0 +1,207 @@
+"""
+OpenAI 호환 대역 HTTP 서버 (레거시 openai SDK 0.x의 ChatCompletion / 스트리밍 SSE)
+- POST /v1/chat/completions: stream=True면 토큰마다 "data: {...}" 이벤트를 chunked로 흘려보냄
+- GET/HEAD /v1/models: LLMClient 사전 연결(warm_up) 요청용
+- 지연: 응답 헤더까지 / 첫 토큰까지 / 토큰 간격을 각각 분포로 설정 (stand_ins.Latency 형식)
+- 장애 주입: 오류(500) 비율, 요청 제한(429 + Retry-After) 비율, 초당 요청 수 상한,
+  스트리밍 도중 멈춤(stall) → 시간 초과 / hedge / 고정 응답(canned) 경로를 네트워크 없이 시험
+
+사용법:
+    python benchmark/openai_server.py --port 8811 --first-token lognormal:0.6:0.4 --error-rate 0.05
+    python benchmark/openai_server.py --token-interval uniform:0.2:0.5 --stall-rate 0.2 --stall-seconds 3
+    OPENAI_API_BASE=http://127.0.0.1:8811/v1 python v7.py
+"""
+
+import argparse
+import http.server
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from stand_ins import FaultInjector, Latency  # noqa: E402
+
+DEFAULT_REPLY = "네, 확인했어요. 궁금한 점이 있으면 언제든 물어봐 주세요."
+MODELS = ("gpt-4o", "gpt-4o-mini", "gpt-3.5-turbo")
+
+
+class OpenAIStandInServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, reply=DEFAULT_REPLY, header_latency=None, first_token=None, token_interval=None,
+                 faults=None, stall_rate=0.0, stall_seconds=0.0, retry_after=1, chars_per_token=2):
+        """
+        :param header_latency: 요청 ~ 응답 헤더 (stream=True일 때)
+        :param first_token: 요청 ~ 첫 토큰
+        :param stall_rate: 스트리밍 응답 하나가 도중에 stall_seconds 동안 멈출 확률
+        """
+        super().__init__(address, OpenAIStandInHandler)
+        self.reply = reply
+        self.header_latency = header_latency or Latency(0.05)
+        self.first_token = first_token or Latency(0.6, 0.3)
+        self.token_interval = token_interval or Latency(0.03)
+        self.faults = faults or FaultInjector()
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.retry_after = retry_after
+        self.chars_per_token = chars_per_token
+
+    def tokens(self):
+        return [self.reply[i:i + self.chars_per_token] for i in range(0, len(self.reply), self.chars_per_token)]
+
+
+class OpenAIStandInHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (LLMClient 세션 재사용)
+
+    # ----------- 응답 도우미 -----------
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_error(self, status, message, error_type, code=None, headers=None):
+        self._send_json(status, {"error": {"message": message, "type": error_type, "param": None, "code": code}},
+                        headers)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _write_event(self, payload):
+        data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+        self._write_chunk(f"data: {data}\n\n".encode("utf-8"))
+
+    # ----------- 엔드포인트 -----------
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": model, "object": "model", "owned_by": "stand-in"}
+                                                             for model in MODELS]})
+        else:
+            self._send_error(404, f"Unknown path: {self.path}", "invalid_request_error")
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.split("?")[0].rstrip("/").endswith("/chat/completions"):
+            self._send_error(404, f"Unknown path: {self.path}", "invalid_request_error")
+            return
+
+        server = self.server
+        model = body.get("model", MODELS[0])
+        stream = bool(body.get("stream"))
+        fault = server.faults.decide()
+        if fault == "rate_limit":
+            self._send_error(429, f"Rate limit reached for {model} (stand-in)", "requests", "rate_limit_exceeded",
+                             {"Retry-After": str(server.retry_after)})
+        elif fault == "error":
+            time.sleep(server.header_latency.sample())
+            self._send_error(500, "The server had an error while processing your request (stand-in)", "server_error")
+        elif stream:
+            self._stream(model)
+        else:
+            time.sleep(server.first_token.sample() + sum(server.token_interval.sample() for _ in server.tokens()))
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": server.reply},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(json.dumps(body.get("messages", []))) // 4,
+                          "completion_tokens": len(server.tokens()),
+                          "total_tokens": len(json.dumps(body.get("messages", []))) // 4 + len(server.tokens())},
+            })
+        logging.info(f"🧪 {self.command} {self.path} model={model} stream={stream} → {fault or 'ok'}")
+
+    def _stream(self, model):
+        server = self.server
+        start = time.monotonic()
+        time.sleep(server.header_latency.sample())
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        tokens = server.tokens()
+        # 멈출 위치는 응답마다 한 곳 (첫 토큰 전 포함)
+        stall_at = server.faults.randrange(len(tokens) + 1) if server.faults.roll(server.stall_rate) else None
+
+        def chunk(delta, finish_reason=None):
+            return {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+        try:
+            time.sleep(max(0.0, server.first_token.sample() - (time.monotonic() - start)))
+            for index, token in enumerate(tokens):
+                if index == stall_at:
+                    time.sleep(server.stall_seconds)
+                elif index:
+                    time.sleep(server.token_interval.sample())
+                delta = {"role": "assistant", "content": token} if index == 0 else {"content": token}
+                self._write_event(chunk(delta))
+            self._write_event(chunk({}, "stop"))
+            self._write_event("[DONE]")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 스트림을 닫음 (응답 길이 제한, 취소, hedge 패배 등)
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass  # 요청 로그는 do_POST에서 한 줄로 남김
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="OpenAI 호환 대역 서버 (지연/장애 주입)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8811)
+    parser.add_argument("--reply", default=DEFAULT_REPLY)
+    parser.add_argument("--header-latency", default="fixed:0.05", help="응답 헤더까지 (분포:중앙값[:퍼짐])")
+    parser.add_argument("--first-token", default="lognormal:0.6:0.3", help="첫 토큰까지")
+    parser.add_argument("--token-interval", default="fixed:0.03", help="토큰 간격 (느린 스트리밍)")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="스트리밍 도중 멈출 확률")
+    parser.add_argument("--stall-seconds", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 응답 비율")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 응답 비율")
+    parser.add_argument("--max-rps", type=float, default=0.0, help="초당 요청 수 상한 (넘으면 429)")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = OpenAIStandInServer(
+        (args.host, args.port),
+        reply=args.reply,
+        header_latency=Latency.parse(args.header_latency, args.seed),
+        first_token=Latency.parse(args.first_token, args.seed + 1),
+        token_interval=Latency.parse(args.token_interval, args.seed + 2),
+        faults=FaultInjector(args.error_rate, args.rate_limit_rate, args.max_rps, args.seed),
+        stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds,
+        retry_after=args.retry_after,
+    )
+    logging.info(f"🧪 OpenAI 대역 서버: http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logging.info(f"🧪 요청 결과: {dict(server.faults.counts)}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
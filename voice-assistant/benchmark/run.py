@@ -0,0 +1,355 @@
+"""
+오프라인 종단 간(end-to-end) 벤치마크
+- 가상 마이크가 corpus/*.wav 발화를 실시간(또는 --speed배 빠르게) 흘려보내고
+  v7의 실제 파이프라인(handle_audio_input → process_turn: Whisper STT → FAQ/의도/GPT → TTS → 재생)을 그대로 실행
+- OpenAI / Google Cloud TTS / 사운드 장치는 프로세스 내부 대역으로 교체 (stand_ins.py, seed 고정)
+  --openai-base / --tts-endpoint를 주면 대신 대역 서버(openai_server.py, tts_server.py)로 실제 HTTP/gRPC 요청
+- 단계별(metrics 리스너)·종단 간 지연 백분위수, CPU 시간, 최대 RSS를 커밋 정보와 함께 JSON으로 저장
+- --compare로 이전 결과와 비교 → 성능 관련 변경마다 수치를 함께 남김
+
+종단 간 지연은 발화의 마지막 샘플이 마이크에 들어온 시각 기준
+(발화 끝 판정 무음 pause_threshold 1초 포함 = 사용자가 실제로 기다리는 시간)
+
+사용법 (voice-assistant 디렉터리에서):
+    python benchmark/make_corpus.py                       # 최초 1회 발화 WAV 생성
+    python benchmark/run.py --repeat 3 --speed 2
+    python benchmark/run.py --stt stub --speed 0          # Whisper 없이 나머지 단계만 (최대 속도)
+    python benchmark/run.py --compare benchmark/results/<이전 결과>.json
+    python benchmark/run.py --openai-base http://127.0.0.1:8811/v1 --tts-endpoint 127.0.0.1:50051
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+# 대역을 쓰므로 실제 키/포트/끼어들기 감지는 사용하지 않음 (환경변수로 덮어쓰기 가능)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("METRICS_PORT", "0")
+os.environ.setdefault("METRICS_LOG_INTERVAL", "0")
+os.environ.setdefault("BARGE_IN", "0")
+
+import openai  # noqa: E402
+
+from make_corpus import CORPUS_DIR, read_manifest  # noqa: E402
+from metrics import percentile  # noqa: E402
+from stand_ins import FakeChatCompletion, FakeTTSClient, Latency, NullOutput  # noqa: E402
+from virtual_mic import VirtualMicrophone, load_utterance  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+BENCHMARK_REPLY = "네, 확인했어요. 궁금한 점이 있으면 언제든 물어봐 주세요."
+
+# stub STT 워커가 돌려줄 정답 문장 (fork된 프로세스가 그대로 물려받음)
+_expected_text = None
+_stub_stt_latency = 0.0
+
+
+def stub_stt_worker(temp_filename, result_queue):
+    time.sleep(_stub_stt_latency)
+    result_queue.put(_expected_text)
+
+
+class StubWhisper:
+    """stub 모드의 whisper_model 자리 (Whisper를 내려받거나 로드하지 않음). 부분 STT는 흉내 내지 않음"""
+
+    def transcribe(self, audio, **options):
+        return {"text": ""}
+
+
+# ----------- 측정 -----------
+class Recorder:
+    """metrics 리스너: 측정 중인 턴 번호와 함께 이벤트 저장"""
+
+    def __init__(self):
+        self.turn = None
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            if self.turn is not None:
+                self.events.append((self.turn, event))
+
+    def end_time(self, turn, stage):
+        """해당 턴에서 stage가 마지막으로 끝난 시각 (없으면 None)"""
+        with self._lock:
+            ends = [e["start"] + e["seconds"] for t, e in self.events if t == turn and e["stage"] == stage]
+        return ends[-1] if ends else None
+
+    def by_stage(self):
+        stages, failures = {}, {}
+        with self._lock:
+            for _, event in self.events:
+                target = stages if event["type"] == "span" else failures
+                target.setdefault(event["stage"], []).append(event["seconds"])
+        return stages, {stage: len(values) for stage, values in failures.items()}
+
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return {"n": 0}
+    return {
+        "n": len(values),
+        "mean": round(sum(values) / len(values), 4),
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(max(values), 4),
+    }
+
+
+def cpu_seconds():
+    """(이 프로세스, 자식 프로세스(Whisper 워커)) user+system CPU 시간"""
+    times = os.times()
+    return times.user + times.system, times.children_user + times.children_system
+
+
+def peak_rss_mb(who):
+    # Linux는 KB, macOS는 바이트 단위
+    scale = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    return round(resource.getrusage(who).ru_maxrss / scale, 1)
+
+
+def git_revision():
+    def _git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=BENCHMARK_DIR, capture_output=True, text=True,
+                                  timeout=10).stdout.strip()
+        except Exception:
+            return ""
+
+    return {"commit": _git("rev-parse", "HEAD") or None, "subject": _git("log", "-1", "--format=%s") or None,
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no"))}
+
+
+# ----------- 파이프라인 준비 -----------
+def install_stand_ins(assistant, args):
+    """
+    v7 모듈의 외부 의존(OpenAI, Google TTS, 마이크, 스피커)을 대역으로 교체
+    (대역 서버를 쓰는 API는 그대로 두고 환경변수로 주소만 바꿈)
+    """
+    chat = tts_client = None
+    if not args.openai_base:
+        chat = FakeChatCompletion(args.reply, Latency(args.llm_latency, args.llm_spread, seed=args.seed),
+                                  token_interval=args.token_interval)
+        openai.ChatCompletion.create = chat.create
+        from llm_client import LLMClient
+        LLMClient.warm_up = lambda self, reason="speech onset": None
+
+    if not args.tts_endpoint:
+        tts_client = FakeTTSClient(Latency(args.tts_latency, args.tts_spread, seed=args.seed + 1))
+        from tts_engine import GoogleTTSEngine
+        GoogleTTSEngine.client = lambda self: (tts_client, 0.0)
+
+    player = assistant.audio_player
+    player._open_output = lambda: NullOutput(player.sample_rate, args.speed)
+
+    microphone = VirtualMicrophone(assistant.MICROPHONE_SAMPLE_RATE, speed=args.speed, seed=args.seed)
+    assistant.open_microphone = lambda: microphone
+
+    if args.stt == "stub":
+        global _stub_stt_latency
+        _stub_stt_latency = args.stt_latency
+        assistant.whisper_stt_worker = stub_stt_worker
+        assistant.whisper_model.loader = StubWhisper
+    return microphone, chat, tts_client
+
+
+def run(args):
+    global _expected_text
+    multiprocessing.set_start_method("fork", force=True)
+    if args.openai_base:
+        os.environ["OPENAI_API_BASE"] = args.openai_base
+    if args.tts_endpoint:
+        os.environ["TTS_ENDPOINT"] = args.tts_endpoint
+        os.environ["TTS_INSECURE"] = "1"
+    import v7 as assistant  # 환경변수 설정 후 import (모듈 상수)
+
+    microphone, chat, tts_client = install_stand_ins(assistant, args)
+    entries = read_manifest(args.corpus)
+    if args.only:
+        entries = [entry for entry in entries if entry[0] in args.only]
+    corpus = []
+    for utterance_id, text in entries:
+        path = os.path.join(args.corpus, f"{utterance_id}.wav")
+        if not os.path.exists(path):
+            raise SystemExit(f"발화 WAV가 없습니다: {path} (python benchmark/make_corpus.py 먼저 실행)")
+        corpus.append((utterance_id, text, load_utterance(path, assistant.MICROPHONE_SAMPLE_RATE)))
+
+    # 모델/클라이언트 로드는 측정에서 빼고 시간만 따로 기록
+    assistant.start_background_loading()
+    loading = {}
+    for lazy in (assistant.whisper_model, assistant.tts_engine, assistant.llm_client):
+        lazy.get()
+        loading[lazy.name] = round(lazy.finished - lazy.started, 3)
+    if not args.tts_cache:
+        assistant.tts_engine.get().cache = None
+    recorder = Recorder()
+    assistant.metrics.add_listener(recorder)
+    assistant.memory_monitor.start()
+    assistant.acknowledger.warm_up(background=False)
+
+    schedule = corpus[:1] * args.warmup + corpus * args.repeat
+    turns = []
+    cpu_start = cpu_seconds()
+    wall_start = time.monotonic()
+    for index, (utterance_id, text, samples) in enumerate(schedule):
+        measuring = index >= args.warmup
+        turn = len(turns) if measuring else None
+        recorder.turn = turn
+        _expected_text = text
+        microphone.say(samples)
+
+        turn_cpu = cpu_seconds()
+        audio = assistant.handle_audio_input()
+        transcript, response = assistant.process_turn(audio) if audio else (None, None)
+        done = time.monotonic()
+        if not measuring:
+            continue
+
+        spoken_end = microphone.utterance_ended
+        answer = recorder.end_time(turn, "time_to_answer")
+        first_sound = recorder.end_time(turn, "time_to_first_sound")
+        cpu_now = cpu_seconds()
+        turns.append({
+            "id": utterance_id,
+            "expected": text,
+            "transcript": transcript,
+            "response": response,
+            "utterance_seconds": round(samples.size / assistant.MICROPHONE_SAMPLE_RATE, 3),
+            "to_first_sound": round(first_sound - spoken_end, 4) if first_sound and spoken_end else None,
+            "to_answer": round(answer - spoken_end, 4) if answer and spoken_end else None,
+            "to_done": round(done - spoken_end, 4) if spoken_end else None,
+            "cpu_seconds": round(sum(cpu_now) - sum(turn_cpu), 3),
+            "memory": assistant.memory_monitor.last_turn,
+        })
+        print(f"[{turn + 1}/{len(corpus) * args.repeat}] {utterance_id}: 답 시작 {turns[-1]['to_answer']}초 "
+              f"/ 인식 '{transcript}'")
+
+    wall = time.monotonic() - wall_start
+    cpu_end = cpu_seconds()
+    stages, failures = recorder.by_stage()
+    return {
+        "benchmark": "voice-assistant-e2e",
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": git_revision(),
+        "host": {"platform": platform.platform(), "machine": platform.machine(), "python": platform.python_version(),
+                 "cpus": os.cpu_count()},
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "end_to_end": {
+            "to_first_sound": summarize([t["to_first_sound"] for t in turns]),
+            "to_answer": summarize([t["to_answer"] for t in turns]),
+            "to_done": summarize([t["to_done"] for t in turns]),
+        },
+        "stages": {stage: summarize(values) for stage, values in stages.items()},
+        "model_load_seconds": loading,
+        "failures": failures,
+        "process": {
+            "wall_seconds": round(wall, 3),
+            "cpu_seconds": round(cpu_end[0] - cpu_start[0], 3),
+            "children_cpu_seconds": round(cpu_end[1] - cpu_start[1], 3),
+            "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF),
+            "children_peak_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN),
+        },
+        "memory": assistant.memory_monitor.stats(),
+        "stand_ins": {"llm_calls": chat.calls if chat else None,
+                      "tts_calls": tts_client.calls if tts_client else None},
+        "turns": turns,
+    }
+
+
+# ----------- 출력 / 비교 -----------
+def print_report(result):
+    print("\n=== 종단 간 (발화 끝 기준, 초) ===")
+    for name, stats in result["end_to_end"].items():
+        if stats["n"]:
+            print(f"{name:<16} n={stats['n']:<3} p50={stats['p50']:.3f} p95={stats['p95']:.3f} max={stats['max']:.3f}")
+    print("\n=== 단계별 (초) ===")
+    for name, stats in result["stages"].items():
+        failed = result["failures"].get(name, 0)
+        print(f"{name:<20} n={stats['n']:<3} p50={stats['p50']:.3f} p95={stats['p95']:.3f} max={stats['max']:.3f}"
+              + (f" 실패={failed}" if failed else ""))
+    process = result["process"]
+    print(f"\nCPU {process['cpu_seconds']}초 (+ 자식 {process['children_cpu_seconds']}초) / "
+          f"최대 RSS {process['peak_rss_mb']}MB (자식 {process['children_peak_rss_mb']}MB) / "
+          f"전체 {process['wall_seconds']}초")
+    peaks = ", ".join(f"{stage} {stats['peak_mb']:.0f}" for stage, stats in result["memory"]["stages"].items())
+    if peaks:
+        print(f"단계별 최대 메모리(MB): {peaks}")
+
+
+def print_comparison(base, result):
+    def _delta(old, new):
+        if old is None or new is None:
+            return "-"
+        change = (new - old) / old * 100 if old else 0.0
+        return f"{old:.3f} → {new:.3f} ({change:+.1f}%)"
+
+    print(f"\n=== 비교: {(base['git'].get('commit') or '?')[:8]} → {(result['git'].get('commit') or '?')[:8]} ===")
+    for section in ("end_to_end", "stages"):
+        for name, stats in result[section].items():
+            old = base.get(section, {}).get(name)
+            if not old or not old.get("n") or not stats.get("n"):
+                continue
+            print(f"{name:<20} p50 {_delta(old['p50'], stats['p50'])} | p95 {_delta(old['p95'], stats['p95'])}")
+    for key in ("cpu_seconds", "children_cpu_seconds", "peak_rss_mb", "children_peak_rss_mb"):
+        print(f"{key:<20} {_delta(base['process'].get(key), result['process'].get(key))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가상 마이크 + 대역 API로 실제 파이프라인 종단 간 벤치마크")
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--only", nargs="*", help="이 id의 발화만 사용")
+    parser.add_argument("--repeat", type=int, default=3, help="코퍼스 반복 횟수")
+    parser.add_argument("--warmup", type=int, default=1, help="측정 전에 버리는 턴 수")
+    parser.add_argument("--speed", type=float, default=1.0, help="마이크 입력/재생 속도 배수 (0: 대기 없음)")
+    parser.add_argument("--stt", choices=("whisper", "stub"), default="whisper")
+    parser.add_argument("--stt-latency", type=float, default=0.3, help="stub STT 지연 (초)")
+    parser.add_argument("--llm-latency", type=float, default=0.6, help="GPT 첫 토큰 지연 중앙값 (초)")
+    parser.add_argument("--llm-spread", type=float, default=0.3)
+    parser.add_argument("--token-interval", type=float, default=0.03)
+    parser.add_argument("--tts-latency", type=float, default=0.25, help="TTS 합성 지연 중앙값 (초)")
+    parser.add_argument("--tts-spread", type=float, default=0.3)
+    parser.add_argument("--tts-cache", action="store_true", help="TTS 캐시 사용 (기본: 매번 합성)")
+    parser.add_argument("--reply", default=BENCHMARK_REPLY)
+    parser.add_argument("--openai-base", help="OpenAI 대역 서버 주소 (예: http://127.0.0.1:8811/v1)")
+    parser.add_argument("--tts-endpoint", help="Google TTS 대역 gRPC 서버 (예: 127.0.0.1:50051)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmark/results/<시각>-<커밋>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    try:
+        result = run(args)
+    except Exception:
+        # v7은 import 시 sys.stderr를 /dev/null로 돌리므로 원래 stderr로 직접 출력
+        traceback.print_exc(file=sys.__stderr__)
+        sys.exit(1)
+    print_report(result)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), result)
+
+    output = args.output
+    if not output:
+        commit = (result["git"]["commit"] or "unknown")[:8] + ("-dirty" if result["git"]["dirty"] else "")
+        output = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+벤치마크용 프로세스 내부 대역(stand-in): OpenAI / Google Cloud TTS / 오디오 출력
+- 네트워크, 과금, 사운드 장치 없이 실제 파이프라인 코드(LLMClient, BudgetedLLM, GoogleTTSEngine, AudioPlayer)를 그대로 실행
+- 지연 시간은 분포(고정/균등/로그정규)에서 seed 고정으로 뽑아 커밋 간 비교가 가능하도록 함
+- Latency / FaultInjector / synthetic_speech는 대역 서버(openai_server.py, tts_server.py)에서도 사용
+"""
+
+import collections
+import random
+import threading
+import time
+import types
+
+import numpy as np
+
+from time_stretch import to_wav_bytes
+
+
+class Latency:
+    DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+    def __init__(self, median, spread=0.0, seed=0, distribution="lognormal"):
+        """
+        :param median: 중앙값 (초)
+        :param spread: lognormal이면 sigma, uniform이면 median 대비 ± 비율 (0이면 항상 median)
+        """
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"지원하지 않는 지연 분포: {distribution}")
+        self.median = median
+        self.spread = spread
+        self.distribution = distribution
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec, seed=0):
+        """
+        "0.6" | "fixed:0.6" | "uniform:0.6:0.5" | "lognormal:0.6:0.3" 형식의 설정 문자열
+        """
+        parts = spec.split(":")
+        if len(parts) == 1:
+            return cls(float(parts[0]), 0.0, seed, "fixed")
+        spread = float(parts[2]) if len(parts) > 2 else 0.0
+        return cls(float(parts[1]), spread, seed, parts[0])
+
+    def sample(self):
+        if self.spread <= 0 or self.distribution == "fixed":
+            return self.median
+        with self._lock:
+            if self.distribution == "uniform":
+                return max(0.0, self.median * (1.0 + self._random.uniform(-self.spread, self.spread)))
+            return self.median * self._random.lognormvariate(0.0, self.spread)
+
+
+class FaultInjector:
+    """요청마다 정상 / 오류 / 요청 제한(rate limit) 중 하나를 결정"""
+
+    def __init__(self, error_rate=0.0, rate_limit_rate=0.0, max_rps=0.0, seed=0):
+        """
+        :param max_rps: 초당 요청 수 상한 (넘으면 rate limit 응답, 0이면 제한 없음)
+        """
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_rps = max_rps
+        self.counts = collections.Counter()
+        self._random = random.Random(seed)
+        self._recent = collections.deque()
+        self._lock = threading.Lock()
+
+    def decide(self):
+        """:return: None | "rate_limit" | "error" """
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 1.0:
+                self._recent.popleft()
+            roll = self._random.random()
+            if self.max_rps and len(self._recent) >= self.max_rps:
+                fault = "rate_limit"
+            elif roll < self.rate_limit_rate:
+                fault = "rate_limit"
+            elif roll < self.rate_limit_rate + self.error_rate:
+                fault = "error"
+            else:
+                fault = None
+                self._recent.append(now)
+            self.counts[fault or "ok"] += 1
+            return fault
+
+    def roll(self, probability):
+        with self._lock:
+            return self._random.random() < probability
+
+    def randrange(self, n):
+        with self._lock:
+            return self._random.randrange(n)
+
+
+class FakeChatCompletion:
+    """openai.ChatCompletion.create 대역 (stream=True면 토큰 단위 청크를 시간 간격을 두고 반환)"""
+
+    def __init__(self, reply, first_token, token_interval=0.03, chars_per_token=2):
+        """
+        :param first_token: 요청 ~ 첫 토큰까지 지연 (Latency)
+        """
+        self.reply = reply
+        self.first_token = first_token
+        self.token_interval = token_interval
+        self.chars_per_token = chars_per_token
+        self.calls = 0
+
+    def create(self, model=None, messages=None, stream=False, **kwargs):
+        self.calls += 1
+        time.sleep(self.first_token.sample())
+        tokens = [self.reply[i:i + self.chars_per_token] for i in range(0, len(self.reply), self.chars_per_token)]
+        if not stream:
+            time.sleep(self.token_interval * len(tokens))
+            return {"model": model, "choices": [{"index": 0, "message": {"role": "assistant", "content": self.reply},
+                                                 "finish_reason": "stop"}]}
+        return self._stream(model, tokens)
+
+    def _stream(self, model, tokens):
+        for index, token in enumerate(tokens):
+            if index:
+                time.sleep(self.token_interval)
+            yield {"model": model, "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+        yield {"model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+
+
+def synthetic_speech(text, sample_rate, speaking_rate=1.0, seconds_per_char=0.11):
+    """글자 수에 비례하는 길이의 음성 비슷한 신호 (음절마다 높낮이가 바뀌는 톤)"""
+    syllables = max(1, len(text))
+    syllable_frames = int(sample_rate * seconds_per_char / max(speaking_rate, 0.1))
+    t = np.arange(syllable_frames) / sample_rate
+    envelope = np.minimum(1.0, np.minimum(t, t[::-1]) / 0.02)
+    pitches = 160.0 + 40.0 * np.sin(np.arange(syllables) * 0.9)
+    return np.concatenate([0.3 * np.sin(2 * np.pi * pitch * t) * envelope for pitch in pitches])
+
+
+class FakeTTSClient:
+    """texttospeech.TextToSpeechClient 대역 (LINEAR16 WAV 반환)"""
+
+    def __init__(self, latency, sample_rate=24000):
+        self.latency = latency
+        self.sample_rate = sample_rate
+        self.transport = types.SimpleNamespace(close=lambda: None)
+        self.calls = 0
+
+    def synthesize_speech(self, input=None, voice=None, audio_config=None, timeout=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency.sample())
+        rate = getattr(audio_config, "speaking_rate", None) or 1.0
+        samples = synthetic_speech(input.text, self.sample_rate, rate)
+        return types.SimpleNamespace(audio_content=to_wav_bytes(samples, self.sample_rate))
+
+
+class NullOutput:
+    """AudioPlayer 출력 장치 대역: 실제 재생 시간만큼(speed배 빠르게) 대기 후 버림"""
+
+    def __init__(self, sample_rate, speed=1.0):
+        self.sample_rate = sample_rate
+        self.speed = speed
+        self.frames = 0
+
+    def write(self, block):
+        self.frames += len(block)
+        if self.speed > 0:
+            time.sleep(len(block) / self.sample_rate / self.speed)
+
+    def close(self):
+        pass
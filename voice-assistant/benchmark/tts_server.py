@@ -0,0 +1,162 @@
+"""
+Google Cloud Text-to-Speech 대역 gRPC 서버 (google.cloud.texttospeech.v1.TextToSpeech)
+- SynthesizeSpeech: 글자 수에 비례하는 길이의 합성 신호를 LINEAR16 WAV로 반환
+- StreamingSynthesize: 같은 신호를 헤더 없는 PCM 조각으로 나눠 간격을 두고 전송 (느린 스트리밍)
+- ListVoices: 한국어 음성 몇 개
+- 지연 분포, 오류(UNAVAILABLE) 비율, 요청 제한(RESOURCE_EXHAUSTED) 비율 / 초당 요청 수 상한 설정
+  → TTS 예산 초과, 로컬 엔진과의 경쟁, 재시도, 캐시 동작을 네트워크/과금 없이 시험
+
+사용법:
+    python benchmark/tts_server.py --port 50051 --latency lognormal:0.3:0.5 --error-rate 0.1
+    TTS_ENDPOINT=127.0.0.1:50051 TTS_INSECURE=1 python v7.py
+"""
+
+import argparse
+import concurrent.futures
+import logging
+import os
+import sys
+import time
+
+import grpc
+import numpy as np
+from google.cloud import texttospeech
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from stand_ins import FaultInjector, Latency, synthetic_speech  # noqa: E402
+from time_stretch import to_wav_bytes  # noqa: E402
+
+SERVICE_NAME = "google.cloud.texttospeech.v1.TextToSpeech"
+VOICES = ("ko-KR-Standard-A", "ko-KR-Standard-B", "ko-KR-Standard-C", "ko-KR-Wavenet-A")
+DEFAULT_SAMPLE_RATE = 24000
+
+
+class StubTextToSpeech:
+    def __init__(self, latency=None, faults=None, chunk_interval=None, chunk_seconds=0.2,
+                 sample_rate=DEFAULT_SAMPLE_RATE):
+        """
+        :param latency: 요청 ~ (첫) 응답까지 지연
+        :param chunk_interval: StreamingSynthesize 오디오 조각 사이 간격
+        """
+        self.latency = latency or Latency(0.25, 0.3)
+        self.faults = faults or FaultInjector()
+        self.chunk_interval = chunk_interval or Latency(0.0)
+        self.chunk_seconds = chunk_seconds
+        self.sample_rate = sample_rate
+
+    def _inject(self, context, method):
+        fault = self.faults.decide()
+        logging.info(f"🧪 {method} → {fault or 'ok'}")
+        if fault == "rate_limit":
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Quota exceeded (stand-in)")
+        elif fault == "error":
+            context.abort(grpc.StatusCode.UNAVAILABLE, "Service unavailable (stand-in)")
+
+    def _samples(self, text, speaking_rate, sample_rate):
+        return synthetic_speech(text, sample_rate, speaking_rate or 1.0)
+
+    # ----------- RPC -----------
+    def synthesize_speech(self, request, context):
+        self._inject(context, "SynthesizeSpeech")
+        config = request.audio_config
+        if config.audio_encoding not in (texttospeech.AudioEncoding.LINEAR16,
+                                         texttospeech.AudioEncoding.AUDIO_ENCODING_UNSPECIFIED):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Stand-in supports LINEAR16 only")
+        time.sleep(self.latency.sample())
+        sample_rate = config.sample_rate_hertz or self.sample_rate
+        samples = self._samples(request.input.text or request.input.ssml, config.speaking_rate, sample_rate)
+        return texttospeech.SynthesizeSpeechResponse(audio_content=to_wav_bytes(samples, sample_rate))
+
+    def streaming_synthesize(self, request_iterator, context):
+        speaking_rate = 1.0
+        for index, request in enumerate(request_iterator):
+            if index == 0:
+                # 첫 요청은 streaming_config (음성 설정)
+                self._inject(context, "StreamingSynthesize")
+                speaking_rate = getattr(request.streaming_config, "speaking_rate", 0) or 1.0
+                continue
+            time.sleep(self.latency.sample())
+            samples = self._samples(request.input.text, speaking_rate, self.sample_rate)
+            pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+            step = max(1, int(self.sample_rate * self.chunk_seconds))
+            for offset in range(0, pcm.size, step):
+                if offset:
+                    time.sleep(self.chunk_interval.sample())
+                yield texttospeech.StreamingSynthesizeResponse(audio_content=pcm[offset:offset + step].tobytes())
+
+    def list_voices(self, request, context):
+        return texttospeech.ListVoicesResponse(voices=[
+            texttospeech.Voice(language_codes=["ko-KR"], name=name, ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL,
+                               natural_sample_rate_hertz=self.sample_rate)
+            for name in VOICES
+        ])
+
+
+def build_handler(service):
+    methods = {
+        "SynthesizeSpeech": grpc.unary_unary_rpc_method_handler(
+            service.synthesize_speech,
+            request_deserializer=texttospeech.SynthesizeSpeechRequest.deserialize,
+            response_serializer=texttospeech.SynthesizeSpeechResponse.serialize,
+        ),
+        "ListVoices": grpc.unary_unary_rpc_method_handler(
+            service.list_voices,
+            request_deserializer=texttospeech.ListVoicesRequest.deserialize,
+            response_serializer=texttospeech.ListVoicesResponse.serialize,
+        ),
+    }
+    if hasattr(texttospeech, "StreamingSynthesizeRequest"):  # google-cloud-texttospeech 2.16 이상
+        methods["StreamingSynthesize"] = grpc.stream_stream_rpc_method_handler(
+            service.streaming_synthesize,
+            request_deserializer=texttospeech.StreamingSynthesizeRequest.deserialize,
+            response_serializer=texttospeech.StreamingSynthesizeResponse.serialize,
+        )
+    return grpc.method_handlers_generic_handler(SERVICE_NAME, methods)
+
+
+def start_server(service, host="127.0.0.1", port=50051, max_workers=8):
+    """:return: (grpc 서버, 실제 포트) - port=0이면 빈 포트 자동 선택"""
+    server = grpc.server(concurrent.futures.ThreadPoolExecutor(max_workers=max_workers))
+    server.add_generic_rpc_handlers((build_handler(service),))
+    bound = server.add_insecure_port(f"{host}:{port}")
+    server.start()
+    return server, bound
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Google Cloud TTS 대역 gRPC 서버 (지연/장애 주입)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=50051)
+    parser.add_argument("--latency", default="lognormal:0.25:0.3", help="합성 지연 (분포:중앙값[:퍼짐])")
+    parser.add_argument("--chunk-interval", default="fixed:0", help="스트리밍 오디오 조각 간격 (느린 스트리밍)")
+    parser.add_argument("--chunk-seconds", type=float, default=0.2)
+    parser.add_argument("--sample-rate", type=int, default=DEFAULT_SAMPLE_RATE)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="UNAVAILABLE 응답 비율")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="RESOURCE_EXHAUSTED 응답 비율")
+    parser.add_argument("--max-rps", type=float, default=0.0, help="초당 요청 수 상한 (넘으면 RESOURCE_EXHAUSTED)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    service = StubTextToSpeech(
+        latency=Latency.parse(args.latency, args.seed),
+        faults=FaultInjector(args.error_rate, args.rate_limit_rate, args.max_rps, args.seed),
+        chunk_interval=Latency.parse(args.chunk_interval, args.seed + 1),
+        chunk_seconds=args.chunk_seconds,
+        sample_rate=args.sample_rate,
+    )
+    server, port = start_server(service, args.host, args.port)
+    logging.info(f"🧪 Google TTS 대역 서버: {args.host}:{port} (TTS_ENDPOINT={args.host}:{port} TTS_INSECURE=1)")
+    try:
+        server.wait_for_termination()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logging.info(f"🧪 요청 결과: {dict(service.faults.counts)}")
+        server.stop(grace=1)
+
+
+if __name__ == "__main__":
+    main()
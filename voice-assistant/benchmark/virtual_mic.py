@@ -0,0 +1,110 @@
+"""
+가상 마이크: WAV 발화를 실제 마이크처럼 speech_recognition에 흘려보냄
+- sr.Microphone 대신 사용 (recognizer.adjust_for_ambient_noise / listen 그대로 동작)
+- 발화 사이에는 약한 잡음을 흘려 보정 단계가 실제 환경처럼 임계값을 잡도록 함
+- speed=1.0이면 실시간, 2.0이면 2배 빠르게 공급 (0이면 대기 없이 최대 속도)
+- 발화가 시작/끝난 시각(monotonic)을 기록 → 발화 끝 기준 종단 간 지연 계산에 사용
+"""
+
+import collections
+import threading
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+from audio_player import decode_wav, resample
+
+
+def load_utterance(path, sample_rate):
+    """WAV 파일 -> 마이크 샘플레이트의 int16 모노 샘플"""
+    with open(path, "rb") as f:
+        samples, source_rate = decode_wav(f.read())
+    return resample(samples, source_rate, sample_rate)
+
+
+class VirtualMicrophone(sr.AudioSource):
+    def __init__(self, sample_rate=16000, chunk_size=1024, speed=1.0, lead_seconds=2.0, noise_rms=30.0, seed=0):
+        """
+        :param lead_seconds: 마이크를 연 뒤 발화 전까지 흘려보낼 잡음 길이 (보정 1.5초 + 여유)
+        :param noise_rms: 발화 사이 배경 잡음 크기 (int16 기준)
+        """
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk_size
+        self.stream = None
+        self.speed = speed
+        self.lead_frames = int(lead_seconds * sample_rate)
+        self.noise_rms = noise_rms
+
+        self._rng = np.random.default_rng(seed)
+        self._pending = collections.deque()
+        self._lock = threading.Lock()
+        self.utterance_started = None
+        self.utterance_ended = None
+
+    def say(self, samples):
+        """다음에 마이크를 열면 lead_seconds 뒤에 재생할 발화 추가"""
+        with self._lock:
+            self._pending.append(np.asarray(samples, dtype=np.int16))
+
+    def __enter__(self):
+        self.stream = _VirtualStream(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+    def _noise(self, frames):
+        return (self._rng.standard_normal(frames) * self.noise_rms).astype(np.int16)
+
+    def _next_utterance(self):
+        with self._lock:
+            return self._pending.popleft() if self._pending else None
+
+
+class _VirtualStream:
+    def __init__(self, microphone):
+        self.microphone = microphone
+        self.frames_read = 0
+        self.current = None
+        self.offset = 0
+        self.spoken = False  # 마이크를 한 번 열 때마다 발화는 하나만
+        self.deadline = time.monotonic()
+
+    def read(self, size):
+        mic = self.microphone
+        block = mic._noise(size)
+        if self.current is None and not self.spoken and self.frames_read >= mic.lead_frames:
+            self.current = mic._next_utterance()
+            self.offset = 0
+            if self.current is not None:
+                mic.utterance_started, mic.utterance_ended = time.monotonic(), None
+
+        ended = False
+        if self.current is not None:
+            part = self.current[self.offset:self.offset + size]
+            block[:part.size] = part
+            self.offset += part.size
+            if self.offset >= self.current.size:
+                self.current, self.spoken, ended = None, True, True
+
+        self.frames_read += size
+        self._pace(size)
+        if ended:
+            mic.utterance_ended = time.monotonic()
+        return block.tobytes()
+
+    def _pace(self, size):
+        """실제 마이크처럼 size 프레임 분량의 시간이 지난 뒤 반환 (speed배 빠르게)"""
+        if self.microphone.speed <= 0:
+            return
+        self.deadline += size / self.microphone.SAMPLE_RATE / self.microphone.speed
+        delay = self.deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -0.5:
+            self.deadline = time.monotonic()  # 처리 지연으로 크게 밀렸으면 기준 시각 재설정
+
+    def close(self):
+        pass
@@ -0,0 +1,192 @@
+"""
+대화 기록 관리 (토큰 예산 + 오래된 대화 요약)
+- 최근 대화는 토큰 예산(CONVERSATION_TOKEN_BUDGET) 안에서 그대로 유지
+- 예산을 넘는 오래된 대화는 백그라운드 스레드에서 요약해 한 개의 system 메시지로 압축
+  (요약은 응답 경로 밖에서 실행, 요약이 끝날 때까지는 해당 대화를 프롬프트에서 제외, 실패하면 다음 대화 때 다시 시도.
+   계속 실패하면 CONVERSATION_PENDING_MAX_TOKENS를 넘는 오래된 대화는 요약 없이 버림)
+- 마지막 대화 후 CONVERSATION_IDLE_TIMEOUT 초가 지나면 새 세션으로 초기화
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+
+CONVERSATION_TOKEN_BUDGET = int(os.getenv("CONVERSATION_TOKEN_BUDGET", 600))
+CONVERSATION_SUMMARY_MAX_TOKENS = int(os.getenv("CONVERSATION_SUMMARY_MAX_TOKENS", 150))
+CONVERSATION_IDLE_TIMEOUT = float(os.getenv("CONVERSATION_IDLE_TIMEOUT", 300))
+# 요약 실패(API 장애 등)로 쌓인 대기 메시지 상한 → 넘으면 오래된 대화부터 요약 없이 버림
+CONVERSATION_PENDING_MAX_TOKENS = int(os.getenv("CONVERSATION_PENDING_MAX_TOKENS", 1200))
+
+# 메시지 하나당 role/구분자 오버헤드 (OpenAI chat 형식 기준)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = """
+다음은 사용자와 음성 비서의 이전 대화입니다.
+이후 대화에 필요한 사실(이름, 선호, 질문 주제, 약속 등)만 남겨 3문장 이내로 요약하세요.
+"""
+
+# tiktoken 인코더는 캐시에 없으면 처음 한 번 내려받으므로 import 시점이 아니라 처음 셀 때 백그라운드로 로드
+# (시작/응답 경로를 막지 않도록, 준비되기 전이나 tiktoken이 없으면 글자 수로 추정)
+_encoding = None
+_encoding_thread = None
+_encoding_lock = threading.Lock()
+
+
+def _load_encoding():
+    global _encoding
+    try:
+        import tiktoken
+        _encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logging.info(f"ℹ️ tiktoken 인코더 사용 불가, 토큰 수는 글자 수로 추정: {e}")
+
+
+def estimate_tokens(text):
+    # 보수적 추정 (한글은 대략 글자당 1토큰)
+    return math.ceil(sum(1 if ord(ch) > 127 else 0.25 for ch in text))
+
+
+def count_tokens(text):
+    global _encoding_thread
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding_thread is None:
+                _encoding_thread = threading.Thread(target=_load_encoding, name="tiktoken-load", daemon=True)
+                _encoding_thread.start()
+        return estimate_tokens(text)
+    return len(_encoding.encode(text))
+
+
+def message_tokens(message):
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+class ConversationMemory:
+    def __init__(self, summarize_fn, token_budget=CONVERSATION_TOKEN_BUDGET, idle_timeout=CONVERSATION_IDLE_TIMEOUT,
+                 pending_max_tokens=CONVERSATION_PENDING_MAX_TOKENS):
+        """
+        :param summarize_fn: (이전 요약, 요약할 메시지 목록) -> 새 요약 문자열. 백그라운드 스레드에서 호출됨
+        """
+        self.summarize_fn = summarize_fn
+        self.token_budget = token_budget
+        self.pending_max_tokens = pending_max_tokens
+        self.idle_timeout = idle_timeout
+
+        self.summary = ""
+        self.turns = []  # [{"role": ..., "content": ...}, ...]
+        self.evicted = []  # 요약 대기 중인 메시지
+        self.session = 0
+        self.last_active = time.monotonic()
+        self._summarizing = False
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.summary = ""
+            self.turns = []
+            self.evicted = []
+            self.session += 1
+        logging.info("🧹 대화 기록 초기화 (새 세션)")
+
+    def _check_idle(self):
+        if (self.turns or self.summary) and time.monotonic() - self.last_active > self.idle_timeout:
+            self.reset()
+
+    def build_messages(self, system_messages, user_input):
+        """
+        system 메시지 + 요약 + 최근 대화 + 현재 질문으로 GPT 메시지 목록 구성
+        """
+        self._check_idle()
+        with self._lock:
+            messages = list(system_messages)
+            if self.summary:
+                messages.append({"role": "system", "content": f"이전 대화 요약: {self.summary}"})
+            messages.extend(self.turns)
+        messages.append({"role": "user", "content": user_input})
+        return messages
+
+    def add_turn(self, user_input, assistant_response):
+        with self._lock:
+            self.turns.append({"role": "user", "content": user_input})
+            self.turns.append({"role": "assistant", "content": assistant_response})
+            self.last_active = time.monotonic()
+
+            used = sum(message_tokens(m) for m in self.turns)
+            while used > self.token_budget and len(self.turns) > 2:
+                # 질문/응답 쌍 단위로 오래된 대화부터 제외
+                for message in self.turns[:2]:
+                    used -= message_tokens(message)
+                self.evicted.extend(self.turns[:2])
+                del self.turns[:2]
+
+            start_summary = bool(self.evicted) and not self._summarizing
+            if start_summary:
+                self._summarizing = True
+
+        if start_summary:
+            threading.Thread(target=self._summarize_worker, daemon=True).start()
+
+    def prompt_tokens(self):
+        with self._lock:
+            tokens = sum(message_tokens(m) for m in self.turns)
+            if self.summary:
+                tokens += count_tokens(self.summary) + MESSAGE_OVERHEAD_TOKENS
+        return tokens
+
+    def _trim_evicted(self):
+        """self._lock 안에서 호출: 대기 메시지가 상한을 넘으면 오래된 질문/응답 쌍부터 버림"""
+        used = sum(message_tokens(m) for m in self.evicted)
+        dropped = 0
+        while used > self.pending_max_tokens and len(self.evicted) > 2:
+            for message in self.evicted[:2]:
+                used -= message_tokens(message)
+            del self.evicted[:2]
+            dropped += 2
+        if dropped:
+            logging.warning(f"⚠️ 대화 요약이 계속 실패해 오래된 메시지 {dropped}개를 요약 없이 버림")
+
+    def _summarize_worker(self):
+        while True:
+            with self._lock:
+                if not self.evicted:
+                    self._summarizing = False
+                    return
+                session = self.session
+                previous, batch = self.summary, self.evicted
+                self.evicted = []
+
+            start = time.monotonic()
+            try:
+                summary = self.summarize_fn(previous, batch)
+            except Exception as e:
+                logging.error(f"[ERROR] 대화 요약 실패: {e}")
+                summary = None
+
+            with self._lock:
+                if session != self.session:
+                    continue
+                if not summary:
+                    # 요약할 대화를 되돌려 두었다가 다음 대화 추가 때 다시 시도 (재시도 프롬프트가 끝없이 커지지 않도록 상한 적용)
+                    self.evicted = batch + self.evicted
+                    self._trim_evicted()
+                    self._summarizing = False
+                    return
+                self.summary = summary.strip()
+                logging.info(f"🗜️ 이전 대화 {len(batch)}개 메시지 요약 완료 ({time.monotonic() - start:.2f}초, "
+                             f"{count_tokens(self.summary)} 토큰)")
+
+
+def build_summary_messages(previous_summary, messages):
+    """summarize_fn 구현용: 요약 요청 메시지 구성"""
+    lines = []
+    if previous_summary:
+        lines.append(f"(기존 요약) {previous_summary}")
+    for message in messages:
+        speaker = "사용자" if message["role"] == "user" else "비서"
+        lines.append(f"{speaker}: {message['content']}")
+    return [
+        {"role": "system", "content": SUMMARY_PROMPT},
+        {"role": "user", "content": "\n".join(lines)},
+    ]
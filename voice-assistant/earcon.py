@@ -0,0 +1,167 @@
+"""
+응답 준비 중 알림음(earcon) / 채움말(filler) 재생
+- 발화 끝(endpoint)을 감지하면 메모리에 미리 만들어 둔 짧은 알림음을 바로 재생
+- FILLER_DELAY_SECONDS가 지나도 답이 준비되지 않으면 미리 합성해 둔 채움말("확인해 볼게요." 등) 중 하나를 재생
+- 답이 준비되면 아직 시작하지 않은 채움말은 취소, 이미 재생 중이면 끝까지 재생 후 답이 이어서 재생됨 (재생 큐 순서)
+- gate(MicrophoneGate)를 넘기면 알림음/채움말도 말하기 단계로 재생 → 파이프라인 모드의 듣기 단계가 새 질문으로 녹음하지 않음
+발화 끝 → 첫 소리(time-to-first-sound)와 발화 끝 → 답 시작(time-to-answer)을 따로 기록
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+from audio_player import decode_wav
+from metrics import metrics
+
+ACK_MODE = os.getenv("ACK_MODE", "both")  # off | earcon | filler | both
+FILLER_DELAY_SECONDS = float(os.getenv("FILLER_DELAY_SECONDS", 1.5))
+FILLER_PHRASES = [p.strip() for p in os.getenv("FILLER_PHRASES", "음, 잠시만요.|확인해 볼게요.|생각해 볼게요.").split("|")
+                  if p.strip()]
+EARCON_FILE = os.getenv("EARCON_FILE")
+
+
+def make_earcon(sample_rate, tones=(880.0, 1320.0), tone_seconds=0.07, volume=0.25):
+    """짧은 두 음 알림음 (앞뒤 fade로 클릭음 방지)"""
+    t = np.arange(int(sample_rate * tone_seconds)) / sample_rate
+    envelope = np.minimum(1.0, np.minimum(t, t[::-1]) / 0.01)
+    samples = np.concatenate([np.sin(2 * np.pi * freq * t) * envelope for freq in tones])
+    return (samples * volume * 32767).astype(np.int16)
+
+
+class Acknowledger:
+    def __init__(self, player, synthesize_fn=None, mode=ACK_MODE, filler_delay=FILLER_DELAY_SECONDS,
+                 phrases=FILLER_PHRASES, gate=None):
+        """
+        :param synthesize_fn: 문장 -> WAV 바이트 (채움말 사전 합성용)
+        :param gate: pipeline.MicrophoneGate (재생하는 동안 마이크를 듣기 단계에서 가져옴)
+        """
+        self.player = player
+        self.gate = gate
+        self.synthesize_fn = synthesize_fn
+        self.mode = mode
+        self.filler_delay = filler_delay
+        self.phrases = phrases
+
+        if EARCON_FILE:
+            with open(EARCON_FILE, "rb") as f:
+                self.earcon = decode_wav(f.read())
+        else:
+            self.earcon = (make_earcon(player.sample_rate), player.sample_rate)
+        self.fillers = []  # [(샘플, 샘플레이트)]
+
+        self._lock = threading.Lock()
+        self._timer = None
+        self._endpoint = None
+        self._first_sound = None
+        self.history = []  # [(첫 소리까지, 답까지)]
+
+    def warm_up(self, background=True):
+        """채움말을 미리 합성해 메모리에 보관 (TTS 캐시에도 저장됨)"""
+        if self.mode not in ("filler", "both") or self.synthesize_fn is None:
+            return
+
+        def _run():
+            for phrase in self.phrases:
+                try:
+                    self.fillers.append(decode_wav(self.synthesize_fn(phrase)))
+                except Exception as e:
+                    logging.warning(f"⚠️ 채움말 합성 실패 ({phrase}): {e}")
+            logging.info(f"🔔 채움말 {len(self.fillers)}개 준비 완료")
+
+        if background:
+            threading.Thread(target=_run, daemon=True).start()
+        else:
+            _run()
+
+    # ----------- 턴 진행 -----------
+    def start(self):
+        """발화 끝 감지 시 호출"""
+        if self.mode == "off":
+            return
+        with self._lock:
+            self._cancel_timer()
+            self._endpoint = endpoint = time.monotonic()
+            self._first_sound = None
+            if self.mode in ("filler", "both"):
+                self._timer = threading.Timer(self.filler_delay, self._play_filler)
+                self._timer.daemon = True
+                self._timer.start()
+        if self.mode in ("earcon", "both"):
+            self._play(self.earcon, lambda: self._endpoint == endpoint)
+
+    def _play(self, sound, still_wanted, background=True):
+        """
+        :param still_wanted: self._lock 안에서 호출, False면 재생하지 않음 (그 사이 답이 시작되었거나 턴이 끝남)
+        :param background: gate를 기다리는 동안 호출한 스레드를 막지 않도록 별도 스레드에서 재생
+        """
+        if self.gate is None:
+            self._play_now(sound, still_wanted)
+        elif background:
+            threading.Thread(target=self._play_gated, args=(sound, still_wanted), daemon=True).start()
+        else:
+            self._play_gated(sound, still_wanted)
+
+    def _play_gated(self, sound, still_wanted):
+        # 듣기 단계가 마이크를 닫은 뒤 재생하고, 소리가 끝날 때까지 다시 듣지 않도록 말하기 단계 유지
+        # (이미 필요 없는 소리 때문에 듣기를 중단시키지 않도록 먼저 확인, 마이크를 기다린 뒤 다시 확인)
+        with self._lock:
+            if not still_wanted():
+                return
+        self.gate.begin_speaking()
+        try:
+            if self._play_now(sound, still_wanted):
+                self.player.wait()
+        finally:
+            self.gate.end_speaking()
+
+    def _play_now(self, sound, still_wanted):
+        with self._lock:
+            if not still_wanted():
+                return False
+            samples, sample_rate = sound
+            self.player.play_pcm(samples, sample_rate)
+            if self._first_sound is None:
+                self._first_sound = time.monotonic()
+            return True
+
+    def _play_filler(self):
+        # finish()/cancel()/다음 start()가 타이머를 바꿨으면 이 채움말은 더 이상 필요 없음
+        timer = threading.current_thread()
+        if self.fillers:
+            self._play(random.choice(self.fillers), lambda: self._timer is timer, background=False)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def finish(self):
+        """
+        답 재생 직전에 호출: 대기 중인 채움말 취소
+        :return: 발화 끝 이후 경과 시간 (start()가 없었으면 None)
+        """
+        with self._lock:
+            self._cancel_timer()
+            endpoint, first_sound = self._endpoint, self._first_sound
+            self._endpoint = None
+        if endpoint is None:
+            return None
+        now = time.monotonic()
+        answer = now - endpoint
+        first = (first_sound or now) - endpoint
+        self.history.append((first, answer))
+        metrics.observe("time_to_first_sound", first, start=endpoint)
+        metrics.observe("time_to_answer", answer, start=endpoint)
+        logging.info(f"🔔 발화 끝 → 첫 소리 {first:.3f}초 / 답 시작 {answer:.3f}초")
+        return answer
+
+    def cancel(self):
+        """답 없이 턴이 끝난 경우 (STT 실패, Wake Word 처리 등)"""
+        with self._lock:
+            self._cancel_timer()
+            self._endpoint = None
@@ -0,0 +1,221 @@
+"""
+로컬 FAQ 지식 베이스 (BM25 검색)
+로봇/행사장 관련 자주 묻는 질문을 Markdown 또는 CSV 파일에서 읽어 시작 시 인덱스 생성
+- 높은 점수: GPT 호출 없이 바로 답변
+- 중간 점수: 짧은 참고 문맥으로 GPT에 전달 (SYSTEM_PROMPT에 넣지 않음)
+
+Markdown 형식:
+    ## 질문 (여러 표현은 | 로 구분)
+    답변 문장
+
+CSV 형식 (헤더 필수): question,answer
+"""
+
+import csv
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+
+FAQ_PATH = os.getenv("FAQ_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge", "faq.md"))
+FAQ_ANSWER_THRESHOLD = float(os.getenv("FAQ_ANSWER_THRESHOLD", 0.75))
+FAQ_CONTEXT_THRESHOLD = float(os.getenv("FAQ_CONTEXT_THRESHOLD", 0.3))
+FAQ_CONTEXT_MAX_CHARS = int(os.getenv("FAQ_CONTEXT_MAX_CHARS", 200))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_PATTERN = re.compile(r"[0-9A-Za-z가-힣]+")
+_STOPWORDS = {"뭐야", "알려줘", "어디", "있어", "있나요", "인가요", "해줘", "좀", "혹시"}
+
+
+def tokenize(text):
+    """
+    한국어는 형태소 분석기 없이 어절 + 글자 bigram으로 토큰화
+    ("나로봇은" / "나로봇이" 같은 조사 변형도 bigram이 겹쳐 매칭됨)
+    """
+    tokens = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        if word in _STOPWORDS:
+            continue
+        tokens.append(word)
+        if len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+# ----------- 지식 파일 로드 -----------
+def load_entries(path):
+    if path.endswith(".csv"):
+        with open(path, encoding="utf-8", newline="") as f:
+            return [(row["question"].strip(), row["answer"].strip()) for row in csv.DictReader(f)
+                    if row.get("question") and row.get("answer")]
+
+    entries = []
+    question, answer_lines = None, []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("## "):
+                if question and answer_lines:
+                    entries.append((question, " ".join(answer_lines)))
+                question, answer_lines = line[3:].strip(), []
+            elif line and question and not line.startswith("#"):
+                answer_lines.append(line)
+    if question and answer_lines:
+        entries.append((question, " ".join(answer_lines)))
+    return entries
+
+
+class FAQIndex:
+    def __init__(self, entries):
+        # "질문1 | 질문2" 형태의 여러 표현은 각각 별도 문서로 색인 (같은 답변을 가리킴)
+        self.questions = []
+        self.answers = []
+        for question, answer in entries:
+            for variant in question.split("|"):
+                if variant.strip():
+                    self.questions.append(variant.strip())
+                    self.answers.append(answer)
+
+        self.doc_lengths = []
+        self.postings = {}
+        for doc_id, question in enumerate(self.questions):
+            tokens = tokenize(question)
+            self.doc_lengths.append(len(tokens))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                self.postings.setdefault(token, []).append([doc_id, tf])
+        self._finalize()
+
+    def _finalize(self):
+        n = len(self.doc_lengths)
+        self.avg_length = (sum(self.doc_lengths) / n) if n else 0.0
+        self.idf = {token: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                    for token, docs in self.postings.items()}
+        self.max_idf = math.log(1 + (n + 0.5) / 0.5) if n else 0.0
+
+    # ----------- 압축 저장 / 로드 (gzip JSON) -----------
+    def save(self, path, source_hash):
+        data = {
+            "source_hash": source_hash,
+            "questions": self.questions,
+            "answers": self.answers,
+            "doc_lengths": self.doc_lengths,
+            "postings": self.postings,
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path, source_hash):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("source_hash") != source_hash:
+            return None
+        index = cls.__new__(cls)
+        index.questions = data["questions"]
+        index.answers = data["answers"]
+        index.doc_lengths = data["doc_lengths"]
+        index.postings = data["postings"]
+        index._finalize()
+        return index
+
+    def search(self, query, top_k=1):
+        """
+        BM25 점수를 "질문과 완전히 같은 문서"의 점수(≈ 질의 토큰 idf 합)로 나눠 0~1 범위로 정규화
+        :return: [(정규화 점수, 질문, 답변), ...]
+        """
+        tokens = tokenize(query)
+        if not tokens or not self.doc_lengths:
+            return []
+
+        scores = {}
+        for token in tokens:
+            for doc_id, tf in self.postings.get(token, ()):
+                norm = 1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / self.avg_length
+                scores[doc_id] = scores.get(doc_id, 0.0) + self.idf[token] * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+
+        upper = sum(self.idf.get(token, self.max_idf) for token in tokens)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [(min(1.0, score / upper), self.questions[doc_id], self.answers[doc_id]) for doc_id, score in ranked]
+
+
+class FAQRetriever:
+    def __init__(self, path=FAQ_PATH, answer_threshold=FAQ_ANSWER_THRESHOLD, context_threshold=FAQ_CONTEXT_THRESHOLD):
+        self.answer_threshold = answer_threshold
+        self.context_threshold = context_threshold
+        self.index = self._build(path)
+        self.direct_hits = 0
+        self.context_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _build(path):
+        if not os.path.exists(path):
+            logging.warning(f"⚠️ FAQ 파일이 없습니다: {path}")
+            return None
+
+        with open(path, "rb") as f:
+            source_hash = hashlib.sha1(f.read()).hexdigest()
+        cache_path = os.path.splitext(path)[0] + ".index.json.gz"
+
+        try:
+            if os.path.exists(cache_path):
+                index = FAQIndex.load(cache_path, source_hash)
+                if index is not None:
+                    logging.info(f"📚 FAQ 인덱스 로드 ({len(index.questions)}개 질문, 캐시)")
+                    return index
+        except Exception as e:
+            logging.warning(f"⚠️ FAQ 인덱스 캐시 로드 실패, 다시 생성합니다: {e}")
+
+        try:
+            index = FAQIndex(load_entries(path))
+        except Exception as e:
+            logging.error(f"[ERROR] FAQ 인덱스 생성 실패: {e}")
+            return None
+        logging.info(f"📚 FAQ 인덱스 생성 ({len(index.questions)}개 질문)")
+
+        # 캐시 저장 실패(읽기 전용 디렉터리 등)는 다음 실행 속도에만 영향 → 메모리 인덱스는 그대로 사용
+        try:
+            index.save(cache_path, source_hash)
+        except Exception as e:
+            logging.warning(f"⚠️ FAQ 인덱스 캐시 저장 실패 (이번 실행은 메모리 인덱스 사용): {e}")
+        return index
+
+    def lookup(self, query, record=True):
+        """
+        :param record: False면 통계/로그를 남기지 않음 (선행 요청 등 미리 확인하는 용도)
+        :return: (바로 답변할 문장 또는 None, GPT에 넘길 참고 문맥 또는 None)
+        """
+        if self.index is None:
+            return None, None
+
+        results = self.index.search(query, top_k=2)
+        if not results or results[0][0] < self.context_threshold:
+            if record:
+                self.misses += 1
+            return None, None
+
+        score, question, answer = results[0]
+        if score >= self.answer_threshold:
+            if record:
+                self.direct_hits += 1
+                logging.info(f"📚 FAQ 직접 답변 ({score:.2f}): {question}")
+            return answer, None
+
+        if record:
+            self.context_hits += 1
+        answers = []
+        for s, _, a in results:
+            if s >= self.context_threshold and a not in answers:
+                answers.append(a)
+        context = " ".join(answers)[:FAQ_CONTEXT_MAX_CHARS]
+        if record:
+            logging.info(f"📚 FAQ 참고 문맥 전달 ({score:.2f}): {question}")
+        return None, context
@@ -9,17 +9,15 @@ GPT: GPT-4o
 import logging
 import multiprocessing
 import os
-import platform
-import subprocess
 import sys
-import time
 import timeit
 
-import openai
 import speech_recognition as sr
-import whisper
 from dotenv import load_dotenv
-from google.cloud import texttospeech
+
+from audio_player import AudioPlayer
+from lazy_loader import LazyResource, startup
+from tts_cache import default_cache
 
 # ----------- 로그 설정 -----------
 logging.basicConfig(
@@ -33,14 +31,45 @@ logging.basicConfig(
 
 # ----------- 환경 설정 및 초기화 -----------
 load_dotenv()
-whisper_model = whisper.load_model("base")
 sys.stderr = open(os.devnull, 'w')
 
-# GPT API 키 설정
-openai.api_key = os.getenv("OPENAI_API_KEY")
 TTS_SPEAKING_RATE = float(os.getenv("TTS_SPEAKING_RATE", 1.0))
 TTS_VOICE = os.getenv("TTS_VOICE", "ko-KR-Standard-A")
 
+
+# 마이크를 먼저 열고, Whisper / openai / Google Cloud TTS는 백그라운드에서 로드 (처음 사용할 때 준비되지 않았으면 대기)
+def load_whisper():
+    import whisper
+
+    return whisper.load_model("base")
+
+
+def load_llm_client():
+    import openai
+
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    return openai
+
+
+def load_tts_engine():
+    from tts_engine import GoogleTTSEngine
+
+    # Google Cloud TTS 엔진 (클라이언트 1회 생성 + 오디오 캐시), 사전 연결까지 끝낸 뒤 준비 완료
+    engine = GoogleTTSEngine(TTS_VOICE, TTS_SPEAKING_RATE, cache=default_cache())
+    engine.warm_up(background=False)
+    return engine
+
+
+whisper_model = LazyResource("whisper", load_whisper)
+llm_client = LazyResource("llm", load_llm_client)
+tts_engine = LazyResource("tts", load_tts_engine)
+
+
+def start_background_loading():
+    for resource in (whisper_model, tts_engine, llm_client):
+        resource.start()
+
+
 SYSTEM_PROMPT = """
 당신은 사용자의 음성 비서를 담당하는 AI입니다.
 당신의 이름은 나로봇입니다.
@@ -97,6 +126,8 @@ def transcribe_audio_to_text(audio_data, timeout=5):
         with open(temp_filename, "wb") as f:
             f.write(audio_data.get_wav_data(convert_rate=16000, convert_width=2))
 
+        # fork 전에 모델이 메모리에 올라와 있어야 STT 프로세스가 그대로 사용 (로드 중이면 여기서만 대기)
+        whisper_model.get()
         result_queue = multiprocessing.Queue()
         p = multiprocessing.Process(target=whisper_stt_worker, args=(temp_filename, result_queue))
         p.start()
@@ -139,6 +170,7 @@ def handle_audio_input():
         try:
             with microphone as source:
                 recognizer.adjust_for_ambient_noise(source, duration=1.5)
+                startup.mark("마이크 준비")
                 logging.info("🎙 질문을 듣는 중...")
                 audio = recognizer.listen(source, timeout=None)
             return audio
@@ -152,7 +184,7 @@ def handle_audio_input():
 def generate_response(user_input):
     try:
         logging.info("GPT 응답 생성 중...")
-        response = openai.ChatCompletion.create(
+        response = llm_client.ChatCompletion.create(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
@@ -169,46 +201,16 @@ def generate_response(user_input):
         return None
 
 
+# ----------- 재생 엔진 -----------
+audio_player = AudioPlayer()
+
+
 # ----------- Google Cloud TTS 음성 출력 함수 -----------
 def speak_text(text):
     try:
-        timestamp = int(time.time())
-        wav_file = f"tts_{timestamp}.wav"
-
-        logging.info("[INFO] Google Cloud TTS 클라이언트 초기화 시도 중...")
-        client = texttospeech.TextToSpeechClient()
-        logging.info("[INFO] 클라이언트 초기화 완료")
-
-        client = texttospeech.TextToSpeechClient()
-
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="ko-KR",
-            name=TTS_VOICE,
-            ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
-        )
-
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.LINEAR16,
-            speaking_rate=TTS_SPEAKING_RATE
-        )
-
-        response = client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
-
-        with open(wav_file, "wb") as out:
-            out.write(response.audio_content)
-
-        if platform.system() == "Darwin":
-            subprocess.run(["afplay", wav_file])
-        else:
-            subprocess.run(["aplay", wav_file])
-
-        os.remove(wav_file)
+        audio_content = tts_engine.synthesize(text)
+        audio_player.play_wav(audio_content)
+        audio_player.wait()
 
     except Exception as e:
         logging.error(f"[ERROR] 음성 출력 실패: {e}")
@@ -217,6 +219,9 @@ def speak_text(text):
 # ----------- Main -----------
 
 def main():
+    startup.expect("마이크 준비")
+    startup.mark("import 완료")
+    start_background_loading()
     while True:
         try:
             audio_data = handle_audio_input()
@@ -0,0 +1,196 @@
+"""
+로컬 의도(Intent) 라우터
+시간/날짜/이름/볼륨/말하기 속도처럼 결정적인 질문은 GPT 호출 없이 로컬에서 바로 답변
+규칙(정규식) 점수가 임계값보다 낮으면 None을 반환해 GPT로 넘김
+"""
+
+import datetime
+import logging
+import os
+import re
+import threading
+
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", 0.6))
+
+WEEKDAYS = ["월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일"]
+
+# 문장 끝 어미/조사 제거용 (점수 계산 시 "남은 글자 수" 비교에 사용)
+_FILLER_PATTERN = re.compile(r"[\s\.\?\!,~]|지금|혹시|좀|알려줘|알려\s*줄래|말해줘|뭐야|몇\s*시야|이야|예요|에요|나요|니|요")
+
+
+class Intent:
+    def __init__(self, name, patterns, handler, weight=1.0):
+        self.name = name
+        self.patterns = [re.compile(p) for p in patterns]
+        self.handler = handler
+        self.weight = weight
+
+    def score(self, text):
+        """
+        패턴 일치 여부 + 발화 중 패턴이 차지하는 비율로 0~1 점수 계산
+        "지금 몇 시야" 처럼 짧은 발화는 높게, "몇 시에 회의가 있었는지 기억나?" 처럼 긴 문장은 낮게
+        """
+        best = None
+        for pattern in self.patterns:
+            match = pattern.search(text)
+            if match and (best is None or len(match.group(0)) > len(best.group(0))):
+                best = match
+        if best is None:
+            return 0.0, None
+
+        rest = _FILLER_PATTERN.sub("", text[:best.start()] + text[best.end():])
+        core = len(_FILLER_PATTERN.sub("", best.group(0))) or 1
+        coverage = core / (core + len(rest))
+        return min(1.0, (0.5 + 0.5 * coverage) * self.weight), best
+
+
+class IntentRouter:
+    def __init__(self, threshold=INTENT_CONFIDENCE_THRESHOLD):
+        self.threshold = threshold
+        self.intents = []
+        self.local_turns = 0
+        self.fallback_turns = 0
+        self.intent_counts = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, patterns, handler, weight=1.0):
+        self.intents.append(Intent(name, patterns, handler, weight))
+
+    def match(self, text):
+        """
+        가장 점수가 높은 의도 (핸들러 실행/카운터 갱신 없음)
+        :return: (Intent 또는 None, 점수, 정규식 match)
+        """
+        best_intent, best_score, best_match = None, 0.0, None
+        for intent in self.intents:
+            score, match = intent.score(text)
+            if score > best_score:
+                best_intent, best_score, best_match = intent, score, match
+        return best_intent, best_score, best_match
+
+    def can_handle(self, text):
+        intent, score, _ = self.match(text.strip())
+        return intent is not None and score >= self.threshold
+
+    def route(self, text):
+        """
+        로컬에서 처리 가능한 발화면 응답 문자열을, 아니면 None을 반환
+        """
+        text = text.strip()
+        best_intent, best_score, best_match = self.match(text)
+
+        if best_intent is None or best_score < self.threshold:
+            with self._lock:
+                self.fallback_turns += 1
+            if best_intent is not None:
+                logging.info(f"↪️ 로컬 의도 점수 부족 ({best_intent.name}: {best_score:.2f}) → GPT 사용")
+            return None
+
+        try:
+            response = best_intent.handler(text, best_match)
+        except Exception as e:
+            logging.error(f"[ERROR] 로컬 의도 처리 실패 ({best_intent.name}): {e}")
+            response = None
+
+        with self._lock:
+            if response:
+                self.local_turns += 1
+                self.intent_counts[best_intent.name] = self.intent_counts.get(best_intent.name, 0) + 1
+            else:
+                self.fallback_turns += 1
+
+        if response:
+            logging.info(f"⚡ 로컬 의도 처리: {best_intent.name} ({best_score:.2f}) | {self.stats_summary()}")
+        return response
+
+    def stats(self):
+        with self._lock:
+            total = self.local_turns + self.fallback_turns
+            return {
+                "local_turns": self.local_turns,
+                "fallback_turns": self.fallback_turns,
+                "local_ratio": self.local_turns / total if total else 0.0,
+                "intents": dict(self.intent_counts),
+            }
+
+    def stats_summary(self):
+        s = self.stats()
+        return f"로컬 {s['local_turns']}회 / GPT {s['fallback_turns']}회 ({s['local_ratio'] * 100:.0f}%)"
+
+
+# ----------- 기본 의도 핸들러 -----------
+def _time_handler(text, match):
+    now = datetime.datetime.now()
+    period = "오전" if now.hour < 12 else "오후"
+    hour = now.hour % 12 or 12
+    return f"지금은 {period} {hour}시 {now.minute}분입니다."
+
+
+def _date_handler(text, match):
+    today = datetime.date.today()
+    if "내일" in text:
+        today += datetime.timedelta(days=1)
+        label = "내일은"
+    elif "어제" in text:
+        today -= datetime.timedelta(days=1)
+        label = "어제는"
+    else:
+        label = "오늘은"
+    if "요일" in text and "며칠" not in text and "날짜" not in text:
+        return f"{label} {WEEKDAYS[today.weekday()]}입니다."
+    return f"{label} {today.month}월 {today.day}일 {WEEKDAYS[today.weekday()]}입니다."
+
+
+def _parse_level(text):
+    number = re.search(r"(\d+)", text)
+    if number:
+        return int(number.group(1))
+    return None
+
+
+def build_default_router(robot_name="나로봇", on_volume=None, on_speed=None, threshold=INTENT_CONFIDENCE_THRESHOLD):
+    """
+    기본 의도(시간, 날짜, 이름, 볼륨, 속도)를 등록한 라우터 생성
+    :param on_volume: 볼륨 변경 콜백 (delta:int 또는 level:int, absolute:bool) -> 변경 후 볼륨(%)
+    :param on_speed: 말하기 속도 변경 콜백 (delta:float) -> 변경 후 속도
+    """
+    router = IntentRouter(threshold=threshold)
+
+    # "몇 시간 걸려?", "몇 시에 시작해?", "몇 시까지 해?"처럼 현재 시각을 묻지 않는 질문은 제외 ("몇 시에요"는 포함)
+    router.register("time", [r"몇\s*시(?!\s*간)(?!\s*에(?!\s*요))(?!\s*(부터|까지|쯤\s*에))", r"지금\s*시간",
+                             r"시간\s*(좀\s*)?(알려|말해)", r"현재\s*시각"], _time_handler)
+    # "며칠 전에 뭐 했어?", "며칠 동안 해?"처럼 기간을 묻는 질문은 제외
+    router.register("date", [r"며칠(?!\s*(전|후|뒤|동안|간|째|씩|만에|걸려))", r"무슨\s*요일", r"(오늘|내일|어제)\s*(이\s*)?(날짜|요일)", r"날짜\s*(좀\s*)?(알려|말해)"],
+                    _date_handler)
+    # "너 누구 만났어?"처럼 누구가 목적어인 질문은 제외 (문장 끝이 "누구(야/니/세요)"일 때만)
+    router.register("name", [r"(너|네|당신)\s*(의\s*)?이름", r"(너|당신)\s*(는|은)?\s*누구(야|니|세요|예요|에요|지)?\s*[\?\.\!~]*\s*$",
+                             r"이름이\s*뭐"],
+                    lambda text, match: f"제 이름은 {robot_name}입니다.")
+
+    if on_volume:
+        def _volume_handler(text, match):
+            level = _parse_level(text)
+            if level is not None:
+                current = on_volume(level, True)
+            elif re.search(r"키워|올려|크게", text):
+                current = on_volume(10, False)
+            else:
+                current = on_volume(-10, False)
+            return f"볼륨을 {current}퍼센트로 맞췄습니다." if current is not None else None
+
+        router.register("volume", [r"(볼륨|소리|음량)\s*(좀\s*)?(키워|올려|크게|줄여|내려|작게)",
+                                   r"(볼륨|소리|음량)\s*(을\s*)?\d+\s*(퍼센트|%)?\s*(으?로)?\s*(해|맞춰|바꿔)"],
+                        _volume_handler)
+
+    if on_speed:
+        def _speed_handler(text, match):
+            if re.search(r"빠르게|빨리", text):
+                current = on_speed(0.1)
+            else:
+                current = on_speed(-0.1)
+            return f"말하기 속도를 {current:.1f}배로 바꿨습니다." if current is not None else None
+
+        router.register("speed", [r"(좀\s*)?(더\s*)?(빠르게|빨리|천천히|느리게)\s*(말해|얘기해|이야기해)"],
+                        _speed_handler)
+
+    return router
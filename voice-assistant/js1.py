@@ -7,21 +7,24 @@ GPT: GPT-4o
 """
 
 import ctypes  # ALSA 에러 숨김용
+import io
 import logging
 import os
-import subprocess
 import sys
 import time
 import timeit
 import wave
 
 import alsaaudio
-import openai
 import serial  # 시리얼
-import whisper
 from dotenv import load_dotenv
 from gtts import gTTS
 
+from audio_player import AudioPlayer
+from lazy_loader import LazyResource, startup
+from time_stretch import stretch_mp3_to_wav
+from tts_cache import default_cache
+
 # ALSA 에러 로그 숨기기
 asound = ctypes.cdll.LoadLibrary('libasound.so')
 asound.snd_lib_error_set_handler(None)
@@ -38,15 +41,37 @@ logging.basicConfig(
 
 # ----------- 환경 설정 및 초기화 -----------
 load_dotenv()
-whisper_model = whisper.load_model("base")
 os.environ["DISPLAY"] = ""  # xcb error 메세지 제거용 코드
 sys.stderr = open(os.devnull, 'w')
 
-# GPT API 키 설정
-openai.api_key = os.getenv("OPENAI_API_KEY")
-if openai.api_key is None:
+# GPT API 키 확인 (키 설정은 openai 모듈을 로드할 때)
+if os.getenv("OPENAI_API_KEY") is None:
     raise ValueError("[ERROR] API 키가 설정되지 않았습니다. .env 파일을 확인하세요.")
 
+
+# 마이크를 먼저 열고, Whisper와 openai는 백그라운드에서 로드 (처음 사용할 때 준비되지 않았으면 대기)
+def load_whisper():
+    import whisper
+
+    return whisper.load_model("base")  # STT 모델 로드
+
+
+def load_llm_client():
+    import openai
+
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    return openai
+
+
+whisper_model = LazyResource("whisper", load_whisper)
+llm_client = LazyResource("llm", load_llm_client)
+
+
+def start_background_loading():
+    for resource in (whisper_model, llm_client):
+        resource.start()
+
+
 SYSTEM_PROMPT = """
 당신은 사용자의 음성 비서를 담당하는 AI입니다.
 당신의 이름은 나로봇입니다.
@@ -58,33 +83,27 @@ SYSTEM_PROMPT = """
 """
 
 
-# ----------- TTS (gTTS + ffmpeg + mpg123) -----------
+# ----------- TTS (gTTS + WSOLA 속도 조절 + 재생 엔진) -----------
 
-def speak_text(text, speed=1.3):
-    try:
-        timestamp = int(time.time())
-        mp3_file = f"tts_{timestamp}.mp3"
-        wav_file = f"tts_{timestamp}.wav"
+tts_cache = default_cache()
+# WM8960 (card 3)
+audio_player = AudioPlayer(sample_rate=44100, device=os.getenv("PLAYBACK_DEVICE", "hw:3,0"), channels=2)
 
-        # 1. gTTS 음성 생성
-        tts = gTTS(text=text, lang='ko')
-        tts.save(mp3_file)
 
-        # 2. ffmpeg로 mp3 → wav 변환 + 속도 조절
-        subprocess.run([
-            "ffmpeg", "-y", "-i", mp3_file,
-            "-filter:a", f"atempo={speed}",
-            "-ar", "44100", "-ac", "2", "-f", "wav",
-            wav_file
-        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+def synthesize_gtts(text, speed):
+    # 1. gTTS 음성 생성 (메모리) + 2. 재생 속도 조절 (WSOLA, 프로세스 내부)
+    mp3 = io.BytesIO()
+    gTTS(text=text, lang='ko').write_to_fp(mp3)
+    return stretch_mp3_to_wav(mp3.getvalue(), speed)
 
-        # 3. ALSA (aplay) 로 재생 - WM8960 (card 3)
-        subprocess.run(["aplay", "-D", "hw:3,0", wav_file], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
-        # 4. 임시 파일 삭제
-        os.remove(mp3_file)
-        os.remove(wav_file)
+def speak_text(text, speed=1.3):
+    try:
+        audio = tts_cache.get_or_synthesize(text, "gtts-wsola-wav", "ko", speed, lambda: synthesize_gtts(text, speed))
 
+        # 3. 재생 엔진으로 바로 재생
+        audio_player.play_wav(audio)
+        audio_player.wait()
     except Exception as e:
         logging.error(f"[ERROR] 음성 출력 실패: {e}")
 
@@ -143,6 +162,7 @@ def handle_audio_input():
     try:
         inp = alsaaudio.PCM(alsaaudio.PCM_CAPTURE, alsaaudio.PCM_NONBLOCK, channels=channels, rate=rate, format=format,
                             periodsize=periodsize, device=device)
+        startup.mark("마이크 준비")
         temp_filename = "temp.wav"
 
         wf = wave.open(temp_filename, 'wb')
@@ -183,7 +203,7 @@ def process_wake_word(text):
 def generate_response(user_input):
     try:
         logging.info("GPT 응답 생성 중...")
-        response = openai.ChatCompletion.create(
+        response = llm_client.ChatCompletion.create(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
@@ -203,6 +223,9 @@ def generate_response(user_input):
 # ----------- Main -----------
 
 def main():
+    startup.expect("마이크 준비")
+    startup.mark("import 완료")
+    start_background_loading()
     while True:
         try:
             audio_file = handle_audio_input()
@@ -7,20 +7,23 @@ GPT: GPT-4o
 """
 
 import ctypes  # ALSA 에러 숨김용
+import io
 import logging
 import os
-import subprocess
 import sys
-import time
 import timeit
 
-import openai
 import serial
 import speech_recognition as sr
-import whisper
 from dotenv import load_dotenv
 from gtts import gTTS
 
+from audio_player import AudioPlayer
+from lazy_loader import LazyResource, startup
+from metrics import metrics
+from time_stretch import stretch_mp3_to_wav
+from tts_cache import default_cache
+
 # ----------- 로그 설정 -----------
 logging.basicConfig(
     level=logging.INFO,
@@ -35,7 +38,6 @@ logging.basicConfig(
 print(sr.Microphone.list_microphone_names())
 
 load_dotenv()
-whisper_model = whisper.load_model("base")  # STT 모델 로드
 
 # error 메세지 제거용 코드
 sys.stderr = open(os.devnull, 'w')  # Python 레벨 stderr
@@ -51,11 +53,34 @@ os.environ["JACK_NO_START_SERVER"] = "1"  # JACK 서버 연결 무시
 os.environ["PULSE_SERVER"] = ""  # PulseAudio 경로 무효화
 os.environ["DISPLAY"] = ""  # X 관련 경고 억제
 
-# GPT API 키 설정
-openai.api_key = os.getenv("OPENAI_API_KEY")
-if openai.api_key is None:
+# GPT API 키 확인 (키 설정은 openai 모듈을 로드할 때)
+if os.getenv("OPENAI_API_KEY") is None:
     raise ValueError("[ERROR] API 키가 설정되지 않았습니다. .env 파일을 확인하세요.")
 
+
+# 마이크를 먼저 열고, Whisper와 openai는 백그라운드에서 로드 (처음 사용할 때 준비되지 않았으면 대기)
+def load_whisper():
+    import whisper
+
+    return whisper.load_model("base")  # STT 모델 로드
+
+
+def load_llm_client():
+    import openai
+
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    return openai
+
+
+whisper_model = LazyResource("whisper", load_whisper)
+llm_client = LazyResource("llm", load_llm_client)
+
+
+def start_background_loading():
+    for resource in (whisper_model, llm_client):
+        resource.start()
+
+
 SYSTEM_PROMPT = """
 당신은 사용자의 음성 비서를 담당하는 AI입니다.
 당신의 이름은 나로봇입니다.
@@ -67,31 +92,29 @@ SYSTEM_PROMPT = """
 """
 
 
-# ----------- TTS (gTTS + ffmpeg + mpg123) -----------
+# ----------- TTS (gTTS + WSOLA 속도 조절 + 재생 엔진) -----------
+
+tts_cache = default_cache()
+audio_player = AudioPlayer()
 
-def speak_text(text, speed=1.3):
-    try:
-        timestamp = int(time.time())
-        original = f"tts_{timestamp}.mp3"
-        adjusted = f"tts_{timestamp}_fast.mp3"
 
-        # 1. gTTS 음성 생성
-        tts = gTTS(text=text, lang='ko')
-        tts.save(original)
+def synthesize_gtts(text, speed):
+    # 1. gTTS 음성 생성 (메모리) + 2. 재생 속도 조절 (WSOLA, 프로세스 내부)
+    mp3 = io.BytesIO()
+    gTTS(text=text, lang='ko').write_to_fp(mp3)
+    return stretch_mp3_to_wav(mp3.getvalue(), speed)
 
-        # 2. ffmpeg로 재생 속도 조절
-        subprocess.run([
-            "ffmpeg", "-y", "-i", original,
-            "-filter:a", f"atempo={speed}",
-            adjusted
-        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
-        # 3. mpg123로 mp3 재생
-        subprocess.run(["mpg123", adjusted], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+def speak_text(text, speed=1.3):
+    try:
+        with metrics.time("tts_synthesis", engine="gtts-wsola-wav", chars=len(text)):
+            audio = tts_cache.get_or_synthesize(text, "gtts-wsola-wav", "ko", speed,
+                                                lambda: synthesize_gtts(text, speed))
 
-        # 4. 임시 파일 삭제
-        os.remove(original)
-        os.remove(adjusted)
+        # 3. 재생 엔진으로 바로 재생
+        with metrics.time("playback", chars=len(text)):
+            audio_player.play_wav(audio)
+            audio_player.wait()
 
         logging.info(f"🗣️ 음성 출력 (1.3x): {text}")
     except Exception as e:
@@ -134,10 +157,12 @@ def transcribe_audio_to_text(audio_data):
     temp_filename = "temp.wav"
     try:
         logging.info("🔄 오디오 데이터 처리 중...")
-        with open(temp_filename, "wb") as f:
-            f.write(audio_data.get_wav_data(convert_rate=16000, convert_width=2))
+        with metrics.time("wav_encode"):
+            with open(temp_filename, "wb") as f:
+                f.write(audio_data.get_wav_data(convert_rate=16000, convert_width=2))
 
-        result = whisper_model.transcribe(temp_filename, language="ko", fp16=False, beam_size=1, best_of=1)
+        with metrics.time("stt", model="base"):
+            result = whisper_model.transcribe(temp_filename, language="ko", fp16=False, beam_size=1, best_of=1)
         text = result.get("text", "").strip()
         logging.info(f"📝 변환된 텍스트: {text}")
         return text
@@ -163,9 +188,12 @@ def handle_audio_input():
     while True:
         try:
             with microphone as source:
-                recognizer.adjust_for_ambient_noise(source, duration=1.5)
+                with metrics.time("calibration"):
+                    recognizer.adjust_for_ambient_noise(source, duration=1.5)
+                startup.mark("마이크 준비")
                 logging.info("🎙 질문을 듣는 중...")
-                audio = recognizer.listen(source, timeout=3)
+                with metrics.time("listen"):
+                    audio = recognizer.listen(source, timeout=3)
             return audio
         except sr.UnknownValueError:
             logging.warning("⚠️ 음성을 이해하지 못했습니다. 다시 말씀해주세요.")
@@ -188,15 +216,16 @@ def process_wake_word(text):
 def generate_response(user_input):
     try:
         logging.info("GPT 응답 생성 중...")
-        response = openai.ChatCompletion.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_input},
-            ],
-            max_tokens=256,
-            temperature=0.5,
-        )
+        with metrics.time("llm_request", model="gpt-4o"):
+            response = llm_client.ChatCompletion.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_input},
+                ],
+                max_tokens=256,
+                temperature=0.5,
+            )
         assistant_response = response["choices"][0]["message"]["content"].strip()
         logging.info(f"🤖 GPT 응답: {assistant_response}")
         return assistant_response
@@ -208,6 +237,10 @@ def generate_response(user_input):
 # ----------- Main -----------
 
 def main():
+    startup.expect("마이크 준비")
+    startup.mark("import 완료")
+    start_background_loading()
+    metrics.start()
     while True:
         try:
             audio_data = handle_audio_input()
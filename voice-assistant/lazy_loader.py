@@ -0,0 +1,184 @@
+"""
+단계적 시작 (무거운 모델/클라이언트는 백그라운드 스레드에서 로드)
+- LazyResource: 로더 함수를 별도 스레드에서 실행하고 준비 완료 신호(Event)를 제공
+  속성에 접근하면 준비될 때까지 기다렸다가 실제 객체로 전달 → 기존 코드(whisper_model.transcribe 등) 그대로 사용
+  → 마이크는 바로 열고, 질문이 일찍 들어오면 그 단계에 필요한 자원만 기다림 (STT는 Whisper, GPT는 LLM 클라이언트)
+- 로드가 실패하면 다음 사용 시 다시 로드 (프로그램 재시작 없이 복구)
+- StartupProfile: 프로세스 시작 기준으로 import 완료, 마이크 준비, 자원별 로드 구간을 모아 한 줄로 로그
+"""
+
+import collections
+import logging
+import os
+import threading
+import time
+
+from metrics import metrics
+
+
+def process_age():
+    """프로세스가 시작된 뒤 지난 시간 (초, Linux /proc 기준. 알 수 없으면 None)"""
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupProfile:
+    def __init__(self):
+        # 인터프리터 시작 + import 시간까지 포함하도록 기준 시각을 프로세스 시작으로 맞춤
+        self.origin = time.monotonic() - (process_age() or 0.0)
+        self.marks = collections.OrderedDict()
+        self.expected = set()
+        self.resources = []
+        self.reported = False
+        self._lock = threading.Lock()
+
+    def elapsed(self):
+        return time.monotonic() - self.origin
+
+    def expect(self, *names):
+        """이 단계들에 도달할 때까지 시작 시간 분석 로그를 미룸"""
+        with self._lock:
+            self.expected.update(names)
+
+    def mark(self, name):
+        """시작 단계 도달 시각 기록 (같은 이름은 처음 한 번만)"""
+        with self._lock:
+            if name in self.marks:
+                return
+            self.marks[name] = self.elapsed()
+        self._maybe_report()
+
+    def register(self, resource):
+        with self._lock:
+            self.resources.append(resource)
+
+    def loaded(self, resource):
+        self._maybe_report()
+
+    def _maybe_report(self):
+        with self._lock:
+            if self.reported or not self.marks or not self.expected.issubset(self.marks):
+                return
+            if any(resource.finished is None for resource in self.resources):
+                return
+            self.reported = True
+        logging.info(f"🚀 시작 시간 분석: {self.summary()}")
+
+    def summary(self):
+        parts = [f"{name} {seconds:.2f}초" for name, seconds in self.marks.items()]
+        finished = []
+        for resource in self.resources:
+            if resource.finished is None:
+                parts.append(f"{resource.name} 로드 중")
+                continue
+            start, end = resource.started - self.origin, resource.finished - self.origin
+            finished.append(end)
+            parts.append(f"{resource.name} {end - start:.2f}초 ({start:.2f}→{end:.2f}"
+                         f"{', 실패' if resource.error is not None else ''})")
+        if finished:
+            parts.append(f"전체 준비 {max(finished + list(self.marks.values())):.2f}초")
+        return " | ".join(parts)
+
+
+# 프로세스 전체에서 공유하는 기본 인스턴스
+startup = StartupProfile()
+
+
+class LazyResource:
+    def __init__(self, name, loader, profile=startup):
+        """
+        :param loader: () -> 자원 (백그라운드 스레드에서 실행)
+        """
+        self.name = name
+        self.loader = loader
+        self.profile = profile
+        self.started = None
+        self.finished = None
+        self.error = None
+        self._value = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        if profile is not None:
+            profile.register(self)
+
+    def start(self):
+        """백그라운드 로드 시작 (이미 로드했거나 로드 중이면 무시, 실패했으면 다시 시도)"""
+        with self._lock:
+            if self._thread is not None and not (self._ready.is_set() and self.error is not None):
+                return
+            self._ready.clear()
+            self.error = None
+            self.finished = None
+            self._thread = threading.Thread(target=self._load, name=f"load-{self.name}", daemon=True)
+            self._thread.start()
+
+    def reload(self, loader=None):
+        """
+        지금 자원을 버리고 다시 로드 (메모리 부족 시 더 작은 모델로 교체 등)
+        :param loader: 새 로더 (None이면 기존 로더)
+        :return: 다시 로드를 시작했으면 True (아직 로드 중이면 False)
+        """
+        with self._lock:
+            if self._thread is not None and not self._ready.is_set():
+                return False
+            if loader is not None:
+                self.loader = loader
+            # 값을 버리기 전에 준비 상태부터 해제 → 동시에 호출된 get()은 None 대신 새 값을 기다림
+            self._ready.clear()
+            self._value = None
+            self._thread = None
+        self.start()
+        return True
+
+    def _load(self):
+        self.started = time.monotonic()
+        try:
+            self._value = self.loader()
+        except Exception as e:
+            self.error = e
+            logging.error(f"[ERROR] {self.name} 로드 실패: {e}")
+        self.finished = time.monotonic()
+        seconds = self.finished - self.started
+        metrics.observe("model_load", seconds, start=self.started, resource=self.name, ok=self.error is None)
+        if self.error is None:
+            logging.info(f"📦 {self.name} 준비 완료 ({seconds:.2f}초)")
+        self._ready.set()
+        if self.profile is not None:
+            self.profile.loaded(self)
+
+    @property
+    def ready(self):
+        return self._ready.is_set() and self.error is None
+
+    def get(self, timeout=None):
+        """준비될 때까지 기다렸다가 자원 반환 (아직 시작하지 않았으면 지금 로드)"""
+        self.start()
+        if not self._ready.is_set():
+            begin = time.monotonic()
+            logging.info(f"⏳ {self.name} 준비를 기다리는 중...")
+            if not self._ready.wait(timeout):
+                raise TimeoutError(f"{self.name} 준비 시간 초과 ({timeout}초)")
+            waited = time.monotonic() - begin
+            metrics.observe("model_wait", waited, start=begin, resource=self.name)
+            logging.info(f"⏳ {self.name} 준비 대기 {waited:.2f}초")
+        # 준비 상태와 값을 함께 읽음 (그 사이 reload()가 값을 버렸으면 새 값을 기다림)
+        with self._lock:
+            ready, error, value = self._ready.is_set(), self.error, self._value
+        if not ready:
+            return self.get(timeout)
+        if error is not None:
+            raise RuntimeError(f"{self.name} 로드 실패: {error}") from error
+        return value
+
+    def __getattr__(self, attr):
+        # 자신의 속성이 아닌 것은 실제 자원으로 전달 (준비될 때까지 대기)
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
@@ -0,0 +1,175 @@
+"""
+응답 시간 예산이 있는 GPT 호출 (hedging + 작은 모델 fallback)
+1. 기본 모델(gpt-4o) 요청 전송
+2. 최근 응답 시간의 백분위(p)만큼 지나도 응답이 없으면 빠른 모델(gpt-4o-mini)로 동시 요청
+3. 먼저 도착한 유효한 응답 사용, 나머지 요청은 취소
+   (스트리밍이면 스트림을 닫고, 아니면 결과를 무시하고 request_timeout으로 종료)
+4. 둘 다 예산 안에 응답하지 못하면 준비된 기본 문장 반환
+어떤 경로로 응답했는지(primary / hedge / canned) 횟수를 기록
+"""
+
+import collections
+import concurrent.futures
+import contextvars
+import logging
+import os
+import threading
+import time
+
+from metrics import metrics, percentile
+
+LLM_PRIMARY_MODEL = os.getenv("LLM_PRIMARY_MODEL", "gpt-4o")
+LLM_HEDGE_MODEL = os.getenv("LLM_HEDGE_MODEL", "gpt-4o-mini")
+LLM_TURN_BUDGET = float(os.getenv("LLM_TURN_BUDGET", 4.0))
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", 90))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", 0.8))
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", 1.5))
+LLM_CANNED_REPLY = os.getenv("LLM_CANNED_REPLY", "죄송해요, 지금은 답변이 늦어지고 있어요. 다시 한번 말씀해 주세요.")
+
+
+def _extract_text(response):
+    return response["choices"][0]["message"]["content"].strip()
+
+
+class CancelScope:
+    """요청 하나의 취소 범위: 내부 취소(경쟁에서 진 요청 정리) 또는 상위 취소(cancel_event) 중 하나라도 설정되면 취소"""
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.local = threading.Event()
+
+    def set(self):
+        self.local.set()
+
+    def is_set(self):
+        return self.local.is_set() or (self.parent is not None and self.parent.is_set())
+
+
+class BudgetedLLM:
+    def __init__(self, client, primary_model=LLM_PRIMARY_MODEL, hedge_model=LLM_HEDGE_MODEL,
+                 budget=LLM_TURN_BUDGET, hedge_percentile=LLM_HEDGE_PERCENTILE, canned_reply=LLM_CANNED_REPLY,
+                 governor=None):
+        """
+        :param governor: ReplyGovernor를 넘기면 스트리밍으로 받으면서 응답 길이 제한 적용
+        """
+        self.client = client
+        self.governor = governor
+        self.primary_model = primary_model
+        self.hedge_model = hedge_model
+        self.budget = budget
+        self.hedge_percentile = hedge_percentile
+        self.canned_reply = canned_reply
+
+        self.primary_latencies = collections.deque(maxlen=200)
+        self.path_counts = {"primary": 0, "hedge": 0, "canned": 0}
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm")
+
+    def hedge_delay(self):
+        """최근 기본 모델 응답 시간의 p 백분위 (기록이 부족하면 기본값), 예산 안으로 제한"""
+        with self._lock:
+            history = list(self.primary_latencies)
+        delay = percentile(history, self.hedge_percentile) if len(history) >= 5 else LLM_HEDGE_DEFAULT_DELAY
+        return max(LLM_HEDGE_MIN_DELAY, min(delay, self.budget * 0.8))
+
+    def _call(self, model, messages, deadline, cancel_event, **kwargs):
+        start = time.monotonic()
+        with metrics.time("llm_request", model=model) as span:
+            response = self.client.chat(
+                model=model,
+                messages=messages,
+                request_timeout=max(0.1, deadline - start),
+                stream=self.governor is not None,
+                **kwargs,
+            )
+            if self.governor is not None:
+                headers = time.monotonic() - start
+                text, stats = self.governor.consume(response, max_tokens=kwargs.get("max_tokens"),
+                                                    cancel_event=cancel_event)
+                if stats.get("first_token") is not None:
+                    metrics.observe("llm_first_token", headers + stats["first_token"], start=start, model=model)
+                span["tokens"] = stats.get("tokens")
+            else:
+                text = _extract_text(response)
+            span["chars"] = len(text or "")
+        return text, time.monotonic() - start
+
+    def _record(self, path):
+        with self._lock:
+            self.path_counts[path] += 1
+            counts = dict(self.path_counts)
+        logging.info(f"📊 GPT 응답 경로: {path} (primary {counts['primary']} / hedge {counts['hedge']} / "
+                     f"canned {counts['canned']})")
+
+    def complete(self, messages, cancel_event=None, **kwargs):
+        """
+        :param cancel_event: 설정되면 진행 중인 요청을 모두 중단하고 (None, "cancelled") 반환
+        :return: (응답 문장, 경로 "primary" | "hedge" | "canned")
+        """
+        start = time.monotonic()
+        deadline = start + self.budget
+        # 취소 여부를 주기적으로 확인하기 위한 대기 간격
+        poll = 0.05 if cancel_event is not None else None
+        scope = CancelScope(cancel_event)
+        # 요청 스레드에서 기록하는 span도 호출한 턴에 기록되도록 context를 넘김
+        futures = {self._executor.submit(contextvars.copy_context().run, self._call, self.primary_model, messages,
+                                         deadline, scope, **kwargs): "primary"}
+
+        hedge_at = start + self.hedge_delay()
+
+        def primary_pending():
+            return not any(future.done() for future, path in futures.items() if path == "primary")
+
+        pending = set(futures)
+        try:
+            while pending:
+                hedged = "hedge" in futures.values()
+                wait_until = deadline if hedged else min(hedge_at, deadline)
+                timeout = max(0.0, wait_until - time.monotonic())
+                done, pending = concurrent.futures.wait(
+                    pending, timeout=min(timeout, poll) if poll else timeout,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                if cancel_event is not None and cancel_event.is_set():
+                    return None, "cancelled"
+
+                for future in done:
+                    path = futures[future]
+                    try:
+                        text, elapsed = future.result()
+                    except Exception as e:
+                        logging.warning(f"⚠️ GPT 요청 실패 ({path}): {e}")
+                        continue
+                    if path == "primary":
+                        with self._lock:
+                            self.primary_latencies.append(elapsed)
+                    if text:
+                        if path == "hedge" and primary_pending():
+                            # 버려진 기본 요청은 최소한 이만큼 걸렸음 (절단된 표본) → 빼면 백분위가 낮게 치우쳐 hedge가 너무 빨라짐
+                            with self._lock:
+                                self.primary_latencies.append(max(time.monotonic() - start, hedge_at - start))
+                        self._record(path)
+                        return text, path
+
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                if not hedged and (now >= hedge_at or not pending):
+                    logging.info(f"⏳ {now - start:.2f}초 동안 응답 없음 → {self.hedge_model} 동시 요청")
+                    hedge = self._executor.submit(contextvars.copy_context().run, self._call, self.hedge_model,
+                                                  messages, deadline, scope, **kwargs)
+                    futures[hedge] = "hedge"
+                    pending.add(hedge)
+        finally:
+            # 경쟁에서 진 요청은 스트림을 닫아 생성 중단 (스트리밍이 아니면 결과만 무시)
+            scope.set()
+            for future in pending:
+                future.cancel()
+
+        if primary_pending():
+            # 예산 초과도 기록에 반영해 다음 hedge 시점이 앞당겨지도록 함
+            with self._lock:
+                self.primary_latencies.append(self.budget)
+        logging.warning(f"⚠️ GPT 응답 시간 예산({self.budget:.1f}초) 초과 → 기본 문장 사용")
+        self._record("canned")
+        return self.canned_reply, "canned"
@@ -0,0 +1,115 @@
+"""
+OpenAI 클라이언트 연결 관리 (keep-alive 세션 + 사전 연결)
+- 레거시 openai SDK(0.x)가 사용하는 requests 세션을 프로세스 전체에서 하나로 고정
+  (SDK 기본값은 스레드별 세션을 180초마다 새로 만들어 DNS/TCP/TLS 연결을 다시 맺음.
+   고정한 세션도 SDK가 180초마다 close()를 호출하므로 close()는 무시하고 연결 풀을 유지)
+- 음성 시작(VAD)이 감지되면 백그라운드에서 가벼운 요청을 보내 연결을 미리 열어둠
+- 매 호출마다 연결 설정 시간과 응답 생성 시간을 나눠서 기록
+"""
+
+import logging
+import os
+import threading
+import time
+
+import openai
+import requests
+from requests.adapters import HTTPAdapter
+
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", 4))
+LLM_WARMUP_MIN_INTERVAL = float(os.getenv("LLM_WARMUP_MIN_INTERVAL", 20.0))
+LLM_WARMUP_TIMEOUT = float(os.getenv("LLM_WARMUP_TIMEOUT", 3.0))
+
+
+class SharedSession(requests.Session):
+    """
+    openai 0.x는 스레드별 세션이 MAX_SESSION_LIFETIME_SECS(180초)를 넘으면 close() 후 다시 만드는데,
+    openai.requestssession이 Session 객체면 같은 객체를 다시 돌려받음 → close()가 미리 열어 둔 연결만 끊음
+    """
+
+    def close(self):
+        pass  # 프로세스가 끝날 때까지 연결 풀 유지
+
+
+class LLMClient:
+    def __init__(self, pool_size=LLM_POOL_SIZE, warmup_min_interval=LLM_WARMUP_MIN_INTERVAL):
+        self.session = SharedSession()
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        openai.requestssession = self.session
+
+        self.warmup_min_interval = warmup_min_interval
+        self.last_used = 0.0
+        self.setup_estimate = 0.0  # 새 연결 1회 비용 (사전 연결 시 측정값의 이동 평균)
+        self.last_timing = {}
+        self._warmup_lock = threading.Lock()
+
+    def _pool(self):
+        # requests와 같은 키로 풀을 찾아야 함 (pool_connections=1이라 다른 키로 만들면 실제 풀이 밀려나며 연결이 닫힘)
+        request = requests.Request("HEAD", openai.api_base.rstrip("/") + "/models").prepare()
+        if hasattr(self.adapter, "get_connection_with_tls_context"):  # requests 2.32 이상
+            settings = self.session.merge_environment_settings(request.url, {}, None, None, None)
+            return self.adapter.get_connection_with_tls_context(request, settings["verify"], settings["proxies"])
+        return self.adapter.get_connection(request.url)
+
+    def _connections_opened(self):
+        return self._pool().num_connections
+
+    # ----------- 사전 연결 -----------
+    def warm_up(self, reason="speech onset"):
+        """
+        연결이 오래 쉬었으면 백그라운드 스레드에서 HEAD 요청으로 DNS/TCP/TLS 연결을 미리 맺음
+        (응답 코드는 무시, 연결 풀에 살아있는 연결을 남기는 것이 목적)
+        """
+        if time.monotonic() - self.last_used < self.warmup_min_interval:
+            return
+        if not self._warmup_lock.acquire(blocking=False):
+            return
+        threading.Thread(target=self._warm_up, args=(reason,), daemon=True).start()
+
+    def _warm_up(self, reason):
+        try:
+            opened_before = self._connections_opened()
+            start = time.monotonic()
+            self.session.head(
+                openai.api_base.rstrip("/") + "/models",
+                headers={"Authorization": f"Bearer {openai.api_key}"},
+                timeout=LLM_WARMUP_TIMEOUT,
+            )
+            elapsed = time.monotonic() - start
+            self.last_used = time.monotonic()
+            if self._connections_opened() > opened_before:
+                self.setup_estimate = elapsed if not self.setup_estimate else 0.7 * self.setup_estimate + 0.3 * elapsed
+            logging.info(f"🔥 GPT 연결 사전 준비 완료 ({reason}, {elapsed:.3f}초)")
+        except Exception as e:
+            logging.warning(f"⚠️ GPT 연결 사전 준비 실패: {e}")
+        finally:
+            self._warmup_lock.release()
+
+    # ----------- 요청 -----------
+    def chat(self, **kwargs):
+        """
+        openai.ChatCompletion.create 래퍼. 호출 후 self.last_timing에
+        connect(새 연결 설정 추정 시간), generate(응답 생성 시간), new_connection 기록
+        (stream=True면 generate는 첫 응답 헤더까지의 시간)
+        """
+        opened_before = self._connections_opened()
+        start = time.monotonic()
+        response = openai.ChatCompletion.create(**kwargs)
+        total = time.monotonic() - start
+        self.last_used = time.monotonic()
+
+        new_connection = self._connections_opened() > opened_before
+        connect = min(self.setup_estimate, total) if new_connection else 0.0
+        self.last_timing = {
+            "total": total,
+            "connect": connect,
+            "generate": total - connect,
+            "new_connection": new_connection,
+        }
+        logging.info(
+            f"⏱️ GPT 호출 {total:.3f}초 (연결 설정 {connect:.3f}초{' - 새 연결' if new_connection else ''}, "
+            f"{'첫 응답' if kwargs.get('stream') else '생성'} {total - connect:.3f}초)"
+        )
+        return response
@@ -0,0 +1,385 @@
+"""
+메모리 사용량 계측 + 예산 (라즈베리파이처럼 RAM이 작은 환경에서 OOM 종료 전에 원인 파악 / 대응)
+- 메모리 = 이 프로세스의 RSS + 자식 프로세스(fork한 STT 워커 등)의 전용(private) 메모리
+  (fork 후 아직 부모와 공유 중인 페이지나 메모리 매핑한 Whisper 가중치는 두 번 세지 않음)
+- 백그라운드 스레드가 MEMORY_SAMPLE_INTERVAL마다 기록 → 단계 도중의 최대값과 메모리 부족 감지에 사용
+- metrics 리스너: 단계(span)가 끝날 때마다 그 구간의 시작/끝/최대 메모리를 단계별로 집계, 예산을 넘으면 경고
+- 턴 단위: 턴 시작 대비 변화와 턴 중 최대값 (Linux는 /proc/self/clear_refs로 VmHWM을 턴마다 초기화해 빠짐없이 측정)
+  턴은 Turn id로 구분 → 파이프라인 모드에서 턴이 겹쳐도 단계별 최대값은 그 단계를 실행한 턴(pipeline.current_turn)에 기록
+- tracemalloc: MEMORY_TRACE_STAGES에 지정한 단계(또는 SIGUSR2로 켜면 모든 단계)가 끝날 때 스냅샷을 찍어
+  직전 스냅샷(턴 시작 또는 이전에 추적한 단계) 대비 할당이 늘어난 코드 위치 상위 목록을 로그
+  (Python/NumPy 할당만 보임, torch 텐서 메모리는 RSS로만 확인)
+- 성능 저하 모드: 메모리가 MEMORY_DEGRADE_MB를 넘거나 시스템 여유 메모리가 MEMORY_MIN_AVAILABLE_MB 미만이면
+  gc + malloc_trim으로 먼저 정리하고, 그래도 부족하면 등록된 단계를 하나씩 적용
+  (예: TTS 메모리 캐시 끄기 → 부분 STT 끄기 → 더 작은 Whisper 모델, 재시작 전까지 유지)
+
+사용법:
+    MEMORY_BUDGET_MB=700 MEMORY_STAGE_BUDGETS="stt:650,model_load:600" python v7.py
+    MEMORY_TRACE_STAGES=stt,llm python v7.py       # 해당 단계 tracemalloc 상위 할당 로그
+    kill -USR2 <pid>                               # 실행 중 모든 단계 tracemalloc 켜기/끄기
+"""
+
+import collections
+import ctypes
+import gc
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import tracemalloc
+
+from pipeline import current_turn
+
+MEMORY_MONITOR = os.getenv("MEMORY_MONITOR", "1") == "1"
+MEMORY_SAMPLE_INTERVAL = float(os.getenv("MEMORY_SAMPLE_INTERVAL", 0.5))
+MEMORY_BUDGET_MB = float(os.getenv("MEMORY_BUDGET_MB", 0))  # 0이면 예산 없음
+MEMORY_STAGE_BUDGETS = os.getenv("MEMORY_STAGE_BUDGETS", "")  # "stt:650,tts:450" (단계 도중 최대 MB)
+MEMORY_TRACE_STAGES = os.getenv("MEMORY_TRACE_STAGES", "")  # "stt,llm" | "all"
+MEMORY_TRACE_TOP = int(os.getenv("MEMORY_TRACE_TOP", 10))
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", 1))
+MEMORY_DEGRADE = os.getenv("MEMORY_DEGRADE", "1") == "1"
+MEMORY_DEGRADE_MB = float(os.getenv("MEMORY_DEGRADE_MB", 0))  # 0이면 MEMORY_BUDGET_MB의 90%
+MEMORY_MIN_AVAILABLE_MB = float(os.getenv("MEMORY_MIN_AVAILABLE_MB", 0))  # 시스템 여유 메모리 하한 (0이면 사용 안 함)
+MEMORY_DEGRADE_COOLDOWN = float(os.getenv("MEMORY_DEGRADE_COOLDOWN", 30))  # 저하 단계 사이 최소 간격 (초)
+
+
+# ----------- /proc 읽기 (Linux, 알 수 없으면 None) -----------
+def memory_usage(pid="self"):
+    """(RSS MB, 공유 MB) - /proc/<pid>/statm 기준. 알 수 없으면 (None, None)"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            resident, shared = map(int, f.read().split()[1:3])
+        page = os.sysconf("SC_PAGE_SIZE")
+        return resident * page / 2 ** 20, shared * page / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None, None
+
+
+def private_mb(pid):
+    """다른 프로세스와 공유하지 않는 메모리 (fork 후 아직 복사되지 않은 페이지는 공유로 셈)"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            return sum(int(line.split()[1]) for line in f
+                       if line.startswith(("Private_Clean:", "Private_Dirty:"))) / 1024
+    except (OSError, ValueError, IndexError):
+        rss, shared = memory_usage(pid)
+        return None if rss is None else rss - shared
+
+
+def _read_kb(path, field):
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def available_mb():
+    """시스템 여유 메모리 (MemAvailable)"""
+    return _read_kb("/proc/meminfo", "MemAvailable:")
+
+
+def peak_rss_mb():
+    """이 프로세스의 최대 RSS (VmHWM, reset_peak() 이후 기준)"""
+    return _read_kb("/proc/self/status", "VmHWM:")
+
+
+def reset_peak():
+    """VmHWM을 현재 RSS로 초기화 (Linux 4.0 이상). :return: 성공 여부"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def footprint_mb():
+    """이 프로세스 RSS + multiprocessing 자식 프로세스들의 전용 메모리"""
+    rss, _ = memory_usage()
+    if rss is None:
+        return None
+    for child in multiprocessing.active_children():
+        private = private_mb(child.pid)
+        if private is not None:
+            rss += private
+    return rss
+
+
+def release_memory():
+    """가비지 수집 후 glibc가 들고 있는 빈 힙을 OS에 반환"""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def parse_budgets(spec):
+    """ "stt:650,tts:450" → {"stt": 650.0, "tts": 450.0} """
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        stage, _, value = item.rpartition(":")
+        try:
+            budgets[stage.strip()] = float(value)
+        except ValueError:
+            logging.warning(f"⚠️ 잘못된 메모리 예산 설정 무시: {item}")
+    return budgets
+
+
+class MemoryMonitor:
+    def __init__(self, budget_mb=MEMORY_BUDGET_MB, stage_budgets=MEMORY_STAGE_BUDGETS, trace_stages=MEMORY_TRACE_STAGES,
+                 degrade=MEMORY_DEGRADE, degrade_mb=MEMORY_DEGRADE_MB, min_available_mb=MEMORY_MIN_AVAILABLE_MB,
+                 interval=MEMORY_SAMPLE_INTERVAL, enabled=MEMORY_MONITOR):
+        """
+        :param budget_mb: 모든 단계 공통 메모리 예산 (단계별 예산이 없을 때)
+        :param stage_budgets: {단계: MB} 또는 "stt:650,tts:450"
+        :param trace_stages: tracemalloc 스냅샷을 찍을 단계 (집합 또는 "stt,llm" / "all")
+        :param degrade_mb: 이 값을 넘으면 성능 저하 단계 적용 (0이면 budget_mb의 90%)
+        """
+        self.enabled = enabled
+        self.budget_mb = budget_mb
+        self.stage_budgets = parse_budgets(stage_budgets) if isinstance(stage_budgets, str) else dict(stage_budgets)
+        if isinstance(trace_stages, str):
+            trace_stages = {stage.strip() for stage in trace_stages.split(",") if stage.strip()}
+        self.trace_stages = set(trace_stages)
+        self.degrade = degrade
+        self.degrade_mb = degrade_mb or budget_mb * 0.9
+        self.min_available_mb = min_available_mb
+        self.interval = interval
+
+        self.samples = collections.deque(maxlen=max(10, int(120 / max(interval, 0.05))))  # (시각, MB) 최근 2분
+        self.stages = collections.OrderedDict()  # 단계 -> {"count", "peak_mb", "growth_mb"}
+        self.turns = {}  # Turn id -> 진행 중인 턴 기록
+        self.last_turn = None
+        self.degrade_steps = []  # (이름, 함수) 적용 순서대로
+        self.degraded = []
+        self.metrics = None
+        self._trace_all = "all" in self.trace_stages
+        self._snapshot = None
+        self._last_degrade = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def attach(self, metrics):
+        """metrics의 단계(span) 이벤트마다 메모리 기록, 예산 초과/저하 모드는 metrics 실패로도 집계"""
+        if self.enabled:
+            self.metrics = metrics
+            metrics.add_listener(self.record)
+
+    def add_degrade_step(self, name, action):
+        """메모리 부족 시 적용할 단계 (등록 순서대로 하나씩, 가벼운 것부터 등록)"""
+        self.degrade_steps.append((name, action))
+
+    # ----------- 기록 -----------
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        if self.trace_stages:
+            self._start_tracing()
+        self._thread = threading.Thread(target=self._run, name="memory-monitor", daemon=True)
+        self._thread.start()
+        budgets = ", ".join(f"{stage} {mb:.0f}MB" for stage, mb in self.stage_budgets.items())
+        logging.info(f"🧠 메모리 계측 시작: 현재 {footprint_mb() or 0:.0f}MB"
+                     + (f", 예산 {self.budget_mb:.0f}MB" if self.budget_mb else "")
+                     + (f" ({budgets})" if budgets else "")
+                     + (f", 저하 모드 {self.degrade_mb:.0f}MB" if self.degrade and self.degrade_mb else ""))
+
+    def _run(self):
+        while True:
+            mb = footprint_mb()
+            if mb is not None:
+                with self._lock:
+                    self.samples.append((time.monotonic(), mb))
+                    for turn in self.turns.values():
+                        turn["peak_mb"] = max(turn["peak_mb"], mb)
+                self.check_pressure(mb)
+            time.sleep(self.interval)
+
+    def record(self, event):
+        if event["type"] != "span":
+            return
+        mb = footprint_mb()
+        if mb is None:
+            return
+        stage, start = event["stage"], event["start"]
+        turn_id = current_turn.get()
+        with self._lock:
+            before = [value for t, value in self.samples if t <= start]
+            during = [value for t, value in self.samples if t > start]
+            start_mb = before[-1] if before else (during[0] if during else mb)
+            peak = max(during + [mb, start_mb])
+            stats = self.stages.setdefault(stage, {"count": 0, "peak_mb": 0.0, "growth_mb": 0.0})
+            stats["count"] += 1
+            stats["peak_mb"] = max(stats["peak_mb"], peak)
+            stats["growth_mb"] = max(stats["growth_mb"], mb - start_mb)
+            # 메모리는 프로세스 전체 값이라 최대값은 진행 중인 모든 턴에, 단계별 값은 그 단계를 실행한 턴에만 기록
+            for turn in self.turns.values():
+                turn["peak_mb"] = max(turn["peak_mb"], peak)
+            turn = self.turns.get(turn_id)
+            if turn is not None:
+                turn["stages"][stage] = max(turn["stages"].get(stage, 0.0), peak)
+
+        budget = self.stage_budgets.get(stage, self.budget_mb)
+        if budget and peak > budget:
+            logging.warning(f"⚠️ 메모리 예산 초과: {stage} 단계 최대 {peak:.0f}MB > {budget:.0f}MB "
+                            f"(시작 {start_mb:.0f}MB → 끝 {mb:.0f}MB)")
+            if self.metrics is not None:
+                self.metrics.failure("memory_budget", f"{peak:.0f}MB > {budget:.0f}MB", target=stage)
+        if self._trace_all or stage in self.trace_stages:
+            self._trace(stage)
+
+    # ----------- 턴 단위 -----------
+    def begin_turn(self, turn_id):
+        """
+        새 턴 시작. 아직 끝나지 않은 다른 턴은 그대로 둠 (각자 end_turn에서 마무리)
+        :param turn_id: pipeline.Turn id (이 턴의 단계가 current_turn에 설정하는 값)
+        """
+        if not self.enabled:
+            return
+        mb = footprint_mb()
+        with self._lock:
+            # VmHWM을 초기화하기 전에 진행 중인 턴에 지금까지의 최대값을 반영
+            peak = peak_rss_mb() if self.turns else None
+            for turn in self.turns.values():
+                if turn["hwm_reset"] and peak is not None:
+                    turn["peak_mb"] = max(turn["peak_mb"], peak)
+            hwm_reset = reset_peak()
+            self.turns[turn_id] = {"number": turn_id, "start_mb": mb, "peak_mb": mb or 0.0, "hwm_reset": hwm_reset,
+                                   "stages": collections.OrderedDict()}
+        if tracemalloc.is_tracing():
+            self._snapshot = self._take_snapshot()
+
+    def end_turn(self, turn_id):
+        """:return: {"mb", "growth_mb", "peak_mb"} (턴이 없으면 None)"""
+        with self._lock:
+            turn = self.turns.pop(turn_id, None)
+        if turn is None:
+            return None
+        mb = footprint_mb()
+        if mb is None:
+            return None
+        peak = max(turn["peak_mb"], mb)
+        if turn["hwm_reset"]:
+            peak = max(peak, peak_rss_mb() or 0.0)
+        growth = mb - turn["start_mb"] if turn["start_mb"] is not None else 0.0
+        top = sorted(turn["stages"].items(), key=lambda item: -item[1])[:3]
+        stages = ", ".join(f"{stage} {value:.0f}" for stage, value in top)
+        over = bool(self.budget_mb) and peak > self.budget_mb
+        (logging.warning if over else logging.info)(
+            f"🧠 턴 #{turn['number']} 메모리: {mb:.0f}MB ({growth:+.0f}MB), 최대 {peak:.0f}MB"
+            + (f" > 예산 {self.budget_mb:.0f}MB" if over else "") + (f" | 최대 단계(MB) {stages}" if stages else ""))
+        self.last_turn = {"mb": round(mb, 1), "growth_mb": round(growth, 1), "peak_mb": round(peak, 1)}
+        return self.last_turn
+
+    # ----------- tracemalloc -----------
+    def _start_tracing(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_TRACE_FRAMES)
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def _trace(self, stage):
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = self._take_snapshot()
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is None:
+            return
+        stats = [stat for stat in snapshot.compare_to(previous, "lineno") if stat.size_diff > 0][:MEMORY_TRACE_TOP]
+        current, peak = tracemalloc.get_traced_memory()
+        lines = []
+        for stat in stats:
+            frame = stat.traceback[0]
+            where = os.path.join(*frame.filename.split(os.sep)[-2:])
+            size = (f"{stat.size_diff / 2 ** 20:+.1f}MB" if stat.size_diff >= 2 ** 20
+                    else f"{stat.size_diff / 1024:+.0f}KB")
+            lines.append(f"{where}:{frame.lineno} {size} ({stat.count_diff:+d}개)")
+        logging.info(f"🔬 {stage} 단계 Python 할당 증가 상위 {len(lines)}곳 "
+                     f"(추적 중 {current / 2 ** 20:.1f}MB, 최고 {peak / 2 ** 20:.1f}MB)"
+                     + "".join(f"\n    {line}" for line in lines))
+
+    def toggle_tracing(self, *_):
+        """모든 단계 tracemalloc 켜기/끄기 (SIGUSR2 핸들러)"""
+        self._trace_all = not self._trace_all
+        if self._trace_all:
+            self._start_tracing()
+            logging.info("🔬 tracemalloc 켬 (모든 단계, 다시 SIGUSR2를 보내면 끔)")
+        else:
+            if not self.trace_stages:
+                tracemalloc.stop()
+                self._snapshot = None
+            logging.info("🔬 tracemalloc 끔")
+
+    def install_signal_handler(self):
+        """메인 스레드에서만 호출 가능"""
+        if self.enabled and hasattr(signal, "SIGUSR2") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR2, self.toggle_tracing)
+
+    # ----------- 성능 저하 모드 -----------
+    def pressure(self, mb):
+        """:return: 메모리 부족 이유 (부족하지 않으면 None)"""
+        if self.degrade_mb and mb > self.degrade_mb:
+            return f"{mb:.0f}MB > {self.degrade_mb:.0f}MB"
+        if self.min_available_mb:
+            available = available_mb()
+            if available is not None and available < self.min_available_mb:
+                return f"시스템 여유 {available:.0f}MB < {self.min_available_mb:.0f}MB"
+        return None
+
+    def check_pressure(self, mb):
+        if not self.degrade:
+            return
+        reason = self.pressure(mb)
+        if reason is None:
+            return
+        now = time.monotonic()
+        if self._last_degrade is not None and now - self._last_degrade < MEMORY_DEGRADE_COOLDOWN:
+            return
+        self._last_degrade = now
+
+        release_memory()
+        after = footprint_mb()
+        if after is not None and self.pressure(after) is None:
+            logging.info(f"🧠 메모리 부족 ({reason}) → 정리 후 {after:.0f}MB로 회복")
+            return
+        if len(self.degraded) >= len(self.degrade_steps):
+            logging.warning(f"⚠️ 메모리 부족 ({reason}), 더 적용할 성능 저하 단계 없음")
+            return
+        name, action = self.degrade_steps[len(self.degraded)]
+        self.degraded.append(name)
+        logging.warning(f"⚠️ 메모리 부족 ({reason}) → 성능 저하 모드: {name}")
+        if self.metrics is not None:
+            self.metrics.failure("memory_pressure", reason, step=name)
+        try:
+            action()
+        except Exception as e:
+            logging.error(f"[ERROR] 성능 저하 단계 실패 ({name}): {e}")
+
+    # ----------- 출력 -----------
+    def stats(self):
+        with self._lock:
+            return {
+                "stages": {stage: {"count": s["count"], "peak_mb": round(s["peak_mb"], 1),
+                                   "growth_mb": round(s["growth_mb"], 1)} for stage, s in self.stages.items()},
+                "degraded": list(self.degraded),
+            }
+
+    def summary(self):
+        with self._lock:
+            parts = [f"{stage} 최대 {s['peak_mb']:.0f}MB (증가 최대 {s['growth_mb']:+.0f}MB)"
+                     for stage, s in self.stages.items()]
+        if self.degraded:
+            parts.append(f"저하 모드: {', '.join(self.degraded)}")
+        return " | ".join(parts) or "기록 없음"
@@ -0,0 +1,203 @@
+"""
+단계별 지연 시간 계측 (monotonic clock)
+- metrics.time("stt"): with 블록 실행 시간을 단계별 히스토그램에 기록, 예외가 나면 실패 횟수 증가
+- 히스토그램: Prometheus 누적 bucket + 최근 METRICS_WINDOW개 값으로 p50/p95/p99 계산
+- 로컬 HTTP 엔드포인트(/metrics, Prometheus text format)와 주기적 로그 요약 제공
+- add_listener(): 측정 이벤트를 그대로 전달받는 훅 (턴 단위 추적 등)
+"""
+
+import collections
+import contextlib
+import http.server
+import logging
+import os
+import threading
+import time
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9108))  # 0이면 HTTP 엔드포인트 사용 안 함
+METRICS_LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", 300))
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", 1000))
+
+# 초 단위 bucket 경계 (STT/GPT/TTS 모두 수십 ms ~ 수 초 범위)
+DEFAULT_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0)
+QUANTILES = (50, 95, 99)
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    k = (len(ordered) - 1) * p / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=METRICS_WINDOW):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = collections.deque(maxlen=window)
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantiles(self):
+        return {p: percentile(self.recent, p) for p in QUANTILES}
+
+
+class Metrics:
+    def __init__(self, prefix="voice_assistant"):
+        self.prefix = prefix
+        self.histograms = collections.OrderedDict()
+        self.failures = collections.Counter()
+        self.listeners = []
+        self._lock = threading.Lock()
+        self._server = None
+        self._summary_thread = None
+
+    # ----------- 기록 -----------
+    def observe(self, stage, seconds, start=None, **attrs):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+        end = time.monotonic()
+        self._emit({"type": "span", "stage": stage, "start": end - seconds if start is None else start,
+                    "seconds": seconds, "attrs": attrs})
+
+    def failure(self, stage, error=None, **attrs):
+        with self._lock:
+            self.failures[stage] += 1
+        self._emit({"type": "failure", "stage": stage, "start": time.monotonic(), "seconds": 0.0,
+                    "attrs": dict(attrs, error=str(error) if error else None)})
+
+    @contextlib.contextmanager
+    def time(self, stage, **attrs):
+        """
+        with metrics.time("stt", model="base") as span:
+            ...
+            span["chars"] = len(text)   # 끝난 뒤 이벤트에 함께 전달할 속성
+        """
+        span = dict(attrs)
+        start = time.monotonic()
+        try:
+            yield span
+        except Exception as e:
+            self.failure(stage, e, **span)
+            raise
+        finally:
+            self.observe(stage, time.monotonic() - start, start=start, **span)
+
+    def add_listener(self, listener):
+        """listener(event): event = {"type", "stage", "start", "seconds", "attrs"}"""
+        self.listeners.append(listener)
+
+    def _emit(self, event):
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logging.error(f"[ERROR] 계측 리스너 실패: {e}")
+
+    # ----------- 출력 -----------
+    def render_prometheus(self):
+        name = f"{self.prefix}_stage_seconds"
+        lines = [
+            f"# HELP {name} 단계별 실행 시간 (초)",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            histograms = list(self.histograms.items())
+            failures = dict(self.failures)
+            for stage, histogram in histograms:
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+
+            lines += [
+                f"# HELP {name}_recent 최근 {METRICS_WINDOW}회 기준 백분위수 (초)",
+                f"# TYPE {name}_recent gauge",
+            ]
+            for stage, histogram in histograms:
+                for p, value in histogram.quantiles().items():
+                    if value is not None:
+                        lines.append(f'{name}_recent{{stage="{stage}",quantile="{p / 100}"}} {value:.6f}')
+
+        failure_name = f"{self.prefix}_stage_failures_total"
+        lines += [f"# HELP {failure_name} 단계별 실패 횟수", f"# TYPE {failure_name} counter"]
+        for stage, count in failures.items():
+            lines.append(f'{failure_name}{{stage="{stage}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        with self._lock:
+            parts = []
+            for stage, histogram in self.histograms.items():
+                q = histogram.quantiles()
+                failed = self.failures.get(stage, 0)
+                parts.append(f"{stage} n={histogram.count} p50={q[50]:.3f} p95={q[95]:.3f} p99={q[99]:.3f}"
+                             + (f" 실패={failed}" if failed else ""))
+            for stage, failed in self.failures.items():
+                if stage not in self.histograms:
+                    parts.append(f"{stage} 실패={failed}")
+        return " | ".join(parts) or "기록 없음"
+
+    # ----------- HTTP 엔드포인트 / 주기 로그 -----------
+    def start_http_server(self, port=METRICS_PORT, host="127.0.0.1"):
+        if not port or self._server is not None:
+            return
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # 요청마다 로그를 남기지 않음
+
+        try:
+            self._server = http.server.ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            logging.warning(f"⚠️ 계측 HTTP 엔드포인트 시작 실패 (포트 {port}): {e}")
+            return
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logging.info(f"📈 계측 엔드포인트: http://{host}:{port}/metrics")
+
+    def start_log_summary(self, interval=METRICS_LOG_INTERVAL):
+        if interval <= 0 or self._summary_thread is not None:
+            return
+
+        def _run():
+            while True:
+                time.sleep(interval)
+                logging.info(f"📈 단계별 지연 요약: {self.summary()}")
+
+        self._summary_thread = threading.Thread(target=_run, name="metrics-summary", daemon=True)
+        self._summary_thread.start()
+
+    def start(self):
+        self.start_http_server()
+        self.start_log_summary()
+
+
+# 프로세스 전체에서 공유하는 기본 인스턴스
+metrics = Metrics()
@@ -0,0 +1,261 @@
+"""
+asyncio 기반 파이프라인 런타임 (음성 입력 → STT → 응답 생성 → 음성 출력)
+- 각 단계는 코루틴이거나, 스레드에서 실행되는 기존 동기 함수 (transcribe_audio_to_text, speak_text 등)
+- 단계 사이는 크기가 제한된 asyncio.Queue로 연결 → 뒤 단계가 밀리면 앞 단계가 대기 (backpressure)
+- 질문 한 번 = Turn 하나. Turn마다 취소 범위(cancel_event + 실행 중인 task)를 가지며 한 번에 깔끔하게 중단 가능
+- 새 질문이 들어오면 아직 처리 중인 이전 Turn은 취소 (가장 최근 질문 우선)
+- MicrophoneGate: STT/GPT가 도는 동안에는 다음 질문을 듣고, 말하는 동안에는 마이크를 재생(끼어들기 감지)에 양보
+- current_turn: 단계 실행 중인 Turn id (contextvar) → 턴이 겹쳐도 계측 이벤트를 올바른 턴(추적, 메모리)에 기록
+"""
+
+import asyncio
+import contextvars
+import itertools
+import logging
+import os
+import threading
+import time
+
+ASYNC_PIPELINE = os.getenv("ASYNC_PIPELINE", "0") == "1"
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 1))
+
+# 지금 실행 중인 단계가 속한 Turn id (입력 단계처럼 턴 밖이면 None)
+# 단계 안에서 스레드 풀에 작업을 넘길 때는 contextvars.copy_context().run으로 감싸야 이어짐
+current_turn = contextvars.ContextVar("current_turn", default=None)
+
+
+class Turn:
+    _ids = itertools.count(1)
+
+    def __init__(self):
+        self.id = next(self._ids)
+        self.cancel_event = threading.Event()  # 스레드에서 도는 단계가 확인하는 취소 신호
+        self.started = time.monotonic()
+        self.timings = {}
+        self._tasks = set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self, reason=""):
+        if self.cancelled:
+            return
+        self.cancel_event.set()
+        for task in self._tasks:
+            task.cancel()
+        logging.info(f"🧵 턴 #{self.id} 취소{f': {reason}' if reason else ''}")
+
+
+class Stage:
+    def __init__(self, name, fn, queue_size=PIPELINE_QUEUE_SIZE):
+        """
+        :param fn: (item, turn) -> 다음 단계로 넘길 값. None을 반환하면 이 Turn은 여기서 끝남
+                   코루틴 함수면 그대로 await, 일반 함수면 daemon 스레드에서 실행
+                   (마이크 대기처럼 끝나지 않는 호출이 있어도 프로그램 종료를 막지 않도록)
+        """
+        self.name = name
+        self.fn = fn
+        self.queue_size = queue_size
+
+    async def call(self, item, turn):
+        turn_id = turn.id if turn is not None else None
+        if asyncio.iscoroutinefunction(self.fn):
+            current_turn.set(turn_id)  # 이 단계의 task context에만 적용
+            return await self.fn(item, turn)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def _resolve(method, value):
+            if not future.done():
+                method(value)
+
+        def _run():
+            current_turn.set(turn_id)  # 새 스레드는 빈 context에서 시작
+            try:
+                result = self.fn(item, turn)
+            except Exception as e:
+                loop.call_soon_threadsafe(_resolve, future.set_exception, e)
+            else:
+                loop.call_soon_threadsafe(_resolve, future.set_result, result)
+
+        threading.Thread(target=_run, name=f"stage-{self.name}", daemon=True).start()
+        return await future
+
+
+class Pipeline:
+    def __init__(self, source, stages, cancel_previous=True, on_cancel=None, on_finish=None):
+        """
+        :param source: () -> 새 Turn의 입력 (스레드에서 반복 호출, None이면 무시)
+        :param on_cancel: Turn이 취소될 때 호출 (재생 중단 등)
+        :param on_finish: (turn, status) Turn이 끝났을 때 호출 (추적 저장 등)
+        """
+        self.source = Stage("capture", lambda _item, _turn: source())
+        self.stages = stages
+        self.cancel_previous = cancel_previous
+        self.on_cancel = on_cancel
+        self.on_finish = on_finish
+        self.active = set()
+        self.completed = 0
+        self.cancelled = 0
+
+    def cancel_turn(self, turn, reason=""):
+        if turn.cancelled:
+            return
+        turn.cancel(reason)
+        self.cancelled += 1
+        if self.on_cancel is not None:
+            try:
+                self.on_cancel(turn)
+            except Exception as e:
+                logging.error(f"[ERROR] 턴 취소 콜백 실패: {e}")
+
+    def cancel_all(self, reason=""):
+        for turn in list(self.active):
+            self.cancel_turn(turn, reason)
+
+    def _finish(self, turn, status):
+        self.active.discard(turn)
+        if status == "done":
+            self.completed += 1
+        stages = ", ".join(f"{name} {seconds:.2f}초" for name, seconds in turn.timings.items())
+        logging.info(f"🧵 턴 #{turn.id} {status} ({time.monotonic() - turn.started:.2f}초) | {stages}")
+        if self.on_finish is not None:
+            try:
+                self.on_finish(turn, status)
+            except Exception as e:
+                logging.error(f"[ERROR] 턴 종료 콜백 실패: {e}")
+
+    async def _run_stage(self, stage, turn, item):
+        """단계 하나 실행. 취소되면 (None, False)"""
+        task = asyncio.ensure_future(stage.call(item, turn))
+        turn._tasks.add(task)
+        start = time.monotonic()
+        try:
+            await asyncio.wait({task})
+        finally:
+            turn._tasks.discard(task)
+        turn.timings[stage.name] = time.monotonic() - start
+        if task.cancelled() or turn.cancelled:
+            return None, False
+        if task.exception() is not None:
+            logging.error(f"[ERROR] {stage.name} 단계 실패 (턴 #{turn.id}): {task.exception()}")
+            return None, True
+        return task.result(), True
+
+    async def _produce(self, queue):
+        while True:
+            try:
+                item = await self.source.call(None, None)
+            except Exception as e:
+                logging.error(f"[ERROR] 입력 단계 실패: {e}")
+                continue
+            if item is None:
+                continue
+            turn = Turn()
+            if self.cancel_previous:
+                self.cancel_all(f"새 질문 (턴 #{turn.id})")
+            self.active.add(turn)
+            await queue.put((turn, item))  # 다음 단계가 밀려 있으면 여기서 대기
+
+    async def _consume(self, stage, inbox, outbox):
+        while True:
+            turn, item = await inbox.get()
+            try:
+                if turn.cancelled:
+                    self._finish(turn, "cancelled")
+                    continue
+                result, ok = await self._run_stage(stage, turn, item)
+                if not ok:
+                    self._finish(turn, "cancelled")
+                elif result is None or outbox is None:
+                    self._finish(turn, "done")
+                else:
+                    await outbox.put((turn, result))
+            finally:
+                inbox.task_done()
+
+    async def run(self):
+        queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        tasks = [asyncio.ensure_future(self._produce(queues[0]))]
+        for index, stage in enumerate(self.stages):
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            tasks.append(asyncio.ensure_future(self._consume(stage, queues[index], outbox)))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            self.cancel_all("파이프라인 종료")
+            for task in tasks:
+                task.cancel()
+
+
+class MicrophoneYield(Exception):
+    """음성 출력을 위해 듣기를 중단하고 마이크를 양보"""
+
+
+class MicrophoneGate:
+    """
+    듣기(capture) 단계와 말하기(speak) 단계가 마이크/스피커를 번갈아 쓰도록 조정
+    - 말하기 전: 아직 발화가 시작되지 않은 듣기를 중단시키고 마이크가 닫힐 때까지 대기
+    - 말하는 동안: 새 듣기를 시작하지 않음 (마이크는 끼어들기 감지가 사용)
+    - 말하기는 겹칠 수 있음 (알림음/채움말 재생 중에 응답 시작) → 모두 끝나야 다시 듣기
+    """
+
+    def __init__(self):
+        self._speaking = threading.Event()
+        self._quiet = threading.Event()
+        self._quiet.set()
+        self._mic_released = threading.Event()
+        self._mic_released.set()
+        self._speakers = 0
+        self._lock = threading.Lock()
+
+    # ----------- 듣기 단계 -----------
+    def acquire_microphone(self):
+        while True:
+            with self._lock:
+                if self._quiet.is_set():
+                    self._mic_released.clear()
+                    return
+            self._quiet.wait()
+
+    def release_microphone(self):
+        self._mic_released.set()
+
+    def wrap(self, stream):
+        """
+        :param stream: 마이크 스트림. triggered 속성(vad.SpeechOnsetStream)이 없으면 발화 전으로 보고 바로 양보
+                       (주변 소음 보정 중에도 말하기 단계가 오래 기다리지 않도록)
+        """
+        return _GatedStream(stream, self._speaking)
+
+    # ----------- 말하기 단계 -----------
+    def begin_speaking(self):
+        with self._lock:
+            self._speakers += 1
+            self._quiet.clear()
+            self._speaking.set()
+        self._mic_released.wait()
+
+    def end_speaking(self):
+        with self._lock:
+            self._speakers = max(0, self._speakers - 1)
+            if self._speakers:
+                return
+            self._speaking.clear()
+            self._quiet.set()
+
+
+class _GatedStream:
+    def __init__(self, stream, speaking):
+        self.stream = stream
+        self.speaking = speaking
+
+    def read(self, size):
+        # 이미 사용자가 말하기 시작했으면 끝까지 듣고, 아니면 말하기 단계에 양보
+        if self.speaking.is_set() and not getattr(self.stream, "triggered", False):
+            raise MicrophoneYield()
+        return self.stream.read(size)
+
+    def close(self):
+        return self.stream.close()
@@ -0,0 +1,202 @@
+"""
+pyttsx3 비동기 음성 출력 엔진
+- pyttsx3 엔진을 전용 스레드 하나에서만 생성/사용 (pyttsx3는 스레드 안전하지 않음)
+- speak()는 큐에 넣고 바로 반환 (말하기가 끝날 때까지 기다리려면 wait())
+- stop(): 지금 말하는 문장과 대기 중인 문장을 모두 취소 (engine.stop()도 엔진 스레드에서 실행)
+- 한국어 목소리를 찾은 결과를 파일에 저장해 다음 실행부터는 목록 검색 생략
+- synthesize(): WAV 바이트로 합성 (TTSRace 등에서 로컬 엔진으로 사용)
+"""
+
+import concurrent.futures
+import json
+import logging
+import os
+import platform
+import queue
+import tempfile
+import threading
+
+import pyttsx3
+
+from time_stretch import to_wav_bytes
+
+PYTTSX3_VOICE_CACHE = os.getenv("PYTTSX3_VOICE_CACHE",
+                                os.path.join(os.path.expanduser("~"), ".cache", "voice-assistant", "pyttsx3_voice.json"))
+LOCAL_TTS_RATE = int(os.getenv("LOCAL_TTS_RATE", 180))
+
+
+def _is_korean(voice):
+    return ("korean" in voice.name.lower() or "ko_" in str(voice.languages).lower()
+            or "ko-kr" in voice.id.lower())
+
+
+def _load_voice_cache():
+    try:
+        with open(PYTTSX3_VOICE_CACHE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_voice_cache(cache):
+    try:
+        os.makedirs(os.path.dirname(PYTTSX3_VOICE_CACHE), exist_ok=True)
+        with open(PYTTSX3_VOICE_CACHE, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logging.warning(f"⚠️ 목소리 캐시 저장 실패: {e}")
+
+
+def resolve_voice(engine, preferred=None):
+    """
+    한국어 목소리를 찾아 엔진에 설정하고 id를 반환
+    캐시에 저장된 id가 있으면 목소리 목록을 다시 검색하지 않음
+    """
+    driver = platform.system()  # 운영체제마다 pyttsx3 드라이버와 목소리 id가 다름
+    cache = _load_voice_cache()
+    for voice_id in (preferred, cache.get(driver)):
+        if not voice_id:
+            continue
+        try:
+            engine.setProperty("voice", voice_id)
+            return voice_id
+        except Exception:
+            logging.warning(f"⚠️ 저장된 목소리를 사용할 수 없습니다: {voice_id}")
+
+    for voice in engine.getProperty("voices"):
+        if _is_korean(voice):
+            engine.setProperty("voice", voice.id)
+            cache[driver] = voice.id
+            _save_voice_cache(cache)
+            logging.info(f"🔊 한국어 목소리 선택: {voice.name} ({voice.id})")
+            return voice.id
+    logging.warning("⚠️ 한국어 목소리를 찾지 못해 기본 목소리를 사용합니다.")
+    return None
+
+
+class Pyttsx3Engine:
+    def __init__(self, rate=LOCAL_TTS_RATE, volume=1.0, voice_id=None):
+        """
+        :param voice_id: 사용할 목소리 id (없으면 한국어 목소리를 찾아서 사용)
+        """
+        self.rate = rate
+        self.volume = volume
+        self.voice_id = voice_id
+        self._queue = queue.Queue()
+        self._generation = 0  # stop()이 호출될 때마다 증가, 이전 세대 문장은 버림
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._engine = None
+        self._running = None  # 엔진 스레드에서 실행 중인 작업의 세대
+        self._thread = threading.Thread(target=self._worker, name="pyttsx3", daemon=True)
+        self._thread.start()
+
+    # ----------- 요청 -----------
+    def speak(self, text):
+        """말하기 요청을 큐에 넣고 바로 반환"""
+        self._submit(lambda engine: self._say(engine, text))
+
+    def synthesize(self, text):
+        """WAV 바이트로 합성 (합성이 끝날 때까지 대기)"""
+        future = concurrent.futures.Future()
+        self._submit(lambda engine: self._to_wav(engine, text, future), future)
+        return future.result()
+
+    def _submit(self, job, future=None):
+        with self._lock:
+            self._idle.clear()
+            self._queue.put((self._generation, job, future))
+
+    def wait(self, timeout=None):
+        """큐에 있는 모든 문장을 다 말할 때까지 대기"""
+        return self._idle.wait(timeout)
+
+    def is_speaking(self):
+        return not self._idle.is_set()
+
+    def stop(self):
+        """말하는 중인 문장과 대기 중인 문장을 모두 취소"""
+        with self._lock:
+            self._generation += 1
+            try:
+                while True:
+                    _, _, future = self._queue.get_nowait()
+                    if future is not None:
+                        future.cancel()
+            except queue.Empty:
+                pass
+        # pyttsx3 엔진은 엔진 스레드에서만 조작: 말하는 중이면 단어 콜백(_on_word)에서 멈추고,
+        # 그 밖의 상태 정리는 stop 작업으로 엔진 스레드에 넘김
+        if self._engine is not None:
+            self._submit(lambda engine: engine.stop())
+
+    def close(self):
+        self.stop()
+        self._queue.put(None)
+
+    # ----------- 엔진 스레드 -----------
+    def _init_engine(self):
+        engine = pyttsx3.init()
+        engine.setProperty("rate", self.rate)
+        engine.setProperty("volume", self.volume)
+        engine.connect("started-word", self._on_word)
+        self.voice_id = resolve_voice(engine, self.voice_id)
+        return engine
+
+    def _on_word(self, name, location, length):
+        # runAndWait() 안에서 엔진 스레드가 호출 → 이전 세대 문장이면 여기서 중단
+        if self._running is not None and self._running != self._generation:
+            self._engine.stop()
+
+    def _say(self, engine, text):
+        engine.say(text)
+        engine.runAndWait()
+
+    def _to_wav(self, engine, text, future):
+        if not future.set_running_or_notify_cancel():
+            return
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            # soundfile은 synthesize() 경로에서만 필요 (speak()만 쓰는 v1~v3는 soundfile 없이 동작)
+            import soundfile as sf
+
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            # macOS는 AIFF로 저장하므로 soundfile로 읽어서 WAV로 통일
+            samples, sample_rate = sf.read(path, dtype="float32", always_2d=True)
+            future.set_result(to_wav_bytes(samples.mean(axis=1), sample_rate))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            os.remove(path)
+
+    def _worker(self):
+        try:
+            self._engine = self._init_engine()
+        except Exception as e:
+            logging.error(f"[ERROR] pyttsx3 엔진 초기화 실패: {e}")
+
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            generation, job, future = item
+            if generation == self._generation:
+                try:
+                    if self._engine is None:
+                        raise RuntimeError("pyttsx3 엔진을 사용할 수 없습니다")
+                    self._running = generation
+                    job(self._engine)
+                except Exception as e:
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+                    logging.error(f"[ERROR] 음성 출력 실패: {e}")
+                finally:
+                    self._running = None
+            elif future is not None:
+                future.cancel()
+            with self._lock:
+                if self._queue.empty():
+                    self._idle.set()
@@ -0,0 +1,106 @@
+"""
+GPT 응답 길이 제한 (스트리밍 응답을 문장 단위로 잘라서 생성 중단)
+SYSTEM_PROMPT의 "50자 이내", "1~2개의 문장" 지시를 모델이 무시해도
+N문장 또는 M자에 도달하면 문장 경계에서 자르고 스트림을 닫음
+(M자 안에 문장 경계가 없으면 M자 이전 마지막 공백에서 자름)
+"""
+
+import logging
+import os
+import re
+import time
+
+REPLY_MAX_SENTENCES = int(os.getenv("REPLY_MAX_SENTENCES", 2))
+REPLY_MAX_CHARS = int(os.getenv("REPLY_MAX_CHARS", 80))
+
+# 문장 끝: 마침표/물음표/느낌표(연속 허용) 뒤 공백 또는 줄바꿈
+_SENTENCE_END = re.compile(r"[.!?。！？]+(?=\s|$)|\n+")
+
+
+def sentence_boundaries(text):
+    """문장이 끝나는 위치(문장부호 다음 인덱스) 목록"""
+    return [m.end() for m in _SENTENCE_END.finditer(text) if text[:m.end()].strip()]
+
+
+class ReplyGovernor:
+    def __init__(self, max_sentences=REPLY_MAX_SENTENCES, max_chars=REPLY_MAX_CHARS):
+        self.max_sentences = max_sentences
+        self.max_chars = max_chars
+        self.total_tokens_saved = 0
+        self.total_seconds_saved = 0.0
+
+    def _cut_point(self, text, finished):
+        """
+        잘라야 하면 자를 위치, 아직 더 받아야 하면 None
+        (스트리밍 중에는 텍스트 끝의 문장부호를 "3.5" 같은 경우와 구분할 수 없어 다음 글자를 받은 뒤 확정)
+        """
+        boundaries = sentence_boundaries(text)
+        if not finished:
+            boundaries = [b for b in boundaries if b < len(text)]
+        if len(boundaries) >= self.max_sentences:
+            return boundaries[self.max_sentences - 1]
+        if len(text) >= self.max_chars:
+            within = [b for b in boundaries if b <= self.max_chars]
+            if within:
+                return within[-1]
+            # 문장부호 없이 이어지는 응답: 어절 중간이 잘리지 않도록 마지막 공백에서 자름
+            space = text.rfind(" ", 0, self.max_chars + 1)
+            return space if space > 0 else self.max_chars
+        return None
+
+    def consume(self, stream, max_tokens=None, cancel_event=None):
+        """
+        스트리밍 응답(openai.ChatCompletion.create(stream=True))을 읽다가 제한에 도달하면 중단
+        cancel_event가 설정되면 즉시 스트림을 닫고 빈 문자열 반환
+        :return: (응답 문장, 통계 dict)
+        """
+        start = time.monotonic()
+        text = ""
+        tokens = 0
+        first_token = None
+        cut = None
+        try:
+            for chunk in stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    return "", {"tokens": tokens, "seconds": time.monotonic() - start, "cancelled": True}
+                delta = chunk["choices"][0].get("delta", {}).get("content")
+                if not delta:
+                    continue
+                if first_token is None:
+                    first_token = time.monotonic() - start
+                text += delta
+                tokens += 1
+                cut = self._cut_point(text, finished=False)
+                if cut is not None:
+                    break
+        finally:
+            if hasattr(stream, "close"):
+                stream.close()
+
+        elapsed = time.monotonic() - start
+        stopped_early = cut is not None
+        if cut is None:
+            cut = self._cut_point(text, finished=True) or len(text)
+        reply = text[:cut].strip()
+
+        stats = {
+            "tokens": tokens,
+            "seconds": elapsed,
+            "first_token": first_token,
+            "stopped_early": stopped_early,
+            "trimmed_chars": len(text) - cut,
+            "tokens_saved": 0,
+            "seconds_saved": 0.0,
+        }
+        if stopped_early and max_tokens and tokens:
+            # 모델이 max_tokens까지 생성했다고 가정한 상한값 (토큰 생성 속도는 이번 응답 기준)
+            stats["tokens_saved"] = max(0, max_tokens - tokens)
+            stats["seconds_saved"] = stats["tokens_saved"] * elapsed / tokens
+            self.total_tokens_saved += stats["tokens_saved"]
+            self.total_seconds_saved += stats["seconds_saved"]
+            logging.info(
+                f"✂️ 응답 길이 제한으로 생성 중단: {len(reply)}자 / {tokens}토큰 "
+                f"(최대 {stats['tokens_saved']}토큰, {stats['seconds_saved']:.2f}초 절약, "
+                f"누적 {self.total_tokens_saved}토큰 / {self.total_seconds_saved:.1f}초)"
+            )
+        return reply, stats
@@ -0,0 +1,201 @@
+"""
+부분 인식 결과 기반 GPT 선행 요청 (speculative request)
+- 발화 중간에 주기적으로 STT를 돌려 부분 인식 결과(hypothesis)를 만듦
+- 같은 결과가 SPECULATIVE_STABLE_SECONDS 동안 유지되면 최종 STT 전에 GPT 요청을 미리 보냄
+- 최종 인식 결과가 같으면 그 응답을 그대로 사용(hit), 다르면 취소하고 새로 요청(miss)
+적중률과 앞당긴 시간을 기록
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+SPECULATIVE_LLM = os.getenv("SPECULATIVE_LLM", "0") == "1"
+SPECULATIVE_STABLE_SECONDS = float(os.getenv("SPECULATIVE_STABLE_SECONDS", 0.6))
+SPECULATIVE_PARTIAL_INTERVAL = float(os.getenv("SPECULATIVE_PARTIAL_INTERVAL", 0.8))
+
+_NORMALIZE_PATTERN = re.compile(r"[\s\.\,\?\!~]")
+
+
+def normalize(text):
+    return _NORMALIZE_PATTERN.sub("", text or "")
+
+
+class SpeculativeResponder:
+    def __init__(self, respond_fn, stable_seconds=SPECULATIVE_STABLE_SECONDS, enabled=SPECULATIVE_LLM):
+        """
+        :param respond_fn: (text, cancel_event) -> (응답, 경로) 또는 None. 별도 스레드에서 호출됨
+        """
+        self.respond_fn = respond_fn
+        self.stable_seconds = stable_seconds
+        self.enabled = enabled
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.hypothesis = None
+        self.stable_since = None
+        self.spec_text = None
+        self.spec_started = None
+        self.spec_finished = None
+        self.spec_done = threading.Event()
+        self.spec_result = None
+        self.cancel_event = None
+
+    def update(self, hypothesis):
+        """부분 인식 결과 전달 (STT 스레드에서 주기적으로 호출)"""
+        if not self.enabled or not hypothesis:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if normalize(hypothesis) != normalize(self.hypothesis):
+                self.hypothesis = hypothesis
+                self.stable_since = now
+                if self.spec_text is not None and normalize(self.spec_text) != normalize(hypothesis):
+                    self._cancel_locked("부분 인식 결과 변경")
+                return
+            if self.spec_text is not None or now - self.stable_since < self.stable_seconds:
+                return
+
+            self.spec_text = hypothesis
+            self.spec_started = now
+            self.cancel_event = threading.Event()
+            done, cancel_event = self.spec_done, self.cancel_event
+
+        logging.info(f"🔮 부분 인식 결과로 GPT 선행 요청: {hypothesis}")
+        threading.Thread(target=self._run, args=(hypothesis, cancel_event, done), daemon=True).start()
+
+    def _run(self, text, cancel_event, done):
+        try:
+            result = self.respond_fn(text, cancel_event)
+        except Exception as e:
+            logging.error(f"[ERROR] GPT 선행 요청 실패: {e}")
+            result = None
+        with self._lock:
+            if done is self.spec_done:
+                self.spec_result = result
+                self.spec_finished = time.monotonic()
+        done.set()
+
+    def _cancel_locked(self, reason):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            logging.info(f"🔮 GPT 선행 요청 취소 ({reason})")
+        self.spec_text = None
+        self.spec_started = None
+        self.spec_finished = None
+        self.spec_done = threading.Event()
+        self.spec_result = None
+        self.cancel_event = None
+
+    def cancel(self):
+        """이번 발화에서 GPT를 쓰지 않을 때(Wake Word, 로컬 응답 등) 호출"""
+        with self._lock:
+            self._cancel_locked("GPT 불필요")
+            self._reset()
+
+    def finalize(self, final_text, timeout=None):
+        """
+        최종 인식 결과와 선행 요청을 비교
+        :return: 선행 요청이 적중하면 그 결과 (응답, 경로), 아니면 None (호출 측에서 새로 요청)
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            spec_text, spec_started, done = self.spec_text, self.spec_started, self.spec_done
+            if spec_text is None:
+                self._reset()
+                return None
+            if normalize(spec_text) != normalize(final_text):
+                self.misses += 1
+                self._cancel_locked("최종 인식 결과 불일치")
+                self._reset()
+                self._log_stats()
+                return None
+
+        committed_at = time.monotonic()
+        done.wait(timeout)
+        with self._lock:
+            result = self.spec_result if done.is_set() else None
+            finished = self.spec_finished
+            self._reset()
+            if result is None or result[0] is None:
+                self.misses += 1
+                self._log_stats()
+                return None
+            self.hits += 1
+            # 실제로 가려진 지연만 누적: 최종 인식 결과가 나오기 전에 끝난 요청의 소요 시간
+            # (아직 실행 중이었으면 0으로 셈)
+            if finished is not None and finished <= committed_at:
+                self.saved_seconds += finished - spec_started
+            self._log_stats()
+        return result
+
+    def _log_stats(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        logging.info(f"🔮 선행 요청 적중률 {rate:.0f}% ({self.hits}/{total}), 누적 {self.saved_seconds:.2f}초 단축")
+
+
+class PartialTranscriber:
+    def __init__(self, transcribe_fn, on_hypothesis, sample_rate, interval=SPECULATIVE_PARTIAL_INTERVAL):
+        """
+        :param transcribe_fn: float32 16kHz numpy 배열 -> 텍스트
+        """
+        self.transcribe_fn = transcribe_fn
+        self.on_hypothesis = on_hypothesis
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.chunks = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            self.chunks = []
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def feed(self, chunk):
+        if self._thread is not None:
+            with self._lock:
+                self.chunks.append(chunk)
+
+    def stop(self):
+        """
+        진행 중인 부분 STT가 끝날 때까지 대기
+        (최종 STT가 fork로 프로세스를 만들기 전에 모델을 쓰는 스레드가 없어야 함)
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _audio(self):
+        with self._lock:
+            data = b"".join(self.chunks)
+        audio = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+        if self.sample_rate != 16000 and audio.size:
+            target = int(audio.size * 16000 / self.sample_rate)
+            audio = np.interp(np.linspace(0, audio.size - 1, target), np.arange(audio.size), audio).astype(np.float32)
+        return audio
+
+    def _worker(self):
+        while not self._stop.wait(self.interval):
+            audio = self._audio()
+            if audio.size < 16000 * 0.5:
+                continue
+            try:
+                self.on_hypothesis(self.transcribe_fn(audio))
+            except Exception as e:
+                logging.error(f"[ERROR] 부분 STT 실패: {e}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# voice-assistant/ 의 모듈을 패키지 없이 바로 import (v7.py와 같은 방식)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,39 @@
+import numpy as np
+
+from barge_in import SpeakingGateStream
+
+
+class _FakeStream:
+    def __init__(self, levels):
+        self.chunks = [np.full(160, level, dtype=np.int16).tobytes() for level in levels]
+
+    def read(self, size):
+        return self.chunks.pop(0)
+
+    def close(self):
+        pass
+
+
+def test_robot_voice_is_muted_while_speaking():
+    stopped = []
+    gate = SpeakingGateStream(_FakeStream([500, 500, 500]), 300, lambda: True, lambda: stopped.append(True))
+    assert all(not any(gate.read(160)) for _ in range(3))
+    assert stopped == []
+
+
+def test_loud_speech_stops_tts_and_keeps_its_start():
+    stopped = []
+    stream = _FakeStream([100, 2000, 2000, 2000, 2000])
+    gate = SpeakingGateStream(stream, 300, lambda: not stopped, lambda: stopped.append(True), min_chunks=3)
+    chunks = [gate.read(160) for _ in range(5)]
+    assert stopped == [True]
+    assert not any(chunks[0]) and not any(chunks[1]) and not any(chunks[2])
+    # 모아 둔 청크부터 전달되므로 끼어든 말의 앞부분이 잘리지 않음
+    assert np.frombuffer(chunks[3], dtype=np.int16)[0] == 2000
+    assert np.frombuffer(chunks[4], dtype=np.int16)[0] == 2000
+    assert len(gate.pending) == 2
+
+
+def test_passes_audio_through_when_not_speaking():
+    gate = SpeakingGateStream(_FakeStream([100]), 300, lambda: False, lambda: None)
+    assert np.frombuffer(gate.read(160), dtype=np.int16)[0] == 100
@@ -0,0 +1,34 @@
+import pytest
+
+from intent_router import build_default_router
+
+
+@pytest.fixture
+def router():
+    return build_default_router(on_volume=lambda level, absolute: level if absolute else 50,
+                                on_speed=lambda delta: 1.0 + delta)
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("지금 몇 시야", "time"),
+    ("몇 시에요?", "time"),
+    ("오늘 며칠이야", "date"),
+    ("며칠이야?", "date"),
+    ("무슨 요일이야", "date"),
+    ("너 누구야", "name"),
+    ("볼륨 50으로 해", "volume"),
+])
+def test_local_intents(router, text, intent):
+    assert router.route(text)
+    assert router.intent_counts == {intent: 1}
+
+
+@pytest.mark.parametrize("text", [
+    "며칠 전에 뭐 했는지 알려줘",
+    "며칠 후에 다시 올게",
+    "몇 시간 걸려?",
+    "몇 시에 시작해?",
+    "너 누구 만났어?",
+])
+def test_falls_back_to_gpt(router, text):
+    assert router.route(text) is None
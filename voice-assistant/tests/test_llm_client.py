@@ -0,0 +1,68 @@
+import http.server
+import json
+import threading
+import time
+
+import openai
+import pytest
+from openai import api_requestor
+
+from llm_client import LLMClient
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    clients = set()  # 요청을 보낸 (주소, 포트) = 서버가 받은 TCP 연결
+
+    def setup(self):
+        super().setup()
+        self.clients.add(self.client_address)
+
+    def _reply(self, body=b""):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._reply()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply(json.dumps({"id": "x", "object": "chat.completion", "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": "네"}, "finish_reason": "stop"}]}).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    _Handler.clients.clear()
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    monkeypatch.setattr(openai, "api_base", f"http://127.0.0.1:{httpd.server_address[1]}/v1")
+    monkeypatch.setattr(openai, "api_key", "test")
+    monkeypatch.setattr(openai, "requestssession", None)
+    yield httpd
+    httpd.shutdown()
+
+
+def test_warmed_connection_survives_sdk_session_lifetime(server):
+    client = LLMClient()
+    client._warmup_lock.acquire()
+    client._warm_up("test")
+    assert client._connections_opened() == 1
+
+    # SDK가 세션을 처음 만든 지 MAX_SESSION_LIFETIME_SECS가 지난 상태 → 다음 요청 전에 close() 후 다시 생성
+    api_requestor._thread_context.session = client.session
+    api_requestor._thread_context.session_create_time = time.time() - api_requestor.MAX_SESSION_LIFETIME_SECS - 1
+    try:
+        client.chat(model="gpt-4o-mini", messages=[{"role": "user", "content": "안녕"}])
+    finally:
+        del api_requestor._thread_context.session
+
+    assert len(_Handler.clients) == 1  # 사전 연결을 그대로 재사용 (새 TCP 연결 없음)
+    assert client.last_timing["new_connection"] is False
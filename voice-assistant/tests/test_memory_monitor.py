@@ -0,0 +1,30 @@
+import time
+
+from memory_monitor import MemoryMonitor
+from pipeline import current_turn
+
+
+def _span(stage):
+    return {"type": "span", "stage": stage, "start": time.monotonic(), "seconds": 0.0, "attrs": {}}
+
+
+def test_overlapping_turns_are_tracked_separately():
+    monitor = MemoryMonitor(budget_mb=0, stage_budgets="", trace_stages="", degrade=False, enabled=True)
+    monitor.begin_turn(1)
+    monitor.begin_turn(2)  # 이전 턴을 끝내지 않음
+    assert set(monitor.turns) == {1, 2}
+
+    token = current_turn.set(1)
+    monitor.record(_span("playback"))
+    current_turn.reset(token)
+    token = current_turn.set(2)
+    monitor.record(_span("stt"))
+    current_turn.reset(token)
+
+    assert list(monitor.turns[1]["stages"]) == ["playback"]
+    assert list(monitor.turns[2]["stages"]) == ["stt"]
+
+    assert monitor.end_turn(2) is not None
+    assert set(monitor.turns) == {1}
+    assert monitor.end_turn(1) is not None
+    assert monitor.end_turn(1) is None
@@ -0,0 +1,29 @@
+from reply_governor import ReplyGovernor
+
+
+def _stream(text, size=3):
+    for i in range(0, len(text), size):
+        yield {"choices": [{"delta": {"content": text[i:i + size]}}]}
+
+
+def test_stops_after_max_sentences():
+    governor = ReplyGovernor(max_sentences=2, max_chars=80)
+    reply, stats = governor.consume(_stream("안녕하세요. 나로봇입니다. 무엇을 도와드릴까요?"))
+    assert reply == "안녕하세요. 나로봇입니다."
+    assert stats["stopped_early"]
+
+
+def test_unpunctuated_reply_is_cut_at_last_space_within_limit():
+    governor = ReplyGovernor(max_sentences=2, max_chars=80)
+    text = " ".join(["문장부호 없이 계속 이어지는 긴 응답"] * 10)
+    assert len(text) >= 140
+    reply, stats = governor.consume(_stream(text))
+    assert stats["stopped_early"]
+    assert len(reply) <= 80
+    assert text.startswith(reply) and text[len(reply)] == " "
+
+
+def test_short_reply_is_kept():
+    reply, stats = ReplyGovernor(max_sentences=2, max_chars=80).consume(_stream("네, 알겠어요"))
+    assert reply == "네, 알겠어요"
+    assert not stats["stopped_early"]
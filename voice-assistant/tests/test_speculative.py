@@ -0,0 +1,41 @@
+import threading
+import time
+
+from speculative import SpeculativeResponder
+
+
+def _responder(release, duration=0.0):
+    def respond(text, cancel_event):
+        time.sleep(duration)
+        release.wait(5)
+        return f"{text} 응답", "primary"
+    return SpeculativeResponder(respond, stable_seconds=0.0, enabled=True)
+
+
+def _speculate(responder, text):
+    responder.update(text)
+    responder.update(text)  # 같은 결과가 유지되면 선행 요청 시작
+    assert responder.spec_text == text
+
+
+def test_request_still_running_at_commit_saves_nothing():
+    release = threading.Event()
+    responder = _responder(release)
+    _speculate(responder, "오늘 날씨 어때")
+    threading.Timer(0.2, release.set).start()
+
+    result = responder.finalize("오늘 날씨 어때?", timeout=5)
+    assert result == ("오늘 날씨 어때 응답", "primary")
+    assert responder.hits == 1
+    assert responder.saved_seconds == 0.0
+
+
+def test_finished_request_saves_its_own_duration():
+    release = threading.Event()
+    release.set()
+    responder = _responder(release, duration=0.1)
+    _speculate(responder, "오늘 날씨 어때")
+    time.sleep(0.4)  # 요청이 끝난 뒤 한참 지나서 최종 인식 결과 도착
+
+    assert responder.finalize("오늘 날씨 어때", timeout=5) is not None
+    assert 0.1 <= responder.saved_seconds < 0.3
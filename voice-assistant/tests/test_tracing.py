@@ -0,0 +1,51 @@
+import asyncio
+import json
+import os
+
+from metrics import Metrics
+from pipeline import Stage, Turn, current_turn
+from tracing import Tracer
+
+
+def _stages(directory):
+    traces = {}
+    for name in os.listdir(directory):
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            data = json.load(f)
+        traces[data["metadata"]["turn"]] = sorted(e["name"] for e in data["traceEvents"] if e["ph"] != "M")
+    return traces
+
+
+def test_overlapping_turns_keep_their_own_spans(tmp_path):
+    metrics = Metrics()
+    tracer = Tracer(directory=str(tmp_path), enabled=True)
+    tracer.attach(metrics)
+    first, second = Turn(), Turn()
+
+    async def run():
+        tracer.begin_turn(first.id)
+        await Stage("stt", lambda item, turn: metrics.observe("stt", 0.1)).call(None, first)
+        # 다음 턴이 시작된 뒤에 끝난 이전 턴의 단계도 이전 턴에 기록
+        tracer.begin_turn(second.id)
+        await Stage("stt", lambda item, turn: metrics.observe("stt", 0.1)).call(None, second)
+        await Stage("speak", lambda item, turn: metrics.observe("playback", 0.2)).call(None, first)
+        tracer.end_turn(first.id)
+        await Stage("respond", lambda item, turn: metrics.observe("llm", 0.3)).call(None, second)
+        tracer.end_turn(second.id)
+
+    asyncio.run(run())
+    assert _stages(str(tmp_path)) == {first.id: ["playback", "stt"], second.id: ["llm", "stt"]}
+
+
+def test_spans_outside_a_turn_are_dropped(tmp_path):
+    metrics = Metrics()
+    tracer = Tracer(directory=str(tmp_path), enabled=True)
+    tracer.attach(metrics)
+    turn = Turn()
+    tracer.begin_turn(turn.id)
+    metrics.observe("model_load", 1.0)
+    token = current_turn.set(turn.id)
+    metrics.observe("stt", 0.1)
+    current_turn.reset(token)
+    tracer.end_turn(turn.id)
+    assert _stages(str(tmp_path)) == {turn.id: ["stt"]}
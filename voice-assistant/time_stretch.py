@@ -0,0 +1,91 @@
+"""
+프로세스 내부 재생 속도 조절 (ffmpeg atempo 대체)
+gTTS MP3 바이트를 메모리에서 디코딩하고, 음높이를 유지한 채 WSOLA로 길이를 줄여
+바로 재생 엔진(AudioPlayer)에 넘김 (서브프로세스 실행, 임시 파일 없음)
+"""
+
+import io
+import wave
+
+import numpy as np
+
+# 프레임 길이 / 탐색 범위 (초 단위, 샘플레이트에 맞춰 변환)
+WSOLA_FRAME_SECONDS = 0.04
+WSOLA_TOLERANCE_SECONDS = 0.01
+
+
+def decode_mp3(data):
+    """
+    MP3 바이트 -> (float32 모노 샘플, 샘플레이트) (libsndfile 1.1 이상 필요)
+    soundfile은 MP3 경로에서만 필요하므로 여기서 import (to_wav_bytes만 쓰는 모듈은 soundfile 없이 동작)
+    """
+    import soundfile as sf
+
+    samples, sample_rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    return samples.mean(axis=1), sample_rate
+
+
+def wsola(samples, speed, sample_rate):
+    """
+    WSOLA(Waveform Similarity Overlap-Add) 시간 축 변환
+    speed > 1이면 빨라짐 (ffmpeg atempo와 같은 의미). 음높이는 유지
+    """
+    if abs(speed - 1.0) < 1e-3 or samples.size == 0:
+        return samples.astype(np.float32)
+
+    frame = int(sample_rate * WSOLA_FRAME_SECONDS) & ~1
+    synthesis_hop = frame // 2
+    analysis_hop = synthesis_hop * speed
+    tolerance = int(sample_rate * WSOLA_TOLERANCE_SECONDS)
+    window = np.hanning(frame).astype(np.float32)
+
+    # 앞뒤를 0으로 채워 탐색 범위가 배열 밖으로 나가지 않도록 함
+    padded = np.concatenate([
+        np.zeros(tolerance, dtype=np.float32),
+        samples.astype(np.float32),
+        np.zeros(frame + tolerance + synthesis_hop, dtype=np.float32),
+    ])
+    # 모든 후보 구간을 복사 없이 2차원 view로 만들어 상관도 계산을 행렬 곱으로 처리
+    windows = np.lib.stride_tricks.sliding_window_view(padded, frame)
+
+    frames = int((samples.size - frame) / analysis_hop) + 2 if samples.size > frame else 1
+    output = np.zeros(frames * synthesis_hop + frame, dtype=np.float32)
+    norm = np.zeros_like(output)
+
+    previous = tolerance  # 이전에 선택한 프레임 시작 위치 (padded 기준)
+    for k in range(frames):
+        nominal = tolerance + int(round(k * analysis_hop))
+        if k == 0:
+            chosen = nominal
+        else:
+            # 이전 프레임의 자연스러운 다음 구간과 가장 비슷한 위치를 nominal ± tolerance 안에서 선택
+            template = windows[min(previous + synthesis_hop, len(windows) - 1)]
+            low = max(nominal - tolerance, 0)
+            high = min(nominal + tolerance, len(windows) - 1)
+            candidates = windows[low:high + 1]
+            chosen = low + int(np.argmax(candidates @ template))
+        start = k * synthesis_hop
+        output[start:start + frame] += windows[chosen] * window
+        norm[start:start + frame] += window
+        previous = chosen
+
+    norm[norm < 1e-3] = 1.0
+    length = int(round(samples.size / speed))
+    return (output / norm)[:length]
+
+
+def to_wav_bytes(samples, sample_rate):
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def stretch_mp3_to_wav(mp3_bytes, speed):
+    """gTTS MP3 -> 속도 조절된 WAV 바이트 (캐시 저장/재생용)"""
+    samples, sample_rate = decode_mp3(mp3_bytes)
+    return to_wav_bytes(wsola(samples, speed, sample_rate), sample_rate)
@@ -0,0 +1,138 @@
+"""
+턴 단위 추적 (Chrome trace / Perfetto JSON)
+- 질문 한 번마다 trace id를 만들고, 그동안 metrics에 기록되는 모든 단계(span)를 모음
+  (보정, 듣기, 발화 끝 판정, WAV 변환, Whisper, Wake Word, GPT 요청/첫 토큰, TTS 합성, 재생 등)
+- span 속성(오디오 길이, 인식 글자 수, 모델 등)은 args로, 실패는 instant 이벤트로 기록
+- 턴이 끝나면 TRACE_DIR에 JSON 파일로 저장하고 TRACE_MAX_FILES개를 넘으면 오래된 파일부터 삭제
+  → 느렸던 턴 하나를 https://ui.perfetto.dev 또는 chrome://tracing에서 바로 열어볼 수 있음
+듣기 단계(보정/듣기/발화 끝)는 다음 턴에, 나머지 span은 그 span을 기록한 단계의 턴(pipeline.current_turn)에 기록
+(파이프라인 모드에서 턴이 겹쳐도 각 턴의 추적이 섞이지 않음, 턴 밖에서 기록된 span은 버림)
+"""
+
+import collections
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from pipeline import current_turn
+
+TRACING = os.getenv("TRACING", "1") == "1"
+TRACE_DIR = os.getenv("TRACE_DIR", "./logs/traces")
+TRACE_MAX_FILES = int(os.getenv("TRACE_MAX_FILES", 200))
+# 다음 턴의 입력 단계: 이전 턴 처리 중에 일어나도 다음 턴 추적에 포함
+CAPTURE_STAGES = {"calibration", "listen", "endpoint"}
+
+
+class Trace:
+    def __init__(self, turn):
+        self.id = uuid.uuid4().hex[:16]
+        self.turn = turn
+        self.started = time.monotonic()
+        self.wall_started = time.time()
+        self.events = []
+        self.threads = {}  # 스레드 ident -> (tid, 이름)
+
+    def _tid(self, thread):
+        entry = self.threads.get(thread.ident)
+        if entry is None:
+            entry = self.threads[thread.ident] = (len(self.threads) + 1, thread.name)
+        return entry[0]
+
+    def add(self, event, thread):
+        args = {k: v for k, v in event["attrs"].items() if v is not None}
+        record = {
+            "name": event["stage"],
+            "cat": "stage",
+            "ts": round(event["start"] * 1e6),
+            "pid": 1,
+            "tid": self._tid(thread),
+            "args": args,
+        }
+        if event["type"] == "failure":
+            record.update(ph="i", s="t", cat="failure", name=f"{event['stage']} 실패")
+        else:
+            record.update(ph="X", dur=round(event["seconds"] * 1e6))
+        self.events.append(record)
+
+    def to_chrome(self):
+        metadata = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": f"turn {self.turn} ({self.id})"}}]
+        for tid, name in self.threads.values():
+            metadata.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}})
+        return {
+            "traceEvents": metadata + sorted(self.events, key=lambda e: e["ts"]),
+            "displayTimeUnit": "ms",
+            "metadata": {"trace_id": self.id, "turn": self.turn,
+                         "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.wall_started))},
+        }
+
+
+class Tracer:
+    def __init__(self, directory=TRACE_DIR, max_files=TRACE_MAX_FILES, enabled=TRACING):
+        self.directory = directory
+        self.max_files = max_files
+        self.enabled = enabled
+        self.traces = {}  # Turn id -> 진행 중인 Trace
+        self._capture = collections.deque(maxlen=50)  # 아직 턴이 시작되지 않은 입력 단계 이벤트
+        self._lock = threading.Lock()
+
+    def attach(self, metrics):
+        """metrics의 모든 span/실패 이벤트를 그 이벤트를 기록한 턴에 기록"""
+        if self.enabled:
+            metrics.add_listener(self.record)
+
+    def begin_turn(self, turn_id):
+        """
+        새 턴 시작 (발화 끝 감지 후 호출). 이 턴의 듣기 단계 이벤트를 가져옴
+        아직 끝나지 않은 다른 턴의 추적은 그대로 둠 (각자 end_turn에서 저장)
+        :param turn_id: pipeline.Turn id (이 턴의 단계가 current_turn에 설정하는 값)
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            trace = self.traces[turn_id] = Trace(turn_id)
+            for event, thread in self._capture:
+                trace.add(event, thread)
+            self._capture.clear()
+        return trace.id
+
+    def record(self, event):
+        thread = threading.current_thread()
+        turn_id = current_turn.get()
+        with self._lock:
+            if event["stage"] in CAPTURE_STAGES:
+                if event["stage"] == "calibration":
+                    self._capture.clear()  # 새로 듣기 시작 → 이전 듣기 시도는 버림
+                self._capture.append((event, thread))
+            elif turn_id in self.traces:
+                self.traces[turn_id].add(event, thread)
+
+    def end_turn(self, turn_id):
+        with self._lock:
+            trace = self.traces.pop(turn_id, None)
+        if trace is not None:
+            self._write(trace)
+
+    def _write(self, trace):
+        if not trace.events:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            name = time.strftime("%Y%m%d-%H%M%S", time.localtime(trace.wall_started))
+            path = os.path.join(self.directory, f"{name}-turn{trace.turn:05d}-{trace.id}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(trace.to_chrome(), f, ensure_ascii=False)
+            self._rotate()
+            logging.info(f"🧭 턴 #{trace.turn} 추적 저장 ({time.monotonic() - trace.started:.2f}초): {path}")
+        except OSError as e:
+            logging.warning(f"⚠️ 추적 파일 저장 실패: {e}")
+
+    def _rotate(self):
+        files = sorted(f for f in os.listdir(self.directory) if f.endswith(".json"))
+        for old in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except OSError:
+                pass
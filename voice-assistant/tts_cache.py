@@ -0,0 +1,238 @@
+"""
+TTS 오디오 캐시 (내용 주소 기반 + LRU)
+- 키: (문장, 엔진, 목소리, 말하기 속도)의 SHA-256 해시
+- 메모리 hot tier: 최근 사용한 오디오를 TTS_CACHE_MEMORY_MB 안에서 보관
+- 디스크: zlib 압축해서 TTS_CACHE_DIR에 저장, TTS_CACHE_DISK_MB를 넘으면 오래 안 쓴 파일부터 삭제
+인사말, 오류 안내, 자주 나오는 답변은 네트워크 없이 바로 재생
+
+사전 생성(pre-warm):
+    python tts_cache.py --prewarm phrases.txt   (한 줄에 한 문장)
+"""
+
+import argparse
+import collections
+import hashlib
+import logging
+import os
+import threading
+import time
+import zlib
+
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "voice-assistant", "tts"))
+TTS_CACHE_DISK_MB = float(os.getenv("TTS_CACHE_DISK_MB", 200))
+TTS_CACHE_MEMORY_MB = float(os.getenv("TTS_CACHE_MEMORY_MB", 16))
+
+# 파일 첫 바이트: 압축 여부 (MP3처럼 이미 압축된 오디오는 zlib이 오히려 커질 수 있음)
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+
+
+def cache_key(text, engine, voice, rate):
+    raw = "\x1f".join([engine, voice, f"{float(rate):.3f}", text.strip()])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    def __init__(self, directory=TTS_CACHE_DIR, disk_limit_mb=TTS_CACHE_DISK_MB, memory_limit_mb=TTS_CACHE_MEMORY_MB):
+        self.directory = directory
+        self.disk_limit = int(disk_limit_mb * 1024 * 1024)
+        self.memory_limit = int(memory_limit_mb * 1024 * 1024)
+        os.makedirs(directory, exist_ok=True)
+
+        self._memory = collections.OrderedDict()
+        self._memory_size = 0
+        self._disk = collections.OrderedDict()  # key -> 파일 크기 (오래 안 쓴 순서)
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self._scan()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".z")
+
+    def _scan(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".z"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    entries.append((stat.st_mtime, name[:-2], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_size += size
+
+    # ----------- 메모리 tier -----------
+    def _remember(self, key, audio):
+        if len(audio) > self.memory_limit:
+            return
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = audio
+        self._memory_size += len(audio)
+        while self._memory_size > self.memory_limit:
+            _, old = self._memory.popitem(last=False)
+            self._memory_size -= len(old)
+
+    def clear_memory(self):
+        """메모리 부족 시 hot tier 비우기 (디스크 캐시는 유지)"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+
+    def disable_memory(self):
+        """메모리 tier 끄기 (메모리 부족 시 성능 저하 모드, 이후 디스크 캐시만 사용)"""
+        with self._lock:
+            self.memory_limit = 0
+        self.clear_memory()
+
+    # ----------- 조회 / 저장 -----------
+    def get(self, text, engine, voice, rate):
+        key = cache_key(text, engine, voice, rate)
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits["memory"] += 1
+                return audio
+            on_disk = key in self._disk
+
+        if on_disk:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+                audio = zlib.decompress(data[1:]) if data[:1] == _ZLIB else data[1:]
+                os.utime(self._path(key))
+                with self._lock:
+                    if key in self._disk:
+                        self._disk.move_to_end(key)
+                    self._remember(key, audio)
+                    self.hits["disk"] += 1
+                return audio
+            except Exception as e:
+                logging.warning(f"⚠️ TTS 캐시 읽기 실패, 항목을 삭제합니다: {e}")
+                self._remove(key)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, text, engine, voice, rate, audio):
+        if not audio:
+            return
+        key = cache_key(text, engine, voice, rate)
+        compressed = zlib.compress(audio, 6)
+        data = _ZLIB + compressed if len(compressed) < len(audio) else _RAW + audio
+
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception as e:
+            logging.warning(f"⚠️ TTS 캐시 저장 실패: {e}")
+            return
+
+        with self._lock:
+            self._remember(key, audio)
+            self._disk_size += len(data) - self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            evict = []
+            while self._disk_size > self.disk_limit and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_size -= size
+                evict.append(old_key)
+        for old_key in evict:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def _remove(self, key):
+        with self._lock:
+            self._disk_size -= self._disk.pop(key, 0)
+            audio = self._memory.pop(key, None)
+            if audio is not None:
+                self._memory_size -= len(audio)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def get_or_synthesize(self, text, engine, voice, rate, synthesize_fn):
+        """
+        캐시에 있으면 바로 반환, 없으면 synthesize_fn()으로 합성 후 저장
+        """
+        audio = self.get(text, engine, voice, rate)
+        if audio is not None:
+            logging.info(f"💾 TTS 캐시 사용: {text[:20]}")
+            return audio
+        audio = synthesize_fn()
+        self.put(text, engine, voice, rate, audio)
+        return audio
+
+    def stats(self):
+        with self._lock:
+            return {
+                "memory_hits": self.hits["memory"],
+                "disk_hits": self.hits["disk"],
+                "misses": self.misses,
+                "memory_bytes": self._memory_size,
+                "disk_bytes": self._disk_size,
+                "disk_entries": len(self._disk),
+            }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """프로세스 전체에서 공유하는 캐시 (처음 사용할 때 생성)"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = TTSCache()
+        return _default_cache
+
+
+# ----------- 사전 생성 CLI -----------
+def prewarm(phrases, voice, rate):
+    """
+    TTSScheduler는 응답을 문장 단위로 나눠 합성하므로 캐시 키도 같은 방식(split_sentences)으로 나눈 문장이어야 적중함
+    """
+    from tts_engine import GoogleTTSEngine
+    from tts_scheduler import split_sentences
+
+    engine = GoogleTTSEngine(voice, rate, cache=default_cache())
+    chunks = list(dict.fromkeys(chunk for phrase in phrases for chunk in split_sentences(phrase)))
+    start = time.monotonic()
+    for chunk in chunks:
+        engine.synthesize(chunk)
+    logging.info(f"💾 TTS 캐시 사전 생성 완료: {len(phrases)}줄 → {len(chunks)}개 문장, {time.monotonic() - start:.1f}초 "
+                 f"| {default_cache().stats()}")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="TTS 오디오 캐시 관리")
+    parser.add_argument("--prewarm", metavar="FILE", help="미리 합성할 응답 목록 (한 줄에 한 응답, 재생할 때처럼 문장 단위로 나눠 저장)")
+    parser.add_argument("--voice", default=os.getenv("TTS_VOICE", "ko-KR-Standard-A"))
+    parser.add_argument("--rate", type=float, default=float(os.getenv("TTS_SPEAKING_RATE", 1.1)))
+    parser.add_argument("--stats", action="store_true", help="캐시 상태 출력")
+    args = parser.parse_args()
+
+    if args.prewarm:
+        with open(args.prewarm, encoding="utf-8") as f:
+            phrases = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        prewarm(phrases, args.voice, args.rate)
+    if args.stats or not args.prewarm:
+        print(default_cache().stats())
+
+
+if __name__ == "__main__":
+    main()
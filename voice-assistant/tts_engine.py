@@ -0,0 +1,181 @@
+"""
+Google Cloud TTS 엔진 관리 (클라이언트 1회 생성 + 사전 연결)
+- TextToSpeechClient, VoiceSelectionParams, AudioConfig를 시작 시 한 번만 생성
+- 작은 문장을 미리 합성해 gRPC 채널/인증/TLS 연결을 준비 (keepalive로 연결 유지)
+- 호출 실패 시 클라이언트를 다시 만들고 한 번 재시도
+- 호출마다 준비(클라이언트 생성) 시간과 합성 시간을 나눠서 기록
+"""
+
+import logging
+import os
+import threading
+import time
+
+import grpc
+from google.cloud import texttospeech
+from google.cloud.texttospeech_v1.services.text_to_speech.transports import TextToSpeechGrpcTransport
+
+from metrics import metrics
+
+TTS_ENDPOINT = os.getenv("TTS_ENDPOINT", "texttospeech.googleapis.com")
+# 인증/TLS 없는 채널 (로컬 대역 서버 benchmark/tts_server.py 등)
+TTS_INSECURE = os.getenv("TTS_INSECURE", "0") == "1"
+TTS_KEEPALIVE_MS = int(os.getenv("TTS_KEEPALIVE_MS", 30000))
+TTS_REQUEST_TIMEOUT = float(os.getenv("TTS_REQUEST_TIMEOUT", 10.0))
+
+# 연결이 오래 쉬어도 끊기지 않도록 gRPC keepalive ping 설정
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", TTS_KEEPALIVE_MS),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.max_receive_message_length", -1),
+]
+
+
+class GoogleTTSEngine:
+    def __init__(self, voice_name, speaking_rate=1.0, language_code="ko-KR",
+                 audio_encoding=texttospeech.AudioEncoding.LINEAR16, cache=None):
+        """
+        :param cache: TTSCache를 넘기면 같은 문장/목소리/속도는 다시 합성하지 않음
+        """
+        self.voice_name = voice_name
+        self.cache = cache
+        self.cache_engine = f"google-{texttospeech.AudioEncoding(audio_encoding).name.lower()}"
+        self.speaking_rate = speaking_rate
+        self.audio_encoding = audio_encoding
+        self.voice = texttospeech.VoiceSelectionParams(
+            language_code=language_code,
+            name=voice_name,
+            ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
+        )
+        self._audio_configs = {}
+        self._client = None
+        self._in_flight = {}  # id(클라이언트) -> 진행 중인 호출 수 (병렬 문장 합성이 같은 클라이언트를 공유)
+        self._lock = threading.RLock()
+        self.last_timing = {}
+
+    def _audio_config(self, speaking_rate):
+        # 말하기 속도가 바뀔 때만 새로 생성
+        config = self._audio_configs.get(speaking_rate)
+        if config is None:
+            config = texttospeech.AudioConfig(audio_encoding=self.audio_encoding, speaking_rate=speaking_rate)
+            self._audio_configs[speaking_rate] = config
+        return config
+
+    def _create_client(self):
+        if TTS_INSECURE:
+            channel = grpc.insecure_channel(TTS_ENDPOINT, options=CHANNEL_OPTIONS)
+        else:
+            channel = TextToSpeechGrpcTransport.create_channel(TTS_ENDPOINT, options=CHANNEL_OPTIONS)
+        try:
+            # TCP/TLS 연결까지 여기서 끝내서 준비 시간에 포함
+            grpc.channel_ready_future(channel).result(timeout=TTS_REQUEST_TIMEOUT)
+        except grpc.FutureTimeoutError:
+            logging.warning("⚠️ Google Cloud TTS 채널 연결 대기 시간 초과")
+        return texttospeech.TextToSpeechClient(transport=TextToSpeechGrpcTransport(host=TTS_ENDPOINT, channel=channel))
+
+    def client(self):
+        """
+        :return: (클라이언트, 이번 호출에서 클라이언트 생성에 걸린 시간)
+        """
+        with self._lock:
+            if self._client is not None:
+                return self._client, 0.0
+            start = time.monotonic()
+            self._client = self._create_client()
+            setup = time.monotonic() - start
+            logging.info(f"🔌 Google Cloud TTS 클라이언트 생성 ({setup:.3f}초)")
+            return self._client, setup
+
+    def reset(self, failed_client=None):
+        """
+        클라이언트를 버리고 다음 호출에서 새로 생성
+        :param failed_client: 실패한 호출이 사용한 클라이언트 (다른 호출이 이미 새로 만들었으면 아무것도 하지 않음)
+        다른 호출이 아직 쓰고 있는 연결은 바로 닫지 않고 마지막 호출이 끝날 때 닫음
+        """
+        with self._lock:
+            if self._client is None or (failed_client is not None and failed_client is not self._client):
+                return
+            client, self._client = self._client, None
+            busy = id(client) in self._in_flight
+        if not busy:
+            self._close(client)
+
+    @staticmethod
+    def _close(client):
+        try:
+            client.transport.close()
+        except Exception:
+            pass
+
+    def _acquire(self):
+        with self._lock:
+            client, setup = self.client()
+            self._in_flight[id(client)] = self._in_flight.get(id(client), 0) + 1
+            return client, setup
+
+    def _release(self, client):
+        with self._lock:
+            remaining = self._in_flight.get(id(client), 1) - 1
+            if remaining > 0:
+                self._in_flight[id(client)] = remaining
+                return
+            self._in_flight.pop(id(client), None)
+            retired = client is not self._client
+        if retired:
+            self._close(client)
+
+    def warm_up(self, background=True):
+        """짧은 문장을 합성해 채널 연결/인증을 미리 끝내둠"""
+        def _run():
+            try:
+                self.synthesize(".", use_cache=False)
+                logging.info(f"🔥 Google Cloud TTS 사전 연결 완료 ({self.last_timing.get('total', 0):.3f}초)")
+            except Exception as e:
+                logging.warning(f"⚠️ Google Cloud TTS 사전 연결 실패: {e}")
+
+        if background:
+            threading.Thread(target=_run, daemon=True).start()
+        else:
+            _run()
+
+    def synthesize(self, text, speaking_rate=None, use_cache=True):
+        """
+        :return: 합성된 오디오 바이트 (LINEAR16이면 WAV 헤더 포함)
+        """
+        rate = self.speaking_rate if speaking_rate is None else speaking_rate
+        if use_cache and self.cache is not None:
+            return self.cache.get_or_synthesize(text, self.cache_engine, self.voice_name, rate,
+                                                lambda: self._synthesize(text, rate))
+        return self._synthesize(text, rate)
+
+    def _synthesize(self, text, rate):
+        synthesis_input = texttospeech.SynthesisInput(text=text)
+        audio_config = self._audio_config(rate)
+
+        for attempt in range(2):
+            client, setup = self._acquire()
+            start = time.monotonic()
+            try:
+                response = client.synthesize_speech(
+                    input=synthesis_input,
+                    voice=self.voice,
+                    audio_config=audio_config,
+                    timeout=TTS_REQUEST_TIMEOUT,
+                )
+            except Exception as e:
+                metrics.failure("tts_synthesis", e, engine=self.cache_engine)
+                if attempt == 0:
+                    logging.warning(f"⚠️ Google Cloud TTS 호출 실패, 클라이언트를 다시 만듭니다: {e}")
+                    self.reset(client)
+                    continue
+                raise
+            finally:
+                self._release(client)
+            synthesis = time.monotonic() - start
+            metrics.observe("tts_synthesis", setup + synthesis, start=start - setup, engine=self.cache_engine,
+                            voice=self.voice_name, chars=len(text), setup=setup)
+            self.last_timing = {"setup": setup, "synthesis": synthesis, "total": setup + synthesis}
+            logging.info(f"⏱️ TTS 합성 {setup + synthesis:.3f}초 (준비 {setup:.3f}초, 합성 {synthesis:.3f}초)")
+            return response.audio_content
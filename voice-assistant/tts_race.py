@@ -0,0 +1,75 @@
+"""
+클라우드 / 로컬 TTS 경쟁 (지연 예산 기반)
+- 먼저 Google Cloud TTS 합성을 시작
+- TTS_CLOUD_BUDGET 안에 끝나지 않거나 오류가 나면 로컬 엔진(pyttsx3)도 시작
+- 둘 중 먼저 성공한 쪽의 오디오를 사용 (늦게 끝난 클라우드 결과는 캐시에 저장되어 다음에 재사용)
+- 결과(cloud / cloud_late / local / local_after_error / failed)를 집계해 지표로 사용
+네트워크가 느려져도 로봇이 정해진 시간 안에 말을 시작하도록 함
+"""
+
+import collections
+import concurrent.futures
+import contextvars
+import logging
+import os
+import threading
+import time
+
+TTS_CLOUD_BUDGET = float(os.getenv("TTS_CLOUD_BUDGET", 1.5))
+
+
+class TTSRace:
+    def __init__(self, cloud_fn, local_fn, budget=TTS_CLOUD_BUDGET):
+        """
+        :param cloud_fn: 문장 -> WAV 바이트 (Google Cloud TTS)
+        :param local_fn: 문장 -> WAV 바이트 (로컬 엔진)
+        :param budget: 클라우드만 기다리는 최대 시간(초)
+        """
+        self.cloud_fn = cloud_fn
+        self.local_fn = local_fn
+        self.budget = budget
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="tts-race")
+        self._lock = threading.Lock()
+        self.outcomes = collections.Counter()
+
+    def _record(self, outcome, elapsed):
+        with self._lock:
+            self.outcomes[outcome] += 1
+        if outcome != "cloud":
+            logging.info(f"🏁 TTS 경쟁 결과: {outcome} ({elapsed:.3f}초) | 누적 {dict(self.outcomes)}")
+
+    def synthesize(self, text):
+        """
+        :return: WAV 바이트 (두 엔진 모두 실패하면 예외)
+        """
+        start = time.monotonic()
+        cloud = self._executor.submit(contextvars.copy_context().run, self.cloud_fn, text)  # 턴 추적 context 유지
+        done, _ = concurrent.futures.wait([cloud], timeout=self.budget)
+        if cloud in done and cloud.exception() is None:
+            self._record("cloud", time.monotonic() - start)
+            return cloud.result()
+
+        cloud_failed = cloud in done
+        if cloud_failed:
+            logging.warning(f"⚠️ 클라우드 TTS 실패, 로컬 엔진 사용: {cloud.exception()}")
+        else:
+            logging.warning(f"⚠️ 클라우드 TTS가 {self.budget:.1f}초 안에 끝나지 않아 로컬 엔진을 함께 시작합니다")
+        local = self._executor.submit(contextvars.copy_context().run, self.local_fn, text)
+
+        pending = {local} if cloud_failed else {cloud, local}
+        errors = [cloud.exception()] if cloud_failed else []
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    errors.append(future.exception())
+                    continue
+                if future is cloud:
+                    outcome = "cloud_late"
+                else:
+                    outcome = "local_after_error" if cloud_failed else "local"
+                self._record(outcome, time.monotonic() - start)
+                return future.result()
+
+        self._record("failed", time.monotonic() - start)
+        raise RuntimeError(f"모든 TTS 엔진 실패: {errors}")
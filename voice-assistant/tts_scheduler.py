@@ -0,0 +1,140 @@
+"""
+문장 단위 병렬 TTS 합성 + 순서대로 재생
+- 응답을 한국어 문장 경계에서 나누고, 최대 TTS_MAX_IN_FLIGHT개까지 동시에 합성
+- 첫 문장이 준비되는 즉시 재생을 시작하고, 나머지는 반드시 원래 순서대로 이어서 재생
+- 문장 사이에는 짧은 무음을 넣고 양 끝에 짧은 fade를 적용해 이음새의 클릭음 제거
+첫 소리까지 걸린 시간(time-to-first-audio)과 마지막 문장 합성이 끝난 시간을 함께 기록
+TTS_BASELINE_SAMPLE 비율만큼은 응답 전체를 한 번에 합성하는 요청을 따로 보내 첫 소리 시간과 비교 (API 호출이 늘어남)
+"""
+
+import concurrent.futures
+import contextvars
+import logging
+import os
+import random
+import re
+import time
+
+import numpy as np
+
+from audio_player import decode_wav
+from metrics import metrics
+
+TTS_MAX_IN_FLIGHT = int(os.getenv("TTS_MAX_IN_FLIGHT", 3))
+TTS_CHUNK_GAP_SECONDS = float(os.getenv("TTS_CHUNK_GAP_SECONDS", 0.08))
+TTS_MIN_CHUNK_CHARS = int(os.getenv("TTS_MIN_CHUNK_CHARS", 8))
+TTS_BASELINE_SAMPLE = float(os.getenv("TTS_BASELINE_SAMPLE", 0))  # 0~1, 응답 전체 한 번에 합성 비교 비율
+FADE_SECONDS = 0.005
+
+# 문장부호(. ! ? 。) 뒤 공백 또는 줄바꿈 기준으로 분리
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+
+
+def split_sentences(text, min_chars=TTS_MIN_CHUNK_CHARS):
+    """
+    문장 단위로 분리. 너무 짧은 조각("네.")은 다음 문장과 합쳐 요청 수를 줄임
+    """
+    pieces = [p.strip() for p in _SENTENCE_SPLIT.split(text) if p and p.strip()]
+    chunks = []
+    pending = ""
+    for piece in pieces:
+        pending = f"{pending} {piece}".strip()
+        if len(pending) >= min_chars:
+            chunks.append(pending)
+            pending = ""
+    if pending:
+        if chunks:
+            chunks[-1] = f"{chunks[-1]} {pending}"
+        else:
+            chunks.append(pending)
+    return chunks
+
+
+def apply_fade(samples, sample_rate):
+    samples = samples.astype(np.float32)
+    n = min(int(sample_rate * FADE_SECONDS), samples.size // 2)
+    if n > 0:
+        ramp = np.linspace(0.0, 1.0, n, dtype=np.float32)
+        samples[:n] *= ramp
+        samples[-n:] *= ramp[::-1]
+    return samples.astype(np.int16)
+
+
+class TTSScheduler:
+    def __init__(self, player, synthesize_fn, max_in_flight=TTS_MAX_IN_FLIGHT, gap_seconds=TTS_CHUNK_GAP_SECONDS,
+                 baseline_fn=None, baseline_sample=TTS_BASELINE_SAMPLE):
+        """
+        :param synthesize_fn: 문장 -> WAV 바이트 (여러 스레드에서 동시에 호출됨)
+        :param baseline_fn: 비교용 전체 응답 합성 (캐시를 거치지 않아야 실제 시간이 나옴, None이면 비교 안 함)
+        :param baseline_sample: 이 비율의 응답은 전체를 한 번에 합성하는 시간도 측정 (재생하지 않음)
+        """
+        self.player = player
+        self.synthesize_fn = synthesize_fn
+        self.gap_seconds = gap_seconds
+        self.baseline_fn = baseline_fn
+        self.baseline_sample = baseline_sample
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="tts")
+        self.last_stats = {}
+
+    def speak(self, text, cancel_event=None, on_first_audio=None):
+        """
+        문장별 합성을 시작하고 준비되는 순서(= 원래 순서)대로 재생 큐에 넣음. 재생 완료는 기다리지 않음
+        :param on_first_audio: 첫 문장을 재생 큐에 넣기 직전에 호출 (채움말 취소 등)
+        :return: 통계 dict (첫 소리까지 시간, 마지막 문장 합성 완료 시간, 문장 수)
+        """
+        start = time.monotonic()
+        chunks = split_sentences(text)
+        if not chunks:
+            return {}
+        # 합성 스레드에서 기록하는 span도 이 턴에 기록되도록 context를 넘김
+        futures = [self._executor.submit(contextvars.copy_context().run, self.synthesize_fn, chunk) for chunk in chunks]
+        ready = {}
+        for index, future in enumerate(futures):
+            future.add_done_callback(lambda _, index=index: ready.setdefault(index, time.monotonic()))
+
+        first_audio = None
+        try:
+            for index, future in enumerate(futures):
+                # 합성을 기다리는 중에도 취소(끼어들기 등)에 바로 반응
+                while cancel_event is not None and not cancel_event.is_set() and not future.done():
+                    concurrent.futures.wait([future], timeout=0.05)
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                audio = future.result()
+                samples, sample_rate = decode_wav(audio)
+                if index == 0 and on_first_audio is not None:
+                    on_first_audio()
+                if index > 0 and self.gap_seconds > 0:
+                    self.player.play_silence(self.gap_seconds)
+                self.player.play_pcm(apply_fade(samples, sample_rate), sample_rate)
+                if first_audio is None:
+                    first_audio = time.monotonic() - start
+        finally:
+            for future in futures:
+                future.cancel()
+
+        last_chunk = max(ready.values()) - start if len(ready) == len(futures) else None
+        self.last_stats = {
+            "chunks": len(chunks),
+            "time_to_first_audio": first_audio,
+            "last_chunk_ready": last_chunk,
+        }
+        if first_audio is not None and last_chunk is not None:
+            logging.info(f"🗣️ TTS {len(chunks)}문장: 첫 소리까지 {first_audio:.3f}초 / "
+                         f"마지막 문장 합성 완료 {last_chunk:.3f}초")
+            if self.baseline_fn is not None and len(chunks) > 1 and random.random() < self.baseline_sample:
+                self._executor.submit(self._measure_whole_reply, text, first_audio)
+        return self.last_stats
+
+    def _measure_whole_reply(self, text, first_audio):
+        """비교용: 같은 응답을 문장으로 나누지 않고 한 번에 합성했을 때 첫 소리까지 걸렸을 시간"""
+        start = time.monotonic()
+        try:
+            self.baseline_fn(text)
+        except Exception as e:
+            logging.warning(f"⚠️ TTS 전체 합성 비교 실패: {e}")
+            return
+        whole = time.monotonic() - start
+        metrics.observe("tts_whole_reply", whole, start=start, chars=len(text))
+        logging.info(f"🗣️ TTS 비교: 응답 전체 한 번에 합성 {whole:.3f}초 vs 문장 단위 첫 소리 {first_audio:.3f}초 "
+                     f"({whole - first_audio:+.3f}초)")
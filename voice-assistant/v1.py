@@ -4,20 +4,51 @@ STT: Whisper (base)
 TTS: Pyttsx3
 """
 
+import logging
 import os
 
-import pyttsx3  # Text-to-Speech (TTS) 라이브러리
 import speech_recognition as sr  # 음성 인식 라이브러리
-import whisper  # Whisper 음성 인식 모델
+
+from barge_in import SpeakingGateStream  # 말하는 동안 마이크 입력을 막고 사용자 발화만 통과
+from lazy_loader import LazyResource, startup  # 무거운 모델은 백그라운드에서 로드
 
 # ----------- 초기 설정 -----------
-# Whisper 모델 로드: 'base' 모델을 사용하여 한국어/영어 음성 인식
-whisper_model = whisper.load_model("base")
+logging.basicConfig(level=logging.INFO, format="%(message)s")  # 모델 준비 / 시작 시간 분석 로그 출력
+
+
+# 마이크를 먼저 열고, Whisper 모델과 TTS 엔진은 백그라운드에서 로드 (처음 사용할 때 준비되지 않았으면 대기)
+def load_whisper():
+    import whisper  # Whisper 음성 인식 모델
+
+    # Whisper 모델 로드: 'base' 모델을 사용하여 한국어/영어 음성 인식
+    return whisper.load_model("base")
+
+
+def load_tts():
+    from pyttsx3_engine import Pyttsx3Engine  # 전용 스레드에서 동작하는 pyttsx3 TTS
+
+    # pyttsx3 TTS 엔진 초기화 (속도 170, 볼륨 1.0, 한국어 목소리는 캐시에서 불러옴)
+    return Pyttsx3Engine(rate=170, volume=1.0)
+
 
-# pyttsx3 TTS 엔진 초기화
-engine = pyttsx3.init()
-engine.setProperty("rate", 170)  # 음성 속도 조절 (기본값: 200)
-engine.setProperty("volume", 1.0)  # 볼륨 설정 (0.0 ~ 1.0)
+whisper_model = LazyResource("whisper", load_whisper)
+tts = LazyResource("tts", load_tts)
+
+
+def start_background_loading():
+    for resource in (whisper_model, tts):
+        resource.start()
+
+
+def tts_speaking():
+    """말하는 중인지 (TTS 엔진이 아직 로드 중이면 기다리지 않고 False)"""
+    return tts.ready and tts.is_speaking()
+
+
+# 음성 인식기 (말하는 동안 보정한 임계값이 유지되도록 한 번만 생성)
+recognizer = sr.Recognizer()
+recognizer.pause_threshold = 1.2  # 사용자의 일시정지가 1.2초 이상이면 발화 종료로 인식
+recognizer.dynamic_energy_threshold = False  # 말하는 동안 전달되는 무음에 맞춰 감도가 낮아지지 않도록
 
 
 def transcribe_audio_to_text(audio_data):
@@ -56,20 +87,22 @@ def handle_audio_input():
 
     :return: 녹음된 오디오 데이터 (speech_recognition.AudioData 객체)
     """
-    recognizer = sr.Recognizer()
     microphone = sr.Microphone()
 
     # 사용자 안내 메시지 출력
     print("=====================================")
     print("🎤 음성 비서가 준비되었습니다. 질문을 말씀하세요.")
 
-    recognizer.pause_threshold = 1.2  # 사용자의 일시정지가 1.2초 이상이면 발화 종료로 인식
-
     while True:
         try:
             with microphone as source:
                 # 주변 환경의 노이즈 보정 (환경에 따라 자동 조정)
-                recognizer.adjust_for_ambient_noise(source)
+                if not tts_speaking():  # 로봇 목소리를 배경 소음으로 보정하지 않도록
+                    recognizer.adjust_for_ambient_noise(source)
+                # 말하는 동안에도 듣기 시작 (로봇 목소리는 무음 처리, 사용자가 말하면 음성 출력 중단)
+                source.stream = SpeakingGateStream(source.stream, recognizer.energy_threshold,
+                                                   tts_speaking, lambda: tts.stop())
+                startup.mark("마이크 준비")
                 print("🎙 질문을 듣는 중...")
                 audio = recognizer.listen(source, timeout=None)  # 사용자 발화 입력 받기
 
@@ -83,12 +116,12 @@ def handle_audio_input():
 def speak_text(text):
     """
     변환된 텍스트를 음성으로 출력하는 함수 (TTS)
+    재생 큐에 넣고 바로 반환 (말하는 동안에도 다음 듣기가 시작되고, 사용자가 말하면 출력 중단)
 
     :param text: 출력할 텍스트 문자열
     """
     try:
-        engine.say(text)
-        engine.runAndWait()
+        tts.speak(text)
     except Exception as e:
         print(f"[오류] 음성 출력 실패: {e}")
 
@@ -97,6 +130,9 @@ def main():
     """
     메인 실행 함수: 음성을 입력받고 이를 텍스트로 변환한 후, 다시 음성으로 출력
     """
+    startup.expect("마이크 준비")
+    startup.mark("import 완료")
+    start_background_loading()
     while True:
         try:
             # 음성 입력 받기
@@ -11,12 +11,12 @@ import os
 import timeit
 import sys
 
-import openai
-import pyttsx3
 import speech_recognition as sr
-import whisper
 from dotenv import load_dotenv
 
+from barge_in import SpeakingGateStream
+from lazy_loader import LazyResource, startup
+
 # ----------- 로그 설정 -----------
 logging.basicConfig(
     level=logging.INFO,  # 모든 로그 출력
@@ -29,11 +29,48 @@ logging.basicConfig(
 
 # ----------- 환경 설정 및 초기화 -----------
 load_dotenv()  # .env 파일에서 API 키 로드
-whisper_model = whisper.load_model("base")  # STT 모델 로드
-engine = pyttsx3.init()  # TTS 엔진 초기화
-engine.setProperty('voice', 'com.apple.voice.compact.ko-KR.Yuna')
-engine.setProperty("rate", 180)  # 음성 속도 조절
-engine.setProperty("volume", 1.0)  # 볼륨 설정
+
+
+# 마이크를 먼저 열고, Whisper / TTS 엔진 / openai는 백그라운드에서 로드 (처음 사용할 때 준비되지 않았으면 대기)
+def load_whisper():
+    import whisper
+
+    return whisper.load_model("base")  # STT 모델 로드
+
+
+def load_tts():
+    from pyttsx3_engine import Pyttsx3Engine
+
+    return Pyttsx3Engine(rate=180, volume=1.0, voice_id='com.apple.voice.compact.ko-KR.Yuna')  # TTS 엔진 (전용 스레드)
+
+
+def load_llm_client():
+    import openai
+
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    return openai
+
+
+whisper_model = LazyResource("whisper", load_whisper)
+tts = LazyResource("tts", load_tts)
+llm_client = LazyResource("llm", load_llm_client)
+
+
+def start_background_loading():
+    for resource in (whisper_model, tts, llm_client):
+        resource.start()
+
+
+def tts_speaking():
+    """말하는 중인지 (TTS 엔진이 아직 로드 중이면 기다리지 않고 False)"""
+    return tts.ready and tts.is_speaking()
+
+
+# 음성 인식기 (말하는 동안 보정한 임계값이 유지되도록 한 번만 생성)
+recognizer = sr.Recognizer()
+recognizer.dynamic_energy_threshold = False  # 자동 감도 조절 비활성화
+recognizer.energy_threshold = 500  # 감도 높여서 작은 잡음 무시
+recognizer.pause_threshold = 1.2  # 긴 문장도 인식 가능하도록 조정
 sys.stderr = open(os.devnull, 'w')  # ALSA 등의 시스템 에러 메시지를 무시
 
 # Wake Word 정의 및 실행할 액션 매핑
@@ -43,9 +80,8 @@ wake_word_actions = {
     "춤춰줘": lambda: speak_text("신나는 음악을 틀어줄 수는 없지만, 기분 좋게 흔들어 보세요!"),
 }
 
-# GPT API 키 설정
-openai.api_key = os.getenv("OPENAI_API_KEY")
-if openai.api_key is None:
+# GPT API 키 확인 (키 설정은 openai 모듈을 로드할 때)
+if os.getenv("OPENAI_API_KEY") is None:
     raise ValueError("[ERROR] API 키가 설정되지 않았습니다. .env 파일을 확인하세요.")
 
 # GPT 시스템 프롬프트
@@ -62,10 +98,9 @@ SYSTEM_PROMPT = """
 # ----------- STT, TTS, Wake Word -----------
 
 def speak_text(text):
-    """텍스트를 음성으로 변환하여 출력 (TTS)"""
+    """텍스트를 음성으로 변환하여 출력 (TTS, 바로 반환. 말하는 동안에도 듣기 시작, 사용자가 말하면 출력 중단)"""
     try:
-        engine.say(text)
-        engine.runAndWait()
+        tts.speak(text)
         logging.info(f"🗣️ 음성 출력: {text}")
     except Exception as e:
         logging.error(f"[ERROR] 음성 출력 실패: {e}")
@@ -92,21 +127,20 @@ def transcribe_audio_to_text(audio_data):
 
 def handle_audio_input():
     """마이크를 통해 음성을 입력받아 오디오 데이터를 반환"""
-    recognizer = sr.Recognizer()
     microphone = sr.Microphone()
 
     logging.info("=======================================================")
     logging.info("🎤 음성 비서가 준비되었습니다.")
 
-    # 마이크 감도 및 잡음 조정
-    recognizer.dynamic_energy_threshold = False  # 자동 감도 조절 비활성화
-    recognizer.energy_threshold = 500  # 감도 높여서 작은 잡음 무시
-    recognizer.pause_threshold = 1.2  # 긴 문장도 인식 가능하도록 조정
-
     while True:
         try:
             with microphone as source:
-                recognizer.adjust_for_ambient_noise(source, duration=1.5)  # 배경 소음 보정 강화
+                if not tts_speaking():  # 로봇 목소리를 배경 소음으로 보정하지 않도록
+                    recognizer.adjust_for_ambient_noise(source, duration=1.5)  # 배경 소음 보정 강화
+                # 말하는 동안에도 듣기 시작 (로봇 목소리는 무음 처리, 사용자가 말하면 음성 출력 중단)
+                source.stream = SpeakingGateStream(source.stream, recognizer.energy_threshold,
+                                                   tts_speaking, lambda: tts.stop())
+                startup.mark("마이크 준비")
                 logging.info("🎙 질문을 듣는 중...")
                 audio = recognizer.listen(source, timeout=None)
             return audio
@@ -135,7 +169,7 @@ def generate_response(user_input):
     try:
         logging.info("GPT 응답 생성 중...")
 
-        response = openai.ChatCompletion.create(
+        response = llm_client.ChatCompletion.create(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
@@ -157,6 +191,9 @@ def generate_response(user_input):
 
 def main():
     """메인 실행 함수: Wake Word 감지 후 명령 실행"""
+    startup.expect("마이크 준비")
+    startup.mark("import 완료")
+    start_background_loading()
     while True:
         try:
             audio_data = handle_audio_input()
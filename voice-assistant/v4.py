@@ -6,19 +6,21 @@ Wake Word: API 사용 x
 GPT: GPT-4o
 """
 
+import io
 import logging
 import os
 import timeit
 import sys
-import time
-import subprocess
 
-import openai
 import speech_recognition as sr
-import whisper
 from dotenv import load_dotenv
 from gtts import gTTS
 
+from audio_player import AudioPlayer
+from lazy_loader import LazyResource, startup
+from time_stretch import stretch_mp3_to_wav
+from tts_cache import default_cache
+
 # ----------- 로그 설정 -----------
 logging.basicConfig(
     level=logging.INFO,
@@ -31,14 +33,36 @@ logging.basicConfig(
 
 # ----------- 환경 설정 및 초기화 -----------
 load_dotenv()
-whisper_model = whisper.load_model("base")
 sys.stderr = open(os.devnull, 'w')
 
-# GPT API 키 설정
-openai.api_key = os.getenv("OPENAI_API_KEY")
-if openai.api_key is None:
+# GPT API 키 확인 (키 설정은 openai 모듈을 로드할 때)
+if os.getenv("OPENAI_API_KEY") is None:
     raise ValueError("[ERROR] API 키가 설정되지 않았습니다. .env 파일을 확인하세요.")
 
+
+# 마이크를 먼저 열고, Whisper와 openai는 백그라운드에서 로드 (처음 사용할 때 준비되지 않았으면 대기)
+def load_whisper():
+    import whisper
+
+    return whisper.load_model("base")
+
+
+def load_llm_client():
+    import openai
+
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    return openai
+
+
+whisper_model = LazyResource("whisper", load_whisper)
+llm_client = LazyResource("llm", load_llm_client)
+
+
+def start_background_loading():
+    for resource in (whisper_model, llm_client):
+        resource.start()
+
+
 SYSTEM_PROMPT = """
 당신은 사용자의 음성 비서를 담당하는 AI입니다.
 당신의 이름은 나로봇입니다.
@@ -49,31 +73,26 @@ SYSTEM_PROMPT = """
 친절하고 자연스러운 말투로 응답하세요.
 """
 
-# ----------- TTS (gTTS + ffmpeg + mpg123) -----------
+# ----------- TTS (gTTS + WSOLA 속도 조절 + 재생 엔진) -----------
+
+tts_cache = default_cache()
+audio_player = AudioPlayer()
 
-def speak_text(text, speed=1.3):
-    try:
-        timestamp = int(time.time())
-        original = f"tts_{timestamp}.mp3"
-        adjusted = f"tts_{timestamp}_fast.mp3"
 
-        # 1. gTTS 음성 생성
-        tts = gTTS(text=text, lang='ko')
-        tts.save(original)
+def synthesize_gtts(text, speed):
+    # 1. gTTS 음성 생성 (메모리) + 2. 재생 속도 조절 (WSOLA, 프로세스 내부)
+    mp3 = io.BytesIO()
+    gTTS(text=text, lang='ko').write_to_fp(mp3)
+    return stretch_mp3_to_wav(mp3.getvalue(), speed)
 
-        # 2. ffmpeg로 재생 속도 조절
-        subprocess.run([
-            "ffmpeg", "-y", "-i", original,
-            "-filter:a", f"atempo={speed}",
-            adjusted
-        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
-        # 3. mpg123로 mp3 재생
-        subprocess.run(["mpg123", adjusted], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+def speak_text(text, speed=1.3):
+    try:
+        audio = tts_cache.get_or_synthesize(text, "gtts-wsola-wav", "ko", speed, lambda: synthesize_gtts(text, speed))
 
-        # 4. 임시 파일 삭제
-        os.remove(original)
-        os.remove(adjusted)
+        # 3. 재생 엔진으로 바로 재생
+        audio_player.play_wav(audio)
+        audio_player.wait()
 
         logging.info(f"🗣️ 음성 출력 (1.3x): {text}")
     except Exception as e:
@@ -121,6 +140,7 @@ def handle_audio_input():
         try:
             with microphone as source:
                 recognizer.adjust_for_ambient_noise(source, duration=1.5)
+                startup.mark("마이크 준비")
                 logging.info("🎙 질문을 듣는 중...")
                 audio = recognizer.listen(source, timeout=None)
             return audio
@@ -143,7 +163,7 @@ def process_wake_word(text):
 def generate_response(user_input):
     try:
         logging.info("GPT 응답 생성 중...")
-        response = openai.ChatCompletion.create(
+        response = llm_client.ChatCompletion.create(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
@@ -162,6 +182,9 @@ def generate_response(user_input):
 # ----------- Main -----------
 
 def main():
+    startup.expect("마이크 준비")
+    startup.mark("import 완료")
+    start_background_loading()
     while True:
         try:
             audio_data = handle_audio_input()
@@ -6,20 +6,20 @@ Wake Word: API 사용 x
 GPT: GPT-4o
 """
 
+import io
 import logging
 import multiprocessing
 import os
-import subprocess
-import time
 
 import openai
 import speech_recognition as sr
-import whisper
 from dotenv import load_dotenv
 from gtts import gTTS
 
-# ----------- Whisper 모델 로드 -----------
-whisper_model = whisper.load_model("base")
+from audio_player import AudioPlayer
+from time_stretch import stretch_mp3_to_wav
+from tts_cache import default_cache
+from whisper_cache import load_model
 
 # ----------- 로깅 설정 -----------
 logging.basicConfig(
@@ -27,6 +27,9 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
+# ----------- Whisper 모델 로드 (메모리 매핑 캐시, 로드 로그가 남도록 로깅 설정 뒤) -----------
+whisper_model = load_model("base")
+
 # ----------- 환경 변수 로드 -----------
 load_dotenv()
 openai.api_key = os.getenv("OPENAI_API_KEY")
@@ -143,29 +146,25 @@ def generate_response(user_input):
         return None
 
 
+# ----------- TTS (gTTS + WSOLA 속도 조절 + 재생 엔진) -----------
+tts_cache = default_cache()
+audio_player = AudioPlayer()
+
+
+def synthesize_gtts(text, speed):
+    # 1. gTTS 음성 생성 (메모리) + 2. 재생 속도 조절 (WSOLA, 프로세스 내부)
+    mp3 = io.BytesIO()
+    gTTS(text=text, lang='ko').write_to_fp(mp3)
+    return stretch_mp3_to_wav(mp3.getvalue(), speed)
+
+
 def speak_text(text, speed=1.3):
     try:
-        timestamp = int(time.time())
-        original = f"tts_{timestamp}.mp3"
-        adjusted = f"tts_{timestamp}_fast.mp3"
-
-        # 1. gTTS 음성 생성
-        tts = gTTS(text=text, lang='ko')
-        tts.save(original)
-
-        # 2. ffmpeg로 재생 속도 조절
-        subprocess.run([
-            "ffmpeg", "-y", "-i", original,
-            "-filter:a", f"atempo={speed}",
-            adjusted
-        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-        # 3. mpg123로 mp3 재생
-        subprocess.run(["mpg123", adjusted], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-
-        # 4. 임시 파일 삭제
-        os.remove(original)
-        os.remove(adjusted)
+        audio = tts_cache.get_or_synthesize(text, "gtts-wsola-wav", "ko", speed, lambda: synthesize_gtts(text, speed))
+
+        # 3. 재생 엔진으로 바로 재생
+        audio_player.play_wav(audio)
+        audio_player.wait()
 
         logging.info(f"🗣️ 음성 출력 (1.3x): {text}")
     except Exception as e:
@@ -10,16 +10,16 @@ serial: 없음
 import logging
 import multiprocessing
 import os
-import platform
-import subprocess
-import time
 import timeit
 
 import openai
 import speech_recognition as sr
-import whisper
 from dotenv import load_dotenv
-from google.cloud import texttospeech
+
+from audio_player import AudioPlayer
+from tts_cache import default_cache
+from tts_engine import GoogleTTSEngine
+from whisper_cache import load_model
 
 # ----------- 환경 변수 로드 -----------
 load_dotenv()
@@ -28,15 +28,15 @@ openai.api_key = os.getenv("OPENAI_API_KEY")
 TTS_SPEAKING_RATE = float(os.getenv("TTS_SPEAKING_RATE", 1.0))
 TTS_VOICE = os.getenv("TTS_VOICE", "ko-KR-Standard-A")
 
-# ----------- Whisper 모델 로드 -----------
-whisper_model = whisper.load_model("base")
-
 # ----------- 로깅 설정 -----------
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
+# ----------- Whisper 모델 로드 (메모리 매핑 캐시, 로드 로그가 남도록 로깅 설정 뒤) -----------
+whisper_model = load_model("base")
+
 # ----------- SYSTEM PROMPT 설정 -----------
 SYSTEM_PROMPT = """
 당신은 사용자의 음성 비서를 담당하는 AI입니다.
@@ -169,42 +169,17 @@ def generate_response(user_input):
         return None
 
 
+# ----------- Google Cloud TTS 엔진 (클라이언트 1회 생성 + 오디오 캐시) -----------
+tts_engine = GoogleTTSEngine(TTS_VOICE, TTS_SPEAKING_RATE, cache=default_cache())
+audio_player = AudioPlayer()
+
+
 # ----------- Google Cloud TTS 음성 출력 함수 -----------
 def speak_text(text):
     try:
-        timestamp = int(time.time())
-        wav_file = f"tts_{timestamp}.wav"
-
-        client = texttospeech.TextToSpeechClient()
-
-        synthesis_input = texttospeech.SynthesisInput(text=text)
-
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="ko-KR",
-            name=TTS_VOICE,
-            ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
-        )
-
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.LINEAR16,
-            speaking_rate=TTS_SPEAKING_RATE
-        )
-
-        response = client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
-
-        with open(wav_file, "wb") as out:
-            out.write(response.audio_content)
-
-        if platform.system() == "Darwin":
-            subprocess.run(["afplay", wav_file])
-        else:
-            subprocess.run(["aplay", wav_file])
-
-        os.remove(wav_file)
+        audio_content = tts_engine.synthesize(text)
+        audio_player.play_wav(audio_content)
+        audio_player.wait()
 
     except Exception as e:
         logging.error(f"[ERROR] 음성 출력 실패: {e}")
@@ -212,6 +187,7 @@ def speak_text(text):
 
 # ----------- 메인 루프 -----------
 def main():
+    tts_engine.warm_up()
     while True:
         try:
             audio_data = handle_audio_input()
@@ -7,6 +7,7 @@ GPT: GPT-4o
 serial: 있음
 """
 
+import asyncio
 import ctypes
 import logging
 import multiprocessing
@@ -14,29 +15,48 @@ import os
 import platform
 import subprocess
 import sys
+import threading
 import time
 
-import openai
 import serial
 import speech_recognition as sr
-import whisper
 from dotenv import load_dotenv
-from google.cloud import texttospeech
+
+from audio_player import AudioPlayer
+from barge_in import BargeInMonitor, PrerollStream
+from conversation_memory import CONVERSATION_SUMMARY_MAX_TOKENS, ConversationMemory, build_summary_messages
+from earcon import Acknowledger
+from faq_index import FAQRetriever
+from intent_router import build_default_router
+from lazy_loader import LazyResource, startup
+from llm_budget import LLM_HEDGE_MODEL, BudgetedLLM
+from memory_monitor import MemoryMonitor
+from metrics import metrics
+from pipeline import ASYNC_PIPELINE, MicrophoneGate, MicrophoneYield, Pipeline, Stage, Turn, current_turn
+from pyttsx3_engine import Pyttsx3Engine
+from reply_governor import ReplyGovernor
+from speculative import PartialTranscriber, SpeculativeResponder
+from tracing import Tracer
+from tts_cache import default_cache
+from tts_race import TTSRace
+from tts_scheduler import TTSScheduler
+from vad import SpeechOnsetStream
+from whisper_cache import cache_path
+from xtts_client import XTTSClient
 
 # ----------- 환경 변수 로드 -----------
 load_dotenv()
 
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
 MICROPHONE_INDEX = int(os.getenv("MICROPHONE_INDEX", 0))
 MICROPHONE_SAMPLE_RATE = int(os.getenv("MICROPHONE_SAMPLE_RATE", 16000))
 TTS_SPEAKING_RATE = float(os.getenv("TTS_SPEAKING_RATE", 1.1))
 TTS_VOICE = os.getenv("TTS_VOICE", "ko-KR-Standard-A")
+LOCAL_TTS_ENGINE = os.getenv("LOCAL_TTS_ENGINE", "pyttsx3")  # pyttsx3 | xtts (xtts_server.py 실행 필요)
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+WHISPER_DEGRADED_MODEL = os.getenv("WHISPER_DEGRADED_MODEL", "tiny")  # 메모리 부족 시 바꿔 쓸 모델 (미리 변환 권장)
 SERIAL_PORT = os.getenv("SERIAL_PORT", "/dev/serial0")
 SERIAL_BAUDRATE = int(os.getenv("SERIAL_BAUDRATE", 115200))
-
-# ----------- Whisper 모델 로드 -----------
-whisper_model = whisper.load_model("base")
+OUTPUT_VOLUME = int(os.getenv("OUTPUT_VOLUME", 70))
 
 # ----------- 로깅 설정 -----------
 logging.basicConfig(
@@ -55,6 +75,45 @@ os.environ["JACK_NO_START_SERVER"] = "1"
 os.environ["PULSE_SERVER"] = ""
 os.environ["DISPLAY"] = ""
 
+
+# ----------- 무거운 모델/클라이언트 (백그라운드 로드) -----------
+# 마이크를 먼저 열고, 각 단계는 처음 사용할 때 자신에게 필요한 자원만 기다림
+def load_whisper():
+    # 메모리 매핑 캐시: fork한 STT 워커/다른 프로세스와 모델 가중치 페이지 공유
+    from whisper_cache import load_model
+    return load_model(WHISPER_MODEL)
+
+
+def load_llm_client():
+    import openai
+    from llm_client import LLMClient
+
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    openai.api_base = os.getenv("OPENAI_API_BASE", openai.api_base)  # 로컬 대역 서버 등 (benchmark/openai_server.py)
+    client = LLMClient()
+    client.warm_up("startup")
+    return client
+
+
+def load_tts_engine():
+    from tts_engine import GoogleTTSEngine
+
+    # Google Cloud TTS 엔진 (클라이언트 1회 생성 + 오디오 캐시), 사전 연결까지 끝낸 뒤 준비 완료
+    engine = GoogleTTSEngine(TTS_VOICE, TTS_SPEAKING_RATE, cache=default_cache())
+    engine.warm_up(background=False)
+    return engine
+
+
+whisper_model = LazyResource("whisper", load_whisper)
+llm_client = LazyResource("llm", load_llm_client)
+tts_engine = LazyResource("tts", load_tts_engine)
+
+
+def start_background_loading():
+    for resource in (whisper_model, tts_engine, llm_client):
+        resource.start()
+
+
 # ----------- SYSTEM PROMPT 설정 -----------
 SYSTEM_PROMPT = """
 당신은 사용자의 음성 비서를 담당하는 AI입니다.
@@ -104,15 +163,64 @@ def load_wake_word_actions():
 wake_word_actions = load_wake_word_actions()
 
 
+def match_wake_word(text):
+    with metrics.time("wake_word", chars=len(text)) as span:
+        for wake_word in wake_word_actions:
+            if wake_word in text:
+                span["matched"] = wake_word
+                return wake_word
+    return None
+
+
 def process_wake_word(text):
-    for wake_word, (serial_cmd, response) in wake_word_actions.items():
-        if wake_word in text:
-            logging.info(f"✅ Wake Word 감지됨: {wake_word}")
-            if serial_cmd:
-                send_serial_command(serial_cmd)
-            speak_text(response)
-            return True
-    return False
+    wake_word = match_wake_word(text)
+    if wake_word is None:
+        return False
+    serial_cmd, response = wake_word_actions[wake_word]
+    logging.info(f"✅ Wake Word 감지됨: {wake_word}")
+    if serial_cmd:
+        send_serial_command(serial_cmd)
+    speak_text(response)
+    return True
+
+
+# ----------- 로컬 의도 처리 (GPT 호출 없이 응답) -----------
+def set_output_volume(value, absolute):
+    global OUTPUT_VOLUME
+    OUTPUT_VOLUME = max(0, min(100, value if absolute else OUTPUT_VOLUME + value))
+    try:
+        if platform.system() == "Darwin":
+            subprocess.run(["osascript", "-e", f"set volume output volume {OUTPUT_VOLUME}"])
+        else:
+            subprocess.run(["amixer", "-q", "sset", "Master", f"{OUTPUT_VOLUME}%"])
+    except Exception as e:
+        logging.error(f"[ERROR] 볼륨 변경 실패: {e}")
+        return None
+    return OUTPUT_VOLUME
+
+
+def set_speaking_rate(delta):
+    global TTS_SPEAKING_RATE
+    TTS_SPEAKING_RATE = round(max(0.5, min(2.0, TTS_SPEAKING_RATE + delta)), 2)
+    return TTS_SPEAKING_RATE
+
+
+intent_router = build_default_router("나로봇", on_volume=set_output_volume, on_speed=set_speaking_rate)
+faq_retriever = FAQRetriever()
+budgeted_llm = BudgetedLLM(llm_client, governor=ReplyGovernor())
+
+
+def summarize_conversation(previous_summary, messages):
+    response = llm_client.chat(
+        model=LLM_HEDGE_MODEL,
+        messages=build_summary_messages(previous_summary, messages),
+        max_tokens=CONVERSATION_SUMMARY_MAX_TOKENS,
+        temperature=0.2,
+    )
+    return response["choices"][0]["message"]["content"]
+
+
+conversation_memory = ConversationMemory(summarize_conversation)
 
 
 # ----------- Whisper STT 워커 -----------
@@ -125,32 +233,69 @@ def whisper_stt_worker(temp_filename, result_queue):
         result_queue.put(None)
 
 
+# ----------- 부분 STT + GPT 선행 요청 -----------
+def transcribe_partial(audio):
+    result = whisper_model.transcribe(audio, language="ko", fp16=False, beam_size=1, best_of=1)
+    return result.get("text", "").strip()
+
+
+def speculative_request(text, cancel_event):
+    # Wake Word / 로컬 응답 대상이면 GPT를 미리 부를 필요 없음
+    if any(wake_word in text for wake_word in wake_word_actions) or intent_router.can_handle(text):
+        return None
+    faq_answer, faq_context = faq_retriever.lookup(text, record=False)
+    if faq_answer:
+        return None
+    return request_response(text, faq_context, cancel_event)
+
+
+speculative_responder = SpeculativeResponder(speculative_request)
+partial_transcriber = PartialTranscriber(transcribe_partial, speculative_responder.update, MICROPHONE_SAMPLE_RATE)
+
+
+def on_speech_onset():
+    # 아직 로드 중인 자원은 기다리지 않음 (듣기 스레드를 막지 않도록)
+    if llm_client.ready:
+        llm_client.warm_up()
+    if speculative_responder.enabled and whisper_model.ready:
+        partial_transcriber.start()
+
+
 # ----------- STT 함수 -----------
 def transcribe_audio_to_text(audio_data, timeout=5):
     temp_filename = "temp.wav"
     try:
         logging.info("🔄 오디오 데이터 처리 중...")
 
-        with open(temp_filename, "wb") as f:
-            f.write(audio_data.get_wav_data(convert_rate=16000, convert_width=2))
-
-        result_queue = multiprocessing.Queue()
-        p = multiprocessing.Process(target=whisper_stt_worker, args=(temp_filename, result_queue))
-        p.start()
-        p.join(timeout)
-
-        if p.is_alive():
-            logging.warning("⚠️ Whisper STT 시간이 초과되었습니다. 프로세스를 종료합니다.")
-            p.terminate()
-            p.join()
-            return None
-
-        if not result_queue.empty():
-            text = result_queue.get()
+        with metrics.time("wav_encode") as span:
+            wav_data = audio_data.get_wav_data(convert_rate=16000, convert_width=2)
+            with open(temp_filename, "wb") as f:
+                f.write(wav_data)
+            span["audio_seconds"] = (len(wav_data) - 44) / (16000 * 2)
+
+        # fork 전에 모델이 메모리에 올라와 있어야 STT 프로세스가 그대로 사용 (로드 중이면 여기서만 대기)
+        whisper_model.get()
+        with metrics.time("stt", model=WHISPER_MODEL) as span:
+            result_queue = multiprocessing.Queue()
+            p = multiprocessing.Process(target=whisper_stt_worker, args=(temp_filename, result_queue))
+            p.start()
+            p.join(timeout)
+
+            if p.is_alive():
+                logging.warning("⚠️ Whisper STT 시간이 초과되었습니다. 프로세스를 종료합니다.")
+                p.terminate()
+                p.join()
+                metrics.failure("stt", "timeout")
+                return None
+
+            text = result_queue.get() if not result_queue.empty() else None
+            span["chars"] = len(text or "")
+        if text:
             logging.info(f"📝 변환된 텍스트: {text}")
             return text
         else:
             logging.warning("⚠️ STT 결과가 없습니다.")
+            metrics.failure("stt", "empty")
             return None
 
     except Exception as e:
@@ -165,7 +310,7 @@ def transcribe_audio_to_text(audio_data, timeout=5):
 def handle_audio_input():
     recognizer = sr.Recognizer()
     try:
-        microphone = sr.Microphone(device_index=MICROPHONE_INDEX, sample_rate=MICROPHONE_SAMPLE_RATE, chunk_size=1024)
+        microphone = open_microphone()
     except Exception as e:
         logging.error(f"[ERROR] 마이크 장치 초기화 실패: {e}")
         return None
@@ -178,120 +323,323 @@ def handle_audio_input():
     recognizer.pause_threshold = 1.0
 
     while True:
+        microphone_gate.acquire_microphone()
         try:
             with microphone as source:
-                recognizer.adjust_for_ambient_noise(source, duration=1.5)
+                preroll = barge_in_monitor.take_captured()
+                if preroll:
+                    # 재생 중 끼어든 발화: 보정 없이 발화 시작 부분부터 이어서 인식
+                    recognizer.energy_threshold = barge_in_monitor.energy_threshold
+                    stream = PrerollStream(source.stream, preroll)
+                else:
+                    # 보정 중에 알림음/응답 재생이 시작되면 바로 마이크를 양보 (재생 소리가 보정에 섞이지 않도록)
+                    stream = source.stream
+                    source.stream = microphone_gate.wrap(stream)
+                    with metrics.time("calibration"):
+                        recognizer.adjust_for_ambient_noise(source, duration=1.5)
+                    source.stream = stream
+                    barge_in_monitor.energy_threshold = recognizer.energy_threshold
+                # 음성 출력이 시작되면 아직 말하지 않은 듣기는 중단하고 마이크를 양보 (파이프라인 모드)
+                onset_stream = SpeechOnsetStream(
+                    stream, recognizer.energy_threshold, on_speech_onset,
+                    on_audio=partial_transcriber.feed if speculative_responder.enabled else None,
+                )
+                source.stream = microphone_gate.wrap(onset_stream)
+                startup.mark("마이크 준비")
                 logging.info("🎙 질문을 듣는 중...")
-                audio = recognizer.listen(source, timeout=None)
+                try:
+                    with metrics.time("listen", barge_in=bool(preroll)):
+                        audio = recognizer.listen(source, timeout=None)
+                finally:
+                    partial_transcriber.stop()
+            if onset_stream.onset_time is not None:
+                # 음성 시작 ~ 발화 끝 판정(pause_threshold 무음 포함)까지
+                metrics.observe("endpoint", time.monotonic() - onset_stream.onset_time, start=onset_stream.onset_time,
+                                audio_seconds=len(audio.frame_data) / (audio.sample_rate * audio.sample_width))
             return audio
 
         except sr.UnknownValueError:
             logging.warning("⚠️ 음성을 이해하지 못했습니다. 다시 말씀해주세요.")
+        except MicrophoneYield:
+            return None
         except Exception as e:
             logging.error(f"[ERROR] 음성 입력 오류: {e}")
             return None
+        finally:
+            microphone_gate.release_microphone()
 
 
 # ----------- GPT 응답 생성 함수 -----------
-def generate_response(user_input):
+def request_response(user_input, context=None, cancel_event=None):
+    system_messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    if context:
+        system_messages.append({"role": "system", "content": f"참고 정보: {context}"})
+    messages = conversation_memory.build_messages(system_messages, user_input)
+    return budgeted_llm.complete(messages, cancel_event=cancel_event, max_tokens=100, temperature=0.5)
+
+
+def generate_response(user_input, context=None, cancel_event=None):
     try:
         logging.info("GPT 응답 생성 중...")
-        response = openai.ChatCompletion.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_input},
-            ],
-            max_tokens=100,
-            temperature=0.5,
-        )
-        assistant_response = response["choices"][0]["message"]["content"].strip()
-        logging.info(f"🤖 GPT 응답: {assistant_response}")
+        result = speculative_responder.finalize(user_input)
+        if result is None:
+            result = request_response(user_input, context, cancel_event)
+        assistant_response, path = result
+        logging.info(f"🤖 GPT 응답 ({path}): {assistant_response}")
+        if path == "cancelled":
+            return None
+        if path == "canned":
+            metrics.failure("llm", "budget")
+        if path != "canned":
+            conversation_memory.add_turn(user_input, assistant_response)
         return assistant_response
     except Exception as e:
+        metrics.failure("llm", e)
         logging.error(f"[ERROR] GPT 응답 생성 중 오류 발생: {e}")
         return None
 
 
-# ----------- Google Cloud TTS 음성 출력 함수 -----------
-def speak_text(text):
-    try:
-        timestamp = int(time.time())
-        wav_file = f"tts_{timestamp}.wav"
+# ----------- 음성 출력 엔진 -----------
+audio_player = AudioPlayer()
+# 클라우드 TTS가 예산 안에 끝나지 않거나 실패하면 로컬 엔진(pyttsx3 / XTTS 서버)과 경쟁
+local_tts = XTTSClient() if LOCAL_TTS_ENGINE == "xtts" else Pyttsx3Engine()
+tts_race = TTSRace(lambda sentence: tts_engine.synthesize(sentence, speaking_rate=TTS_SPEAKING_RATE),
+                   local_tts.synthesize)
+tts_scheduler = TTSScheduler(audio_player, tts_race.synthesize,
+                             baseline_fn=lambda text: tts_engine.synthesize(text, speaking_rate=TTS_SPEAKING_RATE,
+                                                                            use_cache=False))
 
-        client = texttospeech.TextToSpeechClient()
 
-        synthesis_input = texttospeech.SynthesisInput(text=text)
+# ----------- 끼어들기 (재생 중 사용자 발화 감지) -----------
+speech_cancel_event = threading.Event()
 
-        voice = texttospeech.VoiceSelectionParams(
-            language_code="ko-KR",
-            name=TTS_VOICE,
-            ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
-        )
 
-        audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.LINEAR16,
-            speaking_rate=TTS_SPEAKING_RATE
-        )
+def open_microphone():
+    return sr.Microphone(device_index=MICROPHONE_INDEX, sample_rate=MICROPHONE_SAMPLE_RATE, chunk_size=1024)
 
-        response = client.synthesize_speech(
-            input=synthesis_input,
-            voice=voice,
-            audio_config=audio_config
-        )
 
-        with open(wav_file, "wb") as out:
-            out.write(response.audio_content)
+def on_barge_in():
+    # 남은 문장 합성/재생과 진행 중인 GPT 선행 요청 취소
+    speech_cancel_event.set()
+    speculative_responder.cancel()
 
-        if platform.system() == "Darwin":
-            subprocess.run(["afplay", wav_file])
-        else:
-            subprocess.run(["aplay", wav_file])
 
-        os.remove(wav_file)
+barge_in_monitor = BargeInMonitor(audio_player, open_microphone, 500, on_barge_in)
+microphone_gate = MicrophoneGate()
+# 발화가 끝나면 바로 알림음, 답이 늦으면 채움말 재생 (답 준비 중 무음 구간 줄이기)
+acknowledger = Acknowledger(audio_player, lambda phrase: tts_engine.synthesize(phrase, speaking_rate=TTS_SPEAKING_RATE),
+                            gate=microphone_gate)
+# 턴마다 단계별 span을 Chrome trace JSON으로 저장 (./logs/traces)
+tracer = Tracer()
+tracer.attach(metrics)
+# 단계/턴별 메모리 사용량과 예산, 메모리 부족 시 가벼운 것부터 기능을 줄임 (재시작 전까지 유지)
+memory_monitor = MemoryMonitor()
+memory_monitor.attach(metrics)
+
+
+def disable_partial_stt():
+    speculative_responder.enabled = False
+    partial_transcriber.stop()
+
+
+def use_degraded_whisper():
+    # 샘플링 스레드에서 호출됨: reload()는 기존 모델을 버리고 로드는 백그라운드 스레드에서 시작한 뒤 바로 반환
+    global WHISPER_MODEL
+    WHISPER_MODEL = WHISPER_DEGRADED_MODEL
+    whisper_model.reload()
+
+
+memory_monitor.add_degrade_step("TTS 메모리 캐시 끄기", lambda: default_cache().disable_memory())
+if speculative_responder.enabled:
+    memory_monitor.add_degrade_step("부분 STT / GPT 선행 요청 끄기", disable_partial_stt)
+# 캐시가 없으면 교체 시 변환(전체 로드 + float 복사)이 필요해 오히려 메모리를 더 쓰므로 미리 변환한 경우에만 사용
+if WHISPER_MODEL != WHISPER_DEGRADED_MODEL:
+    if os.path.exists(cache_path(WHISPER_DEGRADED_MODEL)):
+        memory_monitor.add_degrade_step(f"Whisper {WHISPER_MODEL} → {WHISPER_DEGRADED_MODEL}", use_degraded_whisper)
+    else:
+        logging.info(f"ℹ️ Whisper {WHISPER_DEGRADED_MODEL} 캐시가 없어 모델 교체 단계는 사용하지 않습니다 "
+                     f"(python whisper_cache.py convert {WHISPER_DEGRADED_MODEL})")
+
+
+# ----------- Google Cloud TTS 음성 출력 함수 -----------
+def speak_text(text):
+    speech_cancel_event.clear()
+    microphone_gate.begin_speaking()
+    barge_in_monitor.start()
+    try:
+        # 문장별로 병렬 합성, 첫 문장이 준비되면 바로 재생 시작
+        stats = tts_scheduler.speak(text, cancel_event=speech_cancel_event, on_first_audio=acknowledger.finish)
+        if stats.get("time_to_first_audio") is not None:
+            metrics.observe("tts_first_audio", stats["time_to_first_audio"], chars=len(text), chunks=stats["chunks"])
+        with metrics.time("playback", chars=len(text)):
+            audio_player.wait()
 
     except Exception as e:
+        metrics.failure("speak", e)
         logging.error(f"[ERROR] 음성 출력 실패: {e}")
+    finally:
+        barge_in_monitor.stop()
+        microphone_gate.end_speaking()
+
+
+# ----------- 질문 처리 (Wake Word → FAQ → 로컬 명령 → GPT) -----------
+def respond(transcribed_text, cancel_event=None):
+    """
+    :return: 말할 응답 (Wake Word처럼 이미 처리한 경우나 실패 시 None)
+    """
+    if process_wake_word(transcribed_text):
+        speculative_responder.cancel()
+        return None
+
+    with metrics.time("faq"):
+        faq_answer, faq_context = faq_retriever.lookup(transcribed_text)
+    with metrics.time("intent"):
+        local_response = faq_answer or intent_router.route(transcribed_text)
+    if local_response:
+        speculative_responder.cancel()
+        logging.info(f"✅ 로컬 응답: {local_response}")
+        return local_response
+
+    with metrics.time("llm"):
+        response = generate_response(transcribed_text, context=faq_context, cancel_event=cancel_event)
+    if not response:
+        logging.warning("[WARNING] GPT 응답 생성 실패")
+        return None
+
+    logging.info(f"✅ 최종 응답: {response}")
+    return response
+
+
+def close_serial():
+    if ser and ser.is_open:
+        ser.close()
+        logging.info(f"🔒 시리얼 포트 닫힘 ({SERIAL_PORT})")
 
 
 # ----------- 메인 루프 -----------
+def process_turn(audio_data):
+    """
+    녹음된 질문 하나 처리 (STT → 응답 → 음성 출력)
+    :return: (인식된 문장, 응답) - 실패한 단계부터는 None
+    """
+    turn = Turn()
+    token = current_turn.set(turn.id)  # 이 턴에서 기록되는 span을 추적/메모리 계측에 연결
+    tracer.begin_turn(turn.id)
+    memory_monitor.begin_turn(turn.id)
+    try:
+        acknowledger.start()
+        transcribed_text = transcribe_audio_to_text(audio_data, timeout=5)
+        if not transcribed_text:
+            acknowledger.cancel()
+            speculative_responder.cancel()
+            logging.warning("⚠️ 텍스트 변환 실패: 다시 질문해주세요.")
+            return None, None
+
+        response = respond(transcribed_text)
+        if response:
+            speak_text(response)
+        else:
+            acknowledger.cancel()
+        return transcribed_text, response
+    finally:
+        tracer.end_turn(turn.id)
+        memory_monitor.end_turn(turn.id)
+        current_turn.reset(token)
+
+
 def main():
+    startup.expect("마이크 준비")
+    startup.mark("import 완료")
+    start_background_loading()
+    acknowledger.warm_up()
+    metrics.start()
+    memory_monitor.start()
+    memory_monitor.install_signal_handler()
     while True:
         try:
             audio_data = handle_audio_input()
             if not audio_data:
                 continue
-
-            transcribed_text = transcribe_audio_to_text(audio_data, timeout=5)
-            if not transcribed_text:
-                logging.warning("⚠️ 텍스트 변환 실패: 다시 질문해주세요.")
-                continue
-
-            if process_wake_word(transcribed_text):
-                continue
-
-            response = generate_response(transcribed_text)
-            if not response:
-                logging.warning("[WARNING] GPT 응답 생성 실패")
-                continue
-
-            logging.info(f"✅ 최종 응답: {response}")
-            speak_text(response)
+            process_turn(audio_data)
 
         except KeyboardInterrupt:
-            if ser and ser.is_open:
-                ser.close()
-                logging.info(f"🔒 시리얼 포트 닫힘 ({SERIAL_PORT})")
+            close_serial()
             logging.info("\n🚪 프로그램을 종료합니다.")
             break
 
         except Exception as e:
-            if ser and ser.is_open:
-                ser.close()
-                logging.info(f"🔒 시리얼 포트 닫힘 ({SERIAL_PORT})")
+            close_serial()
             logging.error(f"[ERROR] 예외 발생: {e}")
 
 
+# ----------- 파이프라인 메인 루프 (ASYNC_PIPELINE=1) -----------
+def transcribe_stage(audio_data, turn):
+    tracer.begin_turn(turn.id)
+    memory_monitor.begin_turn(turn.id)
+    acknowledger.start()
+    transcribed_text = transcribe_audio_to_text(audio_data, timeout=5)
+    if not transcribed_text:
+        acknowledger.cancel()
+        speculative_responder.cancel()
+        logging.warning("⚠️ 텍스트 변환 실패: 다시 질문해주세요.")
+    return transcribed_text
+
+
+def respond_stage(transcribed_text, turn):
+    response = respond(transcribed_text, turn.cancel_event)
+    if not response:
+        acknowledger.cancel()
+    return response
+
+
+def finish_turn(turn, status):
+    tracer.end_turn(turn.id)
+    memory_monitor.end_turn(turn.id)
+
+
+def cancel_turn_output(turn):
+    # 취소된 턴의 남은 합성/재생과 GPT 선행 요청 중단
+    acknowledger.cancel()
+    speech_cancel_event.set()
+    audio_player.stop()
+    speculative_responder.cancel()
+
+
+async def main_async():
+    """
+    듣기 / STT / 응답 생성 / 음성 출력을 단계별로 동시에 실행
+    GPT와 TTS가 도는 동안에도 다음 질문을 듣고, 새 질문이 들어오면 이전 턴은 취소
+    """
+    startup.expect("마이크 준비")
+    startup.mark("import 완료")
+    start_background_loading()
+    acknowledger.warm_up()
+    metrics.start()
+    memory_monitor.start()
+    memory_monitor.install_signal_handler()
+    pipeline = Pipeline(
+        handle_audio_input,
+        [
+            Stage("stt", transcribe_stage),
+            Stage("respond", respond_stage),
+            Stage("speak", lambda response, turn: speak_text(response)),
+        ],
+        on_cancel=cancel_turn_output,
+        on_finish=finish_turn,
+    )
+    try:
+        await pipeline.run()
+    finally:
+        close_serial()
+        logging.info(f"🚪 프로그램을 종료합니다. (완료 {pipeline.completed}턴, 취소 {pipeline.cancelled}턴)")
+
+
 if __name__ == "__main__":
     multiprocessing.set_start_method('fork')
-    main()
+    if ASYNC_PIPELINE:
+        try:
+            asyncio.run(main_async())
+        except KeyboardInterrupt:
+            pass
+    else:
+        main()
@@ -0,0 +1,46 @@
+"""
+마이크 스트림 래퍼 (에너지 기반 음성 시작 감지)
+speech_recognition의 recognizer.listen()이 읽는 source.stream을 감싸
+에너지가 임계값을 넘는 첫 청크에서 콜백을 호출 (GPT 연결 사전 준비, 부분 STT 시작 등에 사용)
+"""
+
+import logging
+import time
+
+import numpy as np
+
+
+def chunk_rms(chunk):
+    samples = np.frombuffer(chunk, dtype=np.int16)
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+
+
+class SpeechOnsetStream:
+    def __init__(self, stream, energy_threshold, on_onset, on_audio=None):
+        """
+        :param on_audio: 음성 시작 이후 읽은 청크(bytes)를 전달받는 콜백 (부분 STT 등)
+        """
+        self.stream = stream
+        self.energy_threshold = energy_threshold
+        self.on_onset = on_onset
+        self.on_audio = on_audio
+        self.triggered = False
+        self.onset_time = None  # 음성 시작 청크를 읽은 시각 (time.monotonic)
+
+    def read(self, size):
+        chunk = self.stream.read(size)
+        if not self.triggered and chunk_rms(chunk) > self.energy_threshold:
+            self.triggered = True
+            self.onset_time = time.monotonic()
+            try:
+                self.on_onset()
+            except Exception as e:
+                logging.error(f"[ERROR] 음성 시작 콜백 실패: {e}")
+        if self.triggered and self.on_audio is not None:
+            self.on_audio(chunk)
+        return chunk
+
+    def close(self):
+        return self.stream.close()
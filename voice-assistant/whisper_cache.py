@@ -0,0 +1,204 @@
+"""
+Whisper 체크포인트 메모리 매핑 캐시
+- whisper.load_model()은 프로세스마다 .pt(pickle)를 새 메모리에 풀어서 올림 → STT 프로세스/CLI마다 수백 MB,
+  fork한 STT 프로세스도 시간이 지나면 copy-on-write로 페이지가 복사됨
+- 처음 한 번 float32 state_dict를 safetensors 형식(8바이트 헤더 길이 + JSON 헤더 + 원시 텐서 바이트)으로 변환해 저장
+  (safetensors 패키지 없이 직접 읽고 씀, 파일은 safetensors 도구와 호환)
+- 이후에는 파일을 np.memmap으로 열고 그 메모리를 그대로 모델 파라미터로 사용 (load_state_dict(assign=True))
+  → 같은 모델을 쓰는 모든 프로세스(STT 워커, 일괄 변환 CLI 등)가 페이지 캐시의 같은 페이지를 공유
+- 로드 시간과 RSS / 공유 메모리(/proc/self/statm)를 로그로 남김
+캐시를 쓸 수 없으면(torch 2.1 미만 등) whisper.load_model()로 대체
+
+사용법:
+    python whisper_cache.py convert base                 # 캐시 미리 만들기
+    python whisper_cache.py transcribe a.wav b.wav       # 일괄 변환 (같은 캐시를 매핑)
+"""
+
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import struct
+import time
+
+import numpy as np
+
+from memory_monitor import memory_usage
+
+WHISPER_CACHE_DIR = os.path.expanduser(os.getenv("WHISPER_CACHE_DIR", "~/.cache/whisper-mmap"))
+WHISPER_MMAP = os.getenv("WHISPER_MMAP", "1") == "1"
+
+# safetensors dtype 이름 <-> NumPy
+DTYPES = {
+    "F64": np.float64, "F32": np.float32, "F16": np.float16,
+    "I64": np.int64, "I32": np.int32, "I16": np.int16, "I8": np.int8, "U8": np.uint8, "BOOL": np.bool_,
+}
+DTYPE_NAMES = {np.dtype(dtype): name for name, dtype in DTYPES.items()}
+
+
+# ----------- safetensors 형식 -----------
+def save_safetensors(tensors, path, metadata=None):
+    """
+    :param tensors: {이름: NumPy 배열}
+    :param metadata: {문자열: 문자열} (헤더의 __metadata__)
+    """
+    # 원소 크기가 큰 것부터 배치 → 모든 텐서가 자기 원소 크기에 맞춰 정렬됨
+    names = sorted(tensors, key=lambda name: (-tensors[name].dtype.itemsize, name))
+    header, offset = {}, 0
+    for name in names:
+        array = tensors[name]
+        header[name] = {"dtype": DTYPE_NAMES[array.dtype], "shape": list(array.shape),
+                        "data_offsets": [offset, offset + array.nbytes]}
+        offset += array.nbytes
+    if metadata:
+        header["__metadata__"] = {key: str(value) for key, value in metadata.items()}
+    raw = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    raw += b" " * (-len(raw) % 8)  # 데이터 시작 위치 8바이트 정렬
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(struct.pack("<Q", len(raw)))
+        f.write(raw)
+        for name in names:
+            f.write(memoryview(np.ascontiguousarray(tensors[name])).cast("B"))
+    os.replace(temp_path, path)  # 다른 프로세스가 쓰다 만 파일을 읽지 않도록
+
+
+def load_safetensors(path):
+    """
+    :return: ({이름: 파일을 매핑한 NumPy 배열}, metadata)
+    배열은 copy-on-write 매핑: 읽기만 하면 모든 프로세스가 같은 페이지를 공유
+    """
+    with open(path, "rb") as f:
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length))
+    metadata = header.pop("__metadata__", {})
+    data = np.memmap(path, dtype=np.uint8, mode="c", offset=8 + length)
+    arrays = {}
+    for name, info in header.items():
+        begin, end = info["data_offsets"]
+        arrays[name] = data[begin:end].view(DTYPES[info["dtype"]]).reshape(info["shape"])
+    return arrays, metadata
+
+
+# ----------- Whisper 모델 -----------
+def cache_path(name, cache_dir=WHISPER_CACHE_DIR):
+    """:param name: 모델 이름("base") 또는 .pt 체크포인트 경로 (whisper.load_model과 동일)"""
+    return os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(name))[0]}.safetensors")
+
+
+def convert(name, path):
+    """whisper.load_model()로 한 번 읽어 float32 state_dict를 캐시 파일로 저장"""
+    import whisper
+
+    model = whisper.load_model(name, device="cpu")
+    tensors = {key: (value.float() if value.is_floating_point() else value).numpy()
+               for key, value in model.state_dict().items()}
+    save_safetensors(tensors, path, {"format": "pt", "whisper_model": name,
+                                     "dims": json.dumps(dataclasses.asdict(model.dims))})
+
+
+def _rebuild_buffers(model, dims):
+    """state_dict에 없는 버퍼(persistent=False)는 meta 장치에 남아 있으므로 CPU에서 다시 생성"""
+    import torch
+
+    if hasattr(model.decoder, "mask"):
+        mask = torch.empty(dims.n_text_ctx, dims.n_text_ctx).fill_(-np.inf).triu_(1)
+        model.decoder.register_buffer("mask", mask, persistent=False)
+    # 기본 정렬 헤드: 디코더 뒤쪽 절반 (whisper.model.Whisper와 동일)
+    heads = torch.zeros(dims.n_text_layer, dims.n_text_head, dtype=torch.bool)
+    heads[dims.n_text_layer // 2:] = True
+    model.register_buffer("alignment_heads", heads.to_sparse(), persistent=False)
+
+    remaining = [key for key, tensor in list(model.named_parameters()) + list(model.named_buffers())
+                 if tensor.is_meta]
+    if remaining:
+        raise RuntimeError(f"초기화되지 않은 텐서: {', '.join(remaining)}")
+
+
+def load_mapped(name, path):
+    import torch
+    import whisper
+    from whisper.model import AudioEncoder, ModelDimensions, TextDecoder, Whisper
+
+    arrays, metadata = load_safetensors(path)
+    dims = ModelDimensions(**json.loads(metadata["dims"]))
+    # 파라미터를 새로 할당/초기화하지 않고 매핑된 텐서를 그대로 연결
+    # (Whisper.__init__은 meta 장치에서 안 되는 to_sparse()를 호출하므로 인코더/디코더만 meta로 만들어 조립)
+    model = Whisper.__new__(Whisper)
+    torch.nn.Module.__init__(model)
+    model.dims = dims
+    with torch.device("meta"):
+        model.encoder = AudioEncoder(dims.n_mels, dims.n_audio_ctx, dims.n_audio_state, dims.n_audio_head,
+                                     dims.n_audio_layer)
+        model.decoder = TextDecoder(dims.n_vocab, dims.n_text_ctx, dims.n_text_state, dims.n_text_head,
+                                    dims.n_text_layer)
+    model.load_state_dict({key: torch.from_numpy(array) for key, array in arrays.items()}, assign=True)
+    _rebuild_buffers(model, dims)
+    alignment_heads = getattr(whisper, "_ALIGNMENT_HEADS", {}).get(name)
+    if alignment_heads is not None:
+        model.set_alignment_heads(alignment_heads)
+    return model.eval()
+
+
+def load_model(name="base", cache_dir=WHISPER_CACHE_DIR, mmap=WHISPER_MMAP):
+    """whisper.load_model(name) 대체 (CPU 전용)"""
+    start = time.monotonic()
+    rss_before, _ = memory_usage()
+    model, mapped = None, False
+    if mmap:
+        path = cache_path(name, cache_dir)
+        try:
+            if not os.path.exists(path):
+                logging.info(f"🧊 Whisper {name} 체크포인트를 메모리 매핑 형식으로 변환 중 (최초 1회): {path}")
+                convert(name, path)
+            model = load_mapped(name, path)
+            mapped = True
+        except Exception as e:
+            logging.warning(f"⚠️ Whisper 메모리 매핑 캐시 사용 실패, 기본 로드로 전환: {e}")
+    if model is None:
+        import whisper
+        model = whisper.load_model(name, device="cpu")
+
+    rss, shared = memory_usage()
+    if rss is not None:
+        logging.info(f"🧊 Whisper {name} 로드 {time.monotonic() - start:.2f}초 "
+                     f"({'메모리 매핑' if mapped else '기본'}, RSS {rss:.0f}MB (+{rss - rss_before:.0f}MB) / "
+                     f"공유 {shared:.0f}MB)")
+    else:
+        logging.info(f"🧊 Whisper {name} 로드 {time.monotonic() - start:.2f}초")
+    return model
+
+
+# ----------- CLI -----------
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Whisper 메모리 매핑 캐시")
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert_parser = commands.add_parser("convert", help="캐시 파일 만들기")
+    convert_parser.add_argument("models", nargs="+")
+    transcribe_parser = commands.add_parser("transcribe", help="여러 파일 일괄 변환")
+    transcribe_parser.add_argument("files", nargs="+")
+    transcribe_parser.add_argument("--model", default="base")
+    transcribe_parser.add_argument("--language", default="ko")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        for name in args.models:
+            start = time.monotonic()
+            convert(name, cache_path(name))
+            print(f"🧊 {cache_path(name)} ({os.path.getsize(cache_path(name)) / 2 ** 20:.0f}MB, "
+                  f"{time.monotonic() - start:.1f}초)")
+        return
+
+    model = load_model(args.model)
+    for path in args.files:
+        start = time.monotonic()
+        result = model.transcribe(path, language=args.language, fp16=False, beam_size=1, best_of=1)
+        print(f"📝 {path} ({time.monotonic() - start:.2f}초): {result.get('text', '').strip()}")
+
+
+if __name__ == "__main__":
+    main()
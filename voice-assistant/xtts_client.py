@@ -0,0 +1,67 @@
+"""
+XTTS 상주 서버 클라이언트 (text-to-speech/coqui-tts/xtts_server.py)
+- stream(): PCM 조각을 받는 대로 반환 (AudioPlayer.play_pcm에 바로 전달 가능)
+- synthesize(): 전체 조각을 모아 WAV 바이트로 반환 (TTSRace / TTSScheduler용)
+"""
+
+import json
+import logging
+import os
+import socket
+import struct
+
+import numpy as np
+
+from time_stretch import to_wav_bytes
+
+XTTS_SOCKET = os.getenv("XTTS_SOCKET", "/tmp/xtts.sock")
+XTTS_SPEAKER = os.getenv("XTTS_SPEAKER", "Ana Florence")
+XTTS_TIMEOUT = float(os.getenv("XTTS_TIMEOUT", 30.0))
+
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise ConnectionError("XTTS 서버 연결이 끊어졌습니다")
+    return data
+
+
+class XTTSClient:
+    def __init__(self, socket_path=XTTS_SOCKET, speaker=XTTS_SPEAKER, speaker_wav=None, language="ko"):
+        self.socket_path = socket_path
+        self.speaker = speaker
+        self.speaker_wav = speaker_wav
+        self.language = language
+        self.last_stats = {}
+
+    def stream(self, text):
+        """
+        :return: (int16 PCM 조각, 샘플레이트) 제너레이터
+        """
+        request = {"text": text, "language": self.language, "speaker": self.speaker, "speaker_wav": self.speaker_wav}
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(XTTS_TIMEOUT)
+            sock.connect(self.socket_path)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as f:
+                header = json.loads(f.readline())
+                sample_rate = header["sample_rate"]
+                while True:
+                    (size,) = struct.unpack(">I", _read_exact(f, 4))
+                    if size == 0:
+                        break
+                    yield np.frombuffer(_read_exact(f, size), dtype=np.int16), sample_rate
+                self.last_stats = json.loads(f.readline() or b"{}")
+
+        if self.last_stats.get("error"):
+            raise RuntimeError(f"XTTS 합성 실패: {self.last_stats['error']}")
+        logging.info(f"🗣️ XTTS RTF {self.last_stats.get('rtf') or 0:.2f} "
+                     f"(첫 조각 {self.last_stats.get('first_chunk') or 0:.2f}초)")
+
+    def synthesize(self, text):
+        chunks = []
+        sample_rate = 24000
+        for pcm, sample_rate in self.stream(text):
+            chunks.append(pcm)
+        samples = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int16)
+        return to_wav_bytes(samples.astype(np.float32) / 32767, sample_rate)